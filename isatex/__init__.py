@@ -19,6 +19,7 @@ from defaultmenuitem import *
 from defaultpanel import *
 from defaultpeakfunction import *
 from defaultspectrumfunction import *
+from engine import *
 from main import *
 from manager import *
 from objects import *
@@ -37,6 +38,7 @@ __all__ = [
     'defaultpanel',
     'defaultpeakfunction',
     'defaultspectrumfunction',
+    'engine',
     'main',
     'manager',
     'objects',
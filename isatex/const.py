@@ -1,7 +1,5 @@
 from sys import modules
 
-from wx import NewIdRef
-
 from util import DotChain
 
 
@@ -23,11 +21,20 @@ const_mgr.APPLICATION_NAME = 'iSATex'
 const_mgr.SETTING_FILE_PATH = 'setting.json'
 const_mgr.PLUGIN_FOLDER_PATH = './Plugin/'
 const_mgr.COLOR_THEME_FOLDER_PATH = './ColorTheme/'
+const_mgr.MODULE_MANIFEST_PATH = './Plugin/.manifest.json'
 
 const_mgr.PLUGIN_EXTENSION = '.plgn'
 const_mgr.SAVEFILE_EXTENSION = '.itsv'
-const_mgr.SAVEFILE_WILDCARD = f'{const_mgr.SAVEFILE_EXTENSION[1:].upper()} files (*{const_mgr.SAVEFILE_EXTENSION})|*{const_mgr.SAVEFILE_EXTENSION}'
+const_mgr.BINARY_SAVEFILE_EXTENSION = '.itsb'
+const_mgr.SAVEFILE_WILDCARD = f'{const_mgr.SAVEFILE_EXTENSION[1:].upper()} files (*{const_mgr.SAVEFILE_EXTENSION})|*{const_mgr.SAVEFILE_EXTENSION}|' \
+    f'{const_mgr.BINARY_SAVEFILE_EXTENSION[1:].upper()} files (*{const_mgr.BINARY_SAVEFILE_EXTENSION})|*{const_mgr.BINARY_SAVEFILE_EXTENSION}'
+const_mgr.OPEN_SAVEFILE_WILDCARD = f'iSATex project files (*{const_mgr.SAVEFILE_EXTENSION};*{const_mgr.BINARY_SAVEFILE_EXTENSION})|*{const_mgr.SAVEFILE_EXTENSION};*{const_mgr.BINARY_SAVEFILE_EXTENSION}'
+const_mgr.BINARY_SAVEFILE_ALIGNMENT = 64
+# The binary project file is rewritten from scratch when the unused part exceeds this ratio of the file size.
+const_mgr.BINARY_SAVEFILE_GARBAGE_RATIO = 0.5
 const_mgr.SAVE_ENCODING = 'utf-8'
+const_mgr.SAVE_MARKER_CLASS_NAME = '0__SAVE_CLASS_NAME__'
+const_mgr.SAVE_MARKER_DATA = '1__SAVE_DATA__'
 
 # Setting
 const_mgr.DATA_BUFFER_SIZE = 'DATA_BUFFER_SIZE'
@@ -85,20 +92,6 @@ const_mgr.HELP_MENU = '&Help'
 const_mgr.ABOUT_MENU_ITEM = 'About'
 const_mgr.TUTORIAL_MENU_ITEM = 'Tutorial'
 
-# Widget ID
-const_mgr.ID_NORMAL_TEXT = NewIdRef()
-const_mgr.ID_NORMAL_LINE = NewIdRef()
-const_mgr.ID_NORMAL_BUTTON = NewIdRef()
-const_mgr.ID_NORMAL_COMBOBOX = NewIdRef()
-const_mgr.ID_COLORMAP_COMBOBOX = NewIdRef()
-const_mgr.ID_BROWSE = NewIdRef()
-const_mgr.ID_PREVIEW = NewIdRef()
-const_mgr.ID_SET = NewIdRef()
-const_mgr.ID_CLEAR = NewIdRef()
-const_mgr.ID_SAVE = NewIdRef()
-const_mgr.ID_ADD = NewIdRef()
-const_mgr.ID_DONT_SAVE = NewIdRef()
-
 # Core Panel
 const_mgr.MAIN_WINDOW = 'MAIN_WINDOW'
 const_mgr.SPECTRUM_PANEL = 'SpectrumPanel'
@@ -189,5 +182,16 @@ const_mgr.SUCCESS_COLOR = DotChain(COLOR, SUCCESS)
 const_mgr.ERROR_COLOR = DotChain(COLOR, ERROR)
 
 const_mgr.MAX_DATA_BUFFER_SIZE = 100
+# Bursts of data selection and data contents events are sent as one event per this interval in milliseconds.
+const_mgr.EVENT_COALESCING_INTERVAL = 16
+# The spectra are redrawn without the axes while the ranges of the axes change less than this ratio.
+const_mgr.SPECTRUM_VIEW_LIMIT_TOLERANCE = 0.02
+# When more spectra are drawn together with the main selection, the density of their points is drawn instead of the lines.
+const_mgr.MULTI_DRAW_DENSITY_THRESHOLD = 100
+
+# Execution
+const_mgr.PARALLEL_EXECUTION_THRESHOLD = 32
+const_mgr.EXECUTION_EVENT_BATCH_SIZE = 64
+const_mgr.RESULT_CACHE_MEMORY_BUDGET = 256 * 1024 ** 2
 
 modules[__name__] = const_mgr
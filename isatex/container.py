@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Union
+from typing import Tuple, Union
 
 from wx import (ITEM_CHECK, ITEM_NORMAL, ITEM_RADIO, EmptyString, MenuItem,
                 NewIdRef, Panel, PyCommandEvent)
@@ -63,6 +63,7 @@ from util import GetShowPanelLabel
 class EventReceptorBase(iSATexObject):
     """Base class for receiving events
     """
+    __handler_name_dict = {}
 
     def OnProjectEvent(self, event: ProjectEvent):
         """Called when an event related to Project is fired. This method is intended to be overridden.
@@ -440,152 +441,232 @@ class EventReceptorBase(iSATexObject):
         """
         pass
 
-    def __OnProjectEvent(self, event):
+    @classmethod
+    def GetEventHandlerNameList(cls, event: PyCommandEvent) -> Tuple[str, ...]:
+        """Get the names of the methods called by "OnEvent" for the event, in the order in which they are called. The result depends only on the class and the type of the event, so it is cached.
+
+        :type event: PyCommandEvent
+        :rtype: Tuple[str, ...]
+        """
+        key = (event.__class__, event.GetEventType())
+        if key not in EventReceptorBase.__handler_name_dict:
+            name_list = []
+            EventReceptorBase.__RouteEvent(event, name_list)
+            EventReceptorBase.__handler_name_dict[key] = tuple(name_list)
+
+        return EventReceptorBase.__handler_name_dict[key]
+
+    def CallEventHandler(self, name: str, event: PyCommandEvent):
+        """Call the method of the specified name for the event. The name is one of those returned by "GetEventHandlerNameList".
+
+        :type name: str
+        :type event: PyCommandEvent
+        """
+        if name in ('OnLaunch', 'OnExitEvent'):
+            getattr(self, name)()
+        elif name == 'OnShow':
+            if self in event.GetShowPanelList():
+                self.OnShow()
+        elif name == 'OnHide':
+            if self in event.GetHidePanelList() and self not in event.GetShowPanelList():
+                self.OnHide()
+        else:
+            getattr(self, name)(event)
+
+    @staticmethod
+    def __RouteEvent(event, name_list):
+        if isinstance(event, ProjectEvent):
+            EventReceptorBase.__RouteProjectEvent(event, name_list)
+
+        elif isinstance(event, DataEvent):
+            EventReceptorBase.__RouteDataEvent(event, name_list)
+
+        elif isinstance(event, FunctionEvent):
+            EventReceptorBase.__RouteFunctionEvent(event, name_list)
+
+        elif isinstance(event, EncodeEvent):
+
+            name_list.append('OnEncodeEvent')
+
+        elif isinstance(event, DecodeEvent):
+
+            name_list.append('OnDecodeEvent')
+
+        elif isinstance(event, MappingEvent):
+
+            EventReceptorBase.__RouteMappingEvent(event, name_list)
+
+        elif isinstance(event, PeakTypeEvent):
+            EventReceptorBase.__RoutePeakTypeEvent(event, name_list)
+
+        elif isinstance(event, PanelEvent):
+            EventReceptorBase.__RoutePanelEvent(event, name_list)
+
+        elif isinstance(event, PreferenceEvent):
+            name_list.append('OnPreferenceEvent')
+
+        elif isinstance(event, ColorEvent):
+            EventReceptorBase.__RouteColorEvent(event, name_list)
+
+        elif isinstance(event, LaunchEvent):
+            name_list.append('OnLaunch')
+
+        elif isinstance(event, ExitEvent):
+            name_list.append('OnExitEvent')
+
+    @staticmethod
+    def __RouteProjectEvent(event, name_list):
         event_type = event.GetEventType()
         if isinstance(event, ProjectLoadEvent):
-            self.__OnProjectLoadEvent(event)
+            EventReceptorBase.__RouteProjectLoadEvent(event, name_list)
         elif event_type == wxEVT_PROJECT_SAVE:
-            self.OnProjectSave(event)
+            name_list.append('OnProjectSave')
         elif event_type == wxEVT_PROJECT_MEMO_CHANGE:
-            self.OnProjectMemoChange(event)
+            name_list.append('OnProjectMemoChange')
         elif event_type == wxEVT_PROJECT_EXIT:
-            self._OnProjectExit(event)
+            name_list.append('_OnProjectExit')
 
-        self.OnProjectEvent(event)
+        name_list.append('OnProjectEvent')
 
-    def __OnProjectLoadEvent(self, event):
+    @staticmethod
+    def __RouteProjectLoadEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_PROJECT_NEW:
-            self.OnProjectNew(event)
+            name_list.append('OnProjectNew')
         elif event_type == wxEVT_PROJECT_OPEN:
-            self.OnProjectOpen(event)
+            name_list.append('OnProjectOpen')
 
-        self.OnProjectLoad(event)
+        name_list.append('OnProjectLoad')
 
-    def __OnDataEvent(self, event):
+    @staticmethod
+    def __RouteDataEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_DATA_CONTENTS_CHANGE:
-            self.OnDataContentsChange(event)
+            name_list.append('OnDataContentsChange')
         elif event_type == wxEVT_DATA_SELECTION_CHANGE:
-            self.OnDataSelectionChange(event)
+            name_list.append('OnDataSelectionChange')
 
-        self.OnDataEvent(event)
+        name_list.append('OnDataEvent')
 
-    def __OnFunctionEvent(self, event):
+    @staticmethod
+    def __RouteFunctionEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_ENCODE_FUNCTION_SELECT:
-            self.OnEncodeFunctionSelect(event)
+            name_list.append('OnEncodeFunctionSelect')
         elif event_type == wxEVT_DECODE_FUNCTION_SELECT:
-            self.OnDecodeFunctionSelect(event)
+            name_list.append('OnDecodeFunctionSelect')
         elif event_type == wxEVT_SPECTRUM_FUNCTION_LIST_SELECT:
-            self.OnSpectrumFunctionListSelect(event)
+            name_list.append('OnSpectrumFunctionListSelect')
         elif event_type == wxEVT_MAPPING_FUNCTION_SELECT:
-            self.OnMappingFunctionSelect(event)
+            name_list.append('OnMappingFunctionSelect')
         elif event_type == wxEVT_RECIPE_SELECT:
-            self.OnRecipeSelect(event)
+            name_list.append('OnRecipeSelect')
         elif isinstance(event, FunctionRegisterEvent):
-            self.__OnFunctionRegisterEvent(event)
+            EventReceptorBase.__RouteFunctionRegisterEvent(event, name_list)
 
         elif isinstance(event, PresetEvent):
-            self.__OnPresetEvent(event)
+            EventReceptorBase.__RoutePresetEvent(event, name_list)
 
-        self.OnFunctionEvent(event)
+        name_list.append('OnFunctionEvent')
 
-    def __OnFunctionRegisterEvent(self, event):
+    @staticmethod
+    def __RouteFunctionRegisterEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_ENCODE_FUNCTION_REGISTER:
-            self.OnEncodeFunctionRegister(event)
+            name_list.append('OnEncodeFunctionRegister')
         elif event_type == wxEVT_ENCODE_FUNCTION_DEREGISTER:
-            self.OnEncodeFunctionDeregister(event)
+            name_list.append('OnEncodeFunctionDeregister')
         elif event_type == wxEVT_DECODE_FUNCTION_REGISTER:
-            self.OnDecodeFunctionRegister(event)
+            name_list.append('OnDecodeFunctionRegister')
         elif event_type == wxEVT_DECODE_FUNCTION_DEREGISTER:
-            self.OnDecodeFunctionDeregister(event)
+            name_list.append('OnDecodeFunctionDeregister')
         elif event_type == wxEVT_SPECTRUM_FUNCTION_REGISTER:
-            self.OnSpectrumFunctionRegister(event)
+            name_list.append('OnSpectrumFunctionRegister')
         elif event_type == wxEVT_SPECTRUM_FUNCTION_DEREGISTER:
-            self.OnSpectrumFunctionDeregister(event)
+            name_list.append('OnSpectrumFunctionDeregister')
         elif event_type == wxEVT_PEAK_FUNCTION_REGISTER:
-            self.OnPeakFunctionRegister(event)
+            name_list.append('OnPeakFunctionRegister')
         elif event_type == wxEVT_PEAK_FUNCTION_DEREGISTER:
-            self.OnPeakFunctionDeregister(event)
+            name_list.append('OnPeakFunctionDeregister')
         elif event_type == wxEVT_MAPPING_FUNCTION_REGISTER:
-            self.OnMappingFunctionRegister(event)
+            name_list.append('OnMappingFunctionRegister')
         elif event_type == wxEVT_MAPPING_FUNCTION_DEREGISTER:
-            self.OnMappingFunctionDeregister(event)
+            name_list.append('OnMappingFunctionDeregister')
 
-        self.OnFunctionRegisterEvent(event)
+        name_list.append('OnFunctionRegisterEvent')
 
-    def __OnMappingEvent(self, event):
+    @staticmethod
+    def __RouteMappingEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_TABLE_SIZE_CHANGE:
-            self.OnTableSizeChange(event)
+            name_list.append('OnTableSizeChange')
 
         elif event_type == wxEVT_DIRECTION_CHANGE:
-            self.OnDirectionChange(event)
+            name_list.append('OnDirectionChange')
 
         elif event_type == wxEVT_COLORMAP_CHANGE:
-            self.OnColormapChange(event)
+            name_list.append('OnColormapChange')
 
-        self.OnMappingEvent(event)
+        name_list.append('OnMappingEvent')
 
-    def __OnPresetEvent(self, event):
+    @staticmethod
+    def __RoutePresetEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_PRESET_REGISTER:
-            self.OnPresetRegister(event)
+            name_list.append('OnPresetRegister')
         elif event_type == wxEVT_PRESET_DEREGISTER:
-            self.OnPresetDeregister(event)
+            name_list.append('OnPresetDeregister')
         elif event_type == wxEVT_PRESET_SELECT:
-            self.OnPresetSelect(event)
+            name_list.append('OnPresetSelect')
 
-        self.OnPresetEvent(event)
+        name_list.append('OnPresetEvent')
 
-    def __OnPeakTypeEvent(self, event):
+    @staticmethod
+    def __RoutePeakTypeEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_PEAK_TYPE_REGISTER:
-            self.OnPeakTypeRegisterEvent(event)
+            name_list.append('OnPeakTypeRegisterEvent')
         elif event_type == wxEVT_PEAK_TYPE_CHANGE:
-            self.OnPeakTypeChange(event)
+            name_list.append('OnPeakTypeChange')
 
-        self.OnPeakTypeEvent(event)
+        name_list.append('OnPeakTypeEvent')
 
-    def __OnPanelEvent(self, event):
+    @staticmethod
+    def __RoutePanelEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_PANEL_SELECTION_CHANGE:
-            self.OnPanelSelectionChange(event)
+            name_list.append('OnPanelSelectionChange')
         elif event_type == wxEVT_PANEL_VIEW:
-            if self in event.GetShowPanelList():
-                self.OnShow()
-            elif self in event.GetHidePanelList():
-                self.OnHide()
-
-            self.OnPanelView(event)
+            # Whether the receptor is shown or hidden is checked in "CallEventHandler".
+            name_list.extend(['OnShow', 'OnHide', 'OnPanelView'])
 
         elif event_type == wxEVT_PANEL_REGISTER:
-            self.OnPanelRegister(event)
+            name_list.append('OnPanelRegister')
 
         elif isinstance(event, LayoutEvent):
-            self.__OnLayoutEvent(event)
+            EventReceptorBase.__RouteLayoutEvent(event, name_list)
 
-        self.OnPanelEvent(event)
+        name_list.append('OnPanelEvent')
 
-    def __OnLayoutEvent(self, event):
+    @staticmethod
+    def __RouteLayoutEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_LAYOUT_CHANGE:
-            self.OnLayoutChange(event)
+            name_list.append('OnLayoutChange')
         elif event_type == wxEVT_LAYOUT_REGISTER:
-            self.OnLayoutRegister(event)
+            name_list.append('OnLayoutRegister')
 
-        self.OnLayoutEvent(event)
+        name_list.append('OnLayoutEvent')
 
-    def __OnColorEvent(self, event):
+    @staticmethod
+    def __RouteColorEvent(event, name_list):
         event_type = event.GetEventType()
         if event_type == wxEVT_COLOR_REGISTER:
-            self.OnColorRegister(event)
+            name_list.append('OnColorRegister')
         elif event_type == wxEVT_COLOR_SELECT:
-            self.OnColorSelect(event)
+            name_list.append('OnColorSelect')
 
-        self.OnColorEvent(event)
+        name_list.append('OnColorEvent')
 
     def OnEvent(self, event: PyCommandEvent):
         """Called when an event is fired.
@@ -595,44 +676,8 @@ class EventReceptorBase(iSATexObject):
         if event.GetId() == self.GetId():
             return
 
-        if isinstance(event, ProjectEvent):
-            self.__OnProjectEvent(event)
-
-        elif isinstance(event, DataEvent):
-            self.__OnDataEvent(event)
-
-        elif isinstance(event, FunctionEvent):
-            self.__OnFunctionEvent(event)
-
-        elif isinstance(event, EncodeEvent):
-
-            self.OnEncodeEvent(event)
-
-        elif isinstance(event, DecodeEvent):
-
-            self.OnDecodeEvent(event)
-
-        elif isinstance(event, MappingEvent):
-
-            self.__OnMappingEvent(event)
-
-        elif isinstance(event, PeakTypeEvent):
-            self.__OnPeakTypeEvent(event)
-
-        elif isinstance(event, PanelEvent):
-            self.__OnPanelEvent(event)
-
-        elif isinstance(event, PreferenceEvent):
-            self.OnPreferenceEvent(event)
-
-        elif isinstance(event, ColorEvent):
-            self.__OnColorEvent(event)
-
-        elif isinstance(event, LaunchEvent):
-            self.OnLaunch()
-
-        elif isinstance(event, ExitEvent):
-            self.OnExitEvent()
+        for name in self.GetEventHandlerNameList(event):
+            self.CallEventHandler(name, event)
 
 
 class PanelBase(CommunicableObjectBase, SettingStorableObjectBase, EventReceptorBase, Panel):
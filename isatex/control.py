@@ -1,4 +1,6 @@
 
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
 from copy import deepcopy
 from datetime import datetime
 from os.path import basename, join
@@ -15,12 +17,14 @@ from wx import (ALIGN_CENTER_VERTICAL, ALL, ART_CLOSE, ART_INFORMATION,
                 DEFAULT_DIALOG_STYLE, EVT_BUTTON, EVT_CHAR_HOOK, EVT_CLOSE,
                 EVT_COMBOBOX, EVT_KILL_FOCUS, EVT_SCROLL, EXPAND,
                 FD_FILE_MUST_EXIST, FD_MULTIPLE, FD_OPEN, HORIZONTAL,
-                ID_CANCEL, ID_CLOSE, ID_EXECUTE, ID_OK, LEFT, RESIZE_BORDER,
-                RIGHT, TE_MULTILINE, TE_READONLY, VERTICAL,
+                ID_CANCEL, ID_CLOSE, ID_EXECUTE, ID_OK, LEFT, PD_APP_MODAL,
+                PD_AUTO_HIDE, PD_CAN_ABORT, PD_ELAPSED_TIME, PD_REMAINING_TIME,
+                RESIZE_BORDER, RIGHT, TE_MULTILINE, TE_READONLY, VERTICAL,
                 WXK_CATEGORY_NAVIGATION, ArtProvider, BitmapButton, BoxSizer,
                 Button, Colour, ColourData, ComboBox, Dialog, DirDialog,
-                FileDialog, LogError, NullColour, Panel, Slider,
-                StaticBitmap, StaticText, TextCtrl, Window)
+                FileDialog, LogError, NewIdRef, NullColour, Panel,
+                ProgressDialog, Slider, StaticBitmap, StaticText, TextCtrl,
+                Window)
 from wx.adv import DatePickerCtrl
 from wx.lib.agw.cubecolourdialog import Colour as cube_color
 from wx.lib.agw.cubecolourdialog import CubeColourDialog
@@ -31,17 +35,29 @@ from wx.lib.agw.ultimatelistctrl import (ULC_BORDER_SELECT, ULC_FORMAT_CENTER,
 from wx.lib.dialogs import ScrolledMessageDialog
 from wx.lib.scrolledpanel import ScrolledPanel
 
-from const import (DEFAULT_COLORMAP, ID_ADD, ID_BROWSE, ID_CLEAR, ID_DONT_SAVE,
-                   ID_NORMAL_BUTTON, ID_NORMAL_COMBOBOX, ID_NORMAL_LINE,
-                   ID_NORMAL_TEXT, ID_PREVIEW, ID_SAVE, ID_SET,
-                   NEW_MENU_ITEM_HELP)
+from const import (DEFAULT_COLORMAP, NEW_MENU_ITEM_HELP,
+                   PARALLEL_EXECUTION_THRESHOLD)
 from core import ChameleonWidgetBase
 from objects import (ArgumentContainerBase, ChoiceContainer, DataContainer,
                      DecodeFunctionContainerBase, EncodeFunctionContainerBase,
                      FunctionContainerBase, IntContainer,
                      IterableArgumentContainerBase, ListArgumentContainer,
                      Project, Spectrum, StrContainer, TupleArgumentContainer)
-from util import GetExtension, GetFileExtention, HasValidElement
+from util import GetFileExtention, HasValidElement
+
+# Widget ID
+ID_NORMAL_TEXT = NewIdRef()
+ID_NORMAL_LINE = NewIdRef()
+ID_NORMAL_BUTTON = NewIdRef()
+ID_NORMAL_COMBOBOX = NewIdRef()
+ID_COLORMAP_COMBOBOX = NewIdRef()
+ID_BROWSE = NewIdRef()
+ID_PREVIEW = NewIdRef()
+ID_SET = NewIdRef()
+ID_CLEAR = NewIdRef()
+ID_SAVE = NewIdRef()
+ID_ADD = NewIdRef()
+ID_DONT_SAVE = NewIdRef()
 
 
 class NormalText(StaticText, ChameleonWidgetBase):
@@ -1371,6 +1387,7 @@ class FunctionListEntry(Panel):
 class NewDialog(Dialog):
     """Dialog for inputting experimental data.
     """
+    progress_style = PD_APP_MODAL | PD_AUTO_HIDE | PD_CAN_ABORT | PD_ELAPSED_TIME | PD_REMAINING_TIME
 
     def __init__(
             self,
@@ -1396,7 +1413,6 @@ class NewDialog(Dialog):
         """
         super().__init__(style=DEFAULT_DIALOG_STYLE | RESIZE_BORDER, *args, **kw)
         self.__prev_encoding = encoding
-        self.__contents_list = []
         self.__data_list = []
 
         self.__delimiter = delimiter
@@ -1502,22 +1518,13 @@ class NewDialog(Dialog):
 
             path_list = dialog.GetPaths()
 
-        encoding = self.GetEncoding().GetValue()
-
         index = self.__list_ctrl.GetFirstSelected()
         item_count = self.__list_ctrl.GetItemCount()
         index = index if index != -1 else item_count
         length = len(path_list)
         for n, path in enumerate(reversed(path_list)):
-            try:
-                with open(path, mode='r', encoding=encoding) as f:
-                    contents = f.read()
-
-            except Exception:
-                LogError(f'{basename(path)} is failed.')
-                continue
-
-            self.__contents_list.insert(index, contents)
+            # The files are read when they are encoded, so only the paths are kept here.
+            self.__data_list.insert(index, None)
 
             self.__list_ctrl.InsertStringItem(index, str(length - n + index))
             self.__list_ctrl.SetStringItem(index, 1, basename(path))
@@ -1527,22 +1534,28 @@ class NewDialog(Dialog):
         for pos in range(index + length, item_count + length):
             self.__list_ctrl.SetStringItem(pos, 0, str(pos + 1))
 
-        self.__data_list = [None] * len(self.__contents_list)
-
-        if len(self.__contents_list) > 0:
+        if len(self.__data_list) > 0:
             self.__preview_btn.Enable()
             self.__clear_btn.Enable()
             self.__exe_btn.Enable()
 
     def __OnPreviewBtnPushed(self):
-        if len(self.__contents_list) == 0:
+        if len(self.__data_list) == 0:
             return
 
         index = max(self.__list_ctrl.GetFirstSelected(), 0)
-        contents = self.__contents_list[index]
         path = self.__GetPath(index)
         title = basename(path)
 
+        encoding = self.GetEncoding().GetValue()
+        try:
+            with open(path, mode='r', encoding=encoding) as f:
+                contents = f.read()
+
+        except Exception:
+            LogError(f'{title} is failed.')
+            return
+
         dialog = DataPreviewDialog(contents, self.__delimiter, parent=self, title=title)
         dialog.Bind(EVT_CLOSE, self.__OnPreviewDialogClose)
         dialog.Show()
@@ -1556,7 +1569,6 @@ class NewDialog(Dialog):
         selection_count = self.__list_ctrl.GetSelectedItemCount()
         if selection_count == 0:
             self.__list_ctrl.DeleteAllItems()
-            self.__contents_list.clear()
             self.__data_list.clear()
         else:
             start = self.__list_ctrl.GetFirstSelected()
@@ -1564,72 +1576,66 @@ class NewDialog(Dialog):
             for i in reversed(range(start, end)):
                 self.__list_ctrl.DeleteItem(i)
 
-            self.__contents_list = self.__contents_list[:start] + self.__contents_list[end:]
             self.__data_list = self.__data_list[:start] + self.__data_list[end:]
 
             for pos in range(start, end):
                 self.__list_ctrl.SetStringItem(pos, 0, str(pos + 1))
 
-        if len(self.__contents_list) == 0:
+        if len(self.__data_list) == 0:
             self.__preview_btn.Disable()
             self.__clear_btn.Disable()
             self.__exe_btn.Disable()
-
-        if len(self.__data_list) == 0:
             self.__ok_btn.Disable()
 
         self.Layout()
 
     def __OnExecuteBtnPushed(self):
         encode_func_container = self.GetSelectedEncodeFunction()
-        for index, contents in enumerate(self.__contents_list):
-            if self.__data_list[index] is not None:
-                continue
-
-            path = self.__GetPath(index)
-            try:
-                x, y, bg = self.__GetSpectrumParameter(contents, encode_func_container)
-            except BaseException:
-                LogError(f'{basename(path)} is failed.')
-                continue
-
-            spectrum = Spectrum(x, y, bg)
-            data_container = DataContainer(path, self.__data_buffer_size)
-            data_container.Append(spectrum, msg=path)
-            self.__data_list[index] = data_container
-
-            self.__list_ctrl.SetStringItem(index, 2, str(len(x)))
-            self.__list_ctrl.SetStringItem(index, 3, 'O' if len(bg) else 'X')
+        index_list = [index for index, data in enumerate(self.__data_list) if data is None]
+
+        with ProgressDialog('Encode', 'Reading and encoding files...', maximum=max(len(index_list), 1), parent=self, style=NewDialog.progress_style) as dialog:
+            for n, (index, params) in enumerate(self.__EncodeFiles(index_list, encode_func_container), 1):
+                path = self.__GetPath(index)
+                try:
+                    x, y, bg = encode_func_container.GetSpectrumParams(params)
+                except BaseException:
+                    LogError(f'{basename(path)} is failed.')
+                else:
+                    spectrum = Spectrum(x, y, bg)
+                    data_container = DataContainer(path, self.__data_buffer_size)
+                    data_container.Append(spectrum, msg=path)
+                    self.__data_list[index] = data_container
+
+                    self.__list_ctrl.SetStringItem(index, 2, str(len(x)))
+                    self.__list_ctrl.SetStringItem(index, 3, 'O' if len(bg) else 'X')
+
+                if not dialog.Update(n, basename(path))[0]:
+                    break
 
         if all([data is not None for data in self.__data_list]):
             self.__ok_btn.Enable()
         else:
             self.__ok_btn.Disable()
 
-    def __GetSpectrumParameter(self, contents, encode_func_container):
-        params = encode_func_container.Execution(contents)
-
-        x = []
-        y = []
-        bg = []
-        for param, ret_param in zip(params, encode_func_container.SendReturnParams()):
-            if ret_param == 'x':
-                x = param
-            elif ret_param == 'y':
-                y = param
-            elif ret_param == 'b':
-                bg = param
-
-        if len(x) != len(y):
-            raise RuntimeError()
-
-        if len(x) == 0:
-            raise RuntimeError()
+    def __EncodeFiles(self, index_list, encode_func_container):
+        # Yields (index, return value of "ExecutionFromFile") as soon as each file is read and encoded. The return value is None on failure.
+        # Large batches are read and encoded in worker processes, so the contents of the files never reach this process.
+        encoding = self.GetEncoding().GetValue()
+        Executor = ThreadPoolExecutor if len(index_list) < PARALLEL_EXECUTION_THRESHOLD else ProcessPoolExecutor
+        with Executor() as executor:
+            future_dict = {executor.submit(encode_func_container.ExecutionFromFile, self.__GetPath(index), encoding): index for index in index_list}
+            try:
+                for future in as_completed(future_dict):
+                    try:
+                        params = future.result()
+                    except BaseException:
+                        params = None
 
-        if len(bg) != 0 or len(bg) == len(x):
-            raise RuntimeError()
+                    yield future_dict[future], params
 
-        return x, y, bg
+            finally:
+                for future in future_dict:
+                    future.cancel()
 
     def __OnCharHook(self, event):
         event.Skip()
@@ -1726,19 +1732,8 @@ class ExportDialog(Dialog):
     def __UpdatePreview(self):
         func = self.GetSelectedDecodeFunction()
         project = deepcopy(self.__dummy_project)
-        values = func.Execution(project)
-
-        if not isinstance(values, (list, tuple)):
-            raise TypeError()
-
-        if len(values) == 2 and all([isinstance(value, str) for value in values]):
-            contents = values[1]
-
-        elif isinstance(values, (list, tuple)):
-            if not HasValidElement(values, (list, tuple)):
-                raise TypeError()
-
-            contents = values[0][1]
+        _, file_list = func.ExecutionToFiles(project)
+        contents = file_list[0][1] if len(file_list) != 0 else ''
 
         self.__preview_ety.SetValue(contents)
 
@@ -1746,41 +1741,27 @@ class ExportDialog(Dialog):
         func = self.GetSelectedDecodeFunction()
         project = deepcopy(self.__project)
 
-        values = func.Execution(project)
-
-        if not isinstance(values, (list, tuple)):
-            raise TypeError()
-
-        wildcard = func.SendFileTypeWildcard()
-        extension = GetExtension(wildcard)
+        is_single_file, file_list = func.ExecutionToFiles(project)
         encoding = self.GetEncoding().GetValue()
-        if len(values) == 2 and all([isinstance(value, str) for value in values]):
-            file_name, contents = values
-            with FileDialog(self, defaultFile=file_name + extension, wildcard=wildcard) as dialog:
+        if is_single_file:
+            with FileDialog(self, defaultFile=file_list[0][0], wildcard=func.SendFileTypeWildcard()) as dialog:
                 if dialog.ShowModal() == ID_CANCEL:
                     return
 
-                path = dialog.GetPath()
-
-            with open(path, mode='w', encoding=encoding) as f:
-                f.write(contents)
-
-        elif isinstance(values, (list, tuple)):
-            if not HasValidElement(values, (list, tuple)):
-                raise TypeError()
+                path_list = [dialog.GetPath()]
 
+        else:
             with DirDialog(self) as dialog:
                 if dialog.ShowModal() == ID_CANCEL:
                     return
 
                 dir_path = dialog.GetPath()
 
-            for file_name, contents in values:
-                with open(join(dir_path, file_name + extension), mode='w', encoding=encoding) as f:
-                    f.write(contents)
+            path_list = [join(dir_path, file_name) for file_name, _ in file_list]
 
-        else:
-            raise TypeError()
+        for path, (_, contents) in zip(path_list, file_list):
+            with open(path, mode='w', encoding=encoding) as f:
+                f.write(contents)
 
     def __OnCharHook(self, event):
         event.Skip()
@@ -2135,6 +2116,18 @@ def GetNextStr(prev, keycode, selection):
 
 
 __all__ = [
+    'ID_NORMAL_TEXT',
+    'ID_NORMAL_LINE',
+    'ID_NORMAL_BUTTON',
+    'ID_NORMAL_COMBOBOX',
+    'ID_COLORMAP_COMBOBOX',
+    'ID_BROWSE',
+    'ID_PREVIEW',
+    'ID_SET',
+    'ID_CLEAR',
+    'ID_SAVE',
+    'ID_ADD',
+    'ID_DONT_SAVE',
     'NormalText',
     'NormalLine',
     'NormalEntry',
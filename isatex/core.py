@@ -1,4 +1,7 @@
 from abc import ABCMeta, abstractmethod
+from typing import Any, Callable, Optional
+
+from const import SAVE_MARKER_CLASS_NAME, SAVE_MARKER_DATA
 from util import RestrictedList, Singleton
 
 
@@ -33,6 +36,27 @@ class StorableObject(iSATexObject, metaclass=ABCMeta):
         raise NotImplementedError()
 
 
+def LoadStorableObject(dct: dict, create_object: Callable[[str], Optional[StorableObject]]) -> Any:
+    """Convert a dictionary read from json into the storable object which it describes. Use as "object_hook" of json.load.
+
+    :param dct: Dictionary read from json
+    :type dct: dict
+    :param create_object: Returns a new instance of the storable class of the given name, or None if the class is unknown.
+    :type create_object: Callable[[str], Optional[StorableObject]]
+    :return: The storable object, or dct itself if it does not describe a storable object of a known class.
+    :rtype: Any
+    """
+    if SAVE_MARKER_CLASS_NAME not in dct or SAVE_MARKER_DATA not in dct:
+        return dct
+
+    obj = create_object(dct[SAVE_MARKER_CLASS_NAME])
+    if obj is None:
+        return dct
+
+    obj.ReceiveSaveData(dct[SAVE_MARKER_DATA])
+    return obj
+
+
 class CommunicableObjectBase(iSATexObject):
     """
     By inheriting from this class, it is possible to communicate with the following managers.
@@ -127,6 +151,7 @@ class ChameleonWidgetBase(iSATexObject):
 __all__ = [
     'iSATexObject',
     'StorableObject',
+    'LoadStorableObject',
     'CommunicableObjectBase',
     'SettingStorableObjectBase',
     'RestrictedStorableListBase',
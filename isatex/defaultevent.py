@@ -558,6 +558,33 @@ class DataContentsChangeEvent(DataEvent):
         """
         return self.__IsChanged(self.__msg_changed_list, index)
 
+    def Merge(self, event: 'DataContentsChangeEvent') -> 'DataContentsChangeEvent':
+        """Create an event that combines this event and the next event. The data of the next event take precedence, and the changes of both events are kept.
+
+        :param event: Event fired after this event.
+        :type event: DataContentsChangeEvent
+        :rtype: DataContentsChangeEvent
+        """
+        index_list = list(self.__index_list)
+        data_list = list(self.__data_list)
+        changed_list_list = [list(changed_list) for changed_list in (self.__x_changed_list, self.__y_changed_list, self.__bg_changed_list, self.__peaks_changed_list, self.__recipe_changed_list, self.__msg_changed_list)]
+        next_changed_list_list = (event.__x_changed_list, event.__y_changed_list, event.__bg_changed_list, event.__peaks_changed_list, event.__recipe_changed_list, event.__msg_changed_list)
+        position_dict = {index: position for position, index in enumerate(index_list)}
+        for next_position, (index, data) in enumerate(zip(event.__index_list, event.__data_list)):
+            if index in position_dict:
+                position = position_dict[index]
+                data_list[position] = data
+                for changed_list, next_changed_list in zip(changed_list_list, next_changed_list_list):
+                    changed_list[position] = changed_list[position] or next_changed_list[next_position]
+            else:
+                position_dict[index] = len(index_list)
+                index_list.append(index)
+                data_list.append(data)
+                for changed_list, next_changed_list in zip(changed_list_list, next_changed_list_list):
+                    changed_list.append(next_changed_list[next_position])
+
+        return DataContentsChangeEvent(index_list, data_list, *changed_list_list, id=self.GetId())
+
 
 class DataSelectionChangeEvent(DataEvent):
     """Event related to a change in data selection
@@ -652,6 +679,15 @@ class DataSelectionChangeEvent(DataEvent):
         """
         return list(set(self.GetPreviousSelection()) - set(self.GetSelection()))
 
+    def Merge(self, event: 'DataSelectionChangeEvent') -> 'DataSelectionChangeEvent':
+        """Create an event that changes the selection from the previous selection of this event to the selection of the next event.
+
+        :param event: Event fired after this event.
+        :type event: DataSelectionChangeEvent
+        :rtype: DataSelectionChangeEvent
+        """
+        return DataSelectionChangeEvent(event.__main_selection, self.__prev_main_selection, list(event.__selection), list(self.__prev_selection), id=self.GetId())
+
 
 class FunctionEvent(iSATexEvent):
     """Event related to the function
@@ -10,8 +10,8 @@ from const import (ABOUT_MENU_ITEM, DATA_MANAGER, DECODE_MANAGER,
                    ENCODE_MANAGER, EXPORT_MENU_ITEM, EXPORT_PLUGIN_MENU_ITEM,
                    FUNCTION_MANAGER, IMPORT_PLUGIN_MENU_ITEM, LAYOUT_MENU,
                    MENUBAR_MANAGER, NEW_MENU_ITEM, NEW_MENU_ITEM_HELP,
-                   OPEN_MENU_ITEM, PANEL_MANAGER, PREFERENCE_MANAGER,
-                   PREFERENCE_MENU_ITEM, PROJECT_MANAGER,
+                   OPEN_MENU_ITEM, OPEN_SAVEFILE_WILDCARD, PANEL_MANAGER,
+                   PREFERENCE_MANAGER, PREFERENCE_MENU_ITEM, PROJECT_MANAGER,
                    PROJECT_MEMO_MENU_ITEM, SAVE_AS_MENU_ITEM, SAVE_MENU_ITEM,
                    SAVEFILE_WILDCARD, TUTORIAL_MENU_ITEM)
 from container import CustomNormalMenuItemBase
@@ -71,7 +71,7 @@ class OpenMenuItem(CustomNormalMenuItemBase):
     def Function(self):
         """loading an existing project
         """
-        with FileDialog(None, wildcard=SAVEFILE_WILDCARD, style=FD_OPEN | FD_FILE_MUST_EXIST) as dialog:
+        with FileDialog(None, wildcard=OPEN_SAVEFILE_WILDCARD, style=FD_OPEN | FD_FILE_MUST_EXIST) as dialog:
             if dialog.ShowModal() == ID_CANCEL:
                 return
 
@@ -18,7 +18,7 @@ from wx import (ALIGN_CENTER, ALIGN_CENTER_VERTICAL, ALL, ART_CLOSE,
                 EVT_COMMAND_SCROLL_CHANGED, EVT_LEFT_UP, EXPAND, HORIZONTAL,
                 ID_CANCEL, LEFT, RIGHT, TE_MULTILINE, TE_READONLY, TOP,
                 VERTICAL, ArtProvider, BitmapButton, BoxSizer, Button,
-                NullColour, Panel, SizerFlags, Slider)
+                CheckBox, NullColour, Panel, SizerFlags, Slider)
 from wx.lib.agw.ultimatelistctrl import (EVT_LIST_ITEM_DESELECTED,
                                          EVT_LIST_ITEM_SELECTED,
                                          ULC_BORDER_SELECT, ULC_FORMAT_CENTER,
@@ -28,15 +28,16 @@ from wx.lib.agw.ultimatelistctrl import (EVT_LIST_ITEM_DESELECTED,
 from wx.lib.scrolledpanel import ScrolledPanel
 
 from const import (COLOR_MANAGER, DATA_MANAGER, FUNCTION_MANAGER,
-                   MAPPING_MANAGER, PEAK_MANAGER)
+                   MAPPING_MANAGER, PARALLEL_EXECUTION_THRESHOLD, PEAK_MANAGER)
 from container import PanelBase
 from control import (AddButton, ClearButton, ColormapEntry, ExecuteButton,
                      FunctionArgumentEntry, FunctionListEntry, HelpButton,
                      LabeledValidateEntry, NormalComboBox, NormalEntry,
                      NormalLine, NormalText, RegisterButton, RegisterDialog,
                      SetButton)
-from objects import (ChoiceContainer, DataContainer, IntContainer, Preset,
-                     Recipe, SpectrumFunctionContainerBase)
+from objects import (ChoiceContainer, DataContainer, DataContainerView,
+                     IntContainer, Preset, Recipe,
+                     SpectrumFunctionContainerBase)
 
 
 # TODO: Focus is not obtained even if the list is selected. So the spectrum may not be drawn.
@@ -617,11 +618,13 @@ class ExecutePanel(PanelBase):
         self.__execute_btn = ExecuteButton(self)
         self.__execute_btn.Bind(EVT_BUTTON, lambda _: self.__OnExecuteBtnPushed())
         self.__execute_btn.Disable()
+        self.__warm_start_chk = CheckBox(self, label='Warm start from neighbours')
         self.__contents_panel = ScrolledPanel(self)
         self.__contents_panel.Sizer = BoxSizer(VERTICAL)
 
         self.Sizer = BoxSizer(VERTICAL)
         self.Sizer.Add(self.__execute_btn, 0, CENTER | ALL, 10)
+        self.Sizer.Add(self.__warm_start_chk, 0, CENTER | BOTTOM, 10)
         self.Sizer.Add(NormalLine(self, size=(-1, 2)), 0, EXPAND | LEFT | RIGHT, 10)
         self.Sizer.Add(self.__contents_panel, 1, EXPAND)
 
@@ -643,7 +646,9 @@ class ExecutePanel(PanelBase):
 
     def __OnExecuteBtnPushed(self):
         selection = self.Get(DATA_MANAGER).GetSelection()
-        self.Get(DATA_MANAGER).ExecuteSpectrumFunction(selection)
+        parallel = len(selection) >= PARALLEL_EXECUTION_THRESHOLD
+        warm_start = self.__warm_start_chk.GetValue()
+        self.Get(DATA_MANAGER).ExecuteSpectrumFunction(selection, parallel, warm_start=warm_start)
 
     def __ClearContents(self):
         for contents in self.__GetContentsList():
@@ -1162,7 +1167,8 @@ class MappingViewer(PanelBase):
     def __ConvertDataList(self):
         data_size = self.Get(DATA_MANAGER).GetDataSize()
         index_list = [self.__ConvertInner(i) for i in range(data_size)]
-        return self.Get(DATA_MANAGER).GetDataList(index_list)
+        # The data are not copied, so the mapping functions get read-only wrappers not to modify the project.
+        return [DataContainerView(data) for data in self.Get(DATA_MANAGER).GetDataList(index_list, copy=False)]
 
     def __CreateQuadMesh(self, w, h, value_list, cmap):
         coordinate = array([[[x, y] for x in range(w + 1)] for y in range(h + 1)])
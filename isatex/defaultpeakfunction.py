@@ -1,4 +1,4 @@
-from numpy import exp, log
+from numpy import exp, log, stack, where
 
 from objects import FloatContainer, PeakFunctionContainerBase
 
@@ -13,6 +13,21 @@ class Lorentz(PeakFunctionContainerBase):
     def Function(self, x, args):
         return args[0] / ((4 * (x - args[1]) / args[2]) ** 2 + 1) if args[2] != 0 else 1e10
 
+    def FunctionArray(self, x, params):
+        amp, ctr, wid = params.T[:, :, None]
+        is_zero_wid = wid == 0
+        wid = where(is_zero_wid, 1.0, wid)
+        return where(is_zero_wid, 1e10, amp / ((4 * (x - ctr) / wid) ** 2 + 1))
+
+    def DerivativeArray(self, x, params):
+        amp, ctr, wid = params.T[:, :, None]
+        is_zero_wid = wid == 0
+        wid = where(is_zero_wid, 1.0, wid)
+        u = (x - ctr) / wid
+        d_amp = 1 / (16 * u ** 2 + 1)
+        d_ctr = 32 * amp * u * d_amp ** 2 / wid
+        return where(is_zero_wid[:, None], 0.0, stack([d_amp, d_ctr, d_ctr * u], axis=1))
+
     def GetTex(self):
         return r'$Amp\ \frac{Wid^2}{4\left( x - Ctr \right)^2 + Wid^2}$'
 
@@ -29,6 +44,20 @@ class PseudoVoigt(PeakFunctionContainerBase):
         return args[3] * (args[0] * exp(- 4 * log(2) * ((x - args[1]) / args[2]) ** 2)) + \
             (1 - args[3]) * args[0] / ((4 * (x - args[1]) / args[2]) ** 2 + 1)
 
+    def FunctionArray(self, x, params):
+        amp, ctr, wid, eta = params.T[:, :, None]
+        u = (x - ctr) / wid
+        return eta * (amp * exp(- 4 * log(2) * u ** 2)) + (1 - eta) * amp / ((4 * u) ** 2 + 1)
+
+    def DerivativeArray(self, x, params):
+        amp, ctr, wid, eta = params.T[:, :, None]
+        u = (x - ctr) / wid
+        gaussian = exp(- 4 * log(2) * u ** 2)
+        lorentz = 1 / (16 * u ** 2 + 1)
+        d_amp = eta * gaussian + (1 - eta) * lorentz
+        d_ctr = amp * (eta * 8 * log(2) * gaussian + (1 - eta) * 32 * lorentz ** 2) * u / wid
+        return stack([d_amp, d_ctr, d_ctr * u, amp * (gaussian - lorentz)], axis=1)
+
     def GetTex(self):
         return r'$Eta\ Amp\ exp\left(-4\ln{2}\left( \frac{x - Ctr}{Wid}\right)^2 \right)$' + '\n' + \
             r'$ + (1 - Eta)\ Amp\ \frac{Wid^2}{4\left( x - Ctr \right)^2 + Wid^2}$'
@@ -1,13 +1,16 @@
 from math import isclose
 
-from numpy import (array, count_nonzero, inf, linspace, ndarray, newaxis, ones,
-                   reshape, squeeze, tile, zeros)
+from numpy import (arange, argsort, array, asarray, bincount, broadcast_to,
+                   clip, count_nonzero, einsum, flatnonzero, inf, linspace,
+                   minimum, ndarray, newaxis, ones, reshape, searchsorted,
+                   squeeze, where, zeros)
 from numpy.linalg import pinv
 from scipy.interpolate import (Akima1DInterpolator, BarycentricInterpolator,
                                KroghInterpolator, PchipInterpolator, interp1d,
                                lagrange)
-from scipy.optimize import curve_fit
+from scipy.optimize import curve_fit, least_squares
 from scipy.signal import find_peaks, savgol_filter
+from scipy.sparse import csr_matrix
 
 from objects import (ChoiceContainer, FloatContainer, IntContainer,
                      ListArgumentContainer, OptionalFloatContainer,
@@ -154,12 +157,18 @@ class SavgolFilter(SpectrumFunctionContainerBase):
 
 
 class Goldindec(SpectrumFunctionContainerBase):
+    PROJECTION_CACHE_SIZE = 8
+    __projection_cache = {}
+
     def __init__(self):
         super().__init__({'Poly order': IntContainer(4, 1, None), 'Peak ratio': FloatContainer(0.5, 0.1, 0.9)})
 
     def Function(self, args):
         x, y, peaks, poly_order, ratio = args
         bg = self.goldindec(x, y, poly_order, ratio)
+        return self.__SubtractBackground(x, y, bg, peaks)
+
+    def __SubtractBackground(self, x, y, bg, peaks):
         subtracted_y = y - bg
         ymin = min(subtracted_y)
 
@@ -224,31 +233,63 @@ class Goldindec(SpectrumFunctionContainerBase):
         if row_y < col_y:
             y = reshape(y, (col_y, row_y))
 
-        a, b = 0, 1
+        return squeeze(self.goldindec_batch(x, y, p, peak_ratio, eps))
+
+    def goldindec_batch(self, x, y, p, peak_ratio, eps=0.0001):
+        """Estimate baselines of spectra sharing the same x at once.
+        The golden-section search and the iteration of "legend_c" are done for each column independently, so the result of each column is the same as "goldindec".
+
+        Args:
+            x (array_like): Raman wave number. This array should be monotonically increasing and column vector.
+            y (array_like): Raman intensity. Each column is a spectrum, so the shape should be (size of x, number of spectra).
+            p (int): the polynomial order.
+            peak_ratio (float): the ratio of peaks. you can choose this value from 0.1 to 0.9 with step length 0.1.
+            eps (float): the parameter XX to terminate the iteration and users can specify this value.
+
+        Returns:
+            2-dimension ndarray: baselines. Each column is the baseline of the corresponding column of y.
+        """
+        x = array(x, dtype=float)
+        y = array(y, dtype=float)
+
+        if x.ndim == 1:
+            x = x[:, newaxis]
+
+        if y.ndim == 1:
+            y = y[:, newaxis]
+
+        if x.ndim > 2 or x.shape[1] != 1:
+            raise AttributeError('x should be column vector')
+
+        if y.ndim > 2 or len(y) != len(x):
+            raise AttributeError('y should be 2-dimensions array whose rows are the same size as x')
+
+        size = y.shape[1]
         r_ud = self.t_rate(peak_ratio)
 
+        a = zeros(size)
+        b = ones(size)
         s = a + 0.618 * (b - a)
         z = self.legend_c(x, y, p, s)
 
-        up_down_rate = count_nonzero(y >= z) / count_nonzero(y < z)
-        t = 0
+        up_down_rate = count_nonzero(y >= z, axis=0) / count_nonzero(y < z, axis=0)
+        searching = abs(up_down_rate - r_ud) > eps
 
-        while abs(up_down_rate - r_ud) > eps:
-            old_s = s
-            if up_down_rate - r_ud > eps:
-                a = s
-            else:
-                b = s
+        while searching.any():
+            index = flatnonzero(searching)
+            old_s = s[index]
+            upper = up_down_rate[index] - r_ud > eps
+            a[index] = where(upper, old_s, a[index])
+            b[index] = where(upper, b[index], old_s)
 
-            s = a + 0.618 * (b - a)
-            z = self.legend_c(x, y, p, s)
-            up_down_rate = count_nonzero(y >= z) / count_nonzero(y < z)
-            if abs(old_s - s) < 0.00001:
-                break
+            s[index] = a[index] + 0.618 * (b[index] - a[index])
+            z[:, index] = self.legend_c(x, y[:, index], p, s[index])
+            up_down_rate[index] = count_nonzero(y[:, index] >= z[:, index], axis=0) / count_nonzero(y[:, index] < z[:, index], axis=0)
 
-            t += 1
+            searching[index[abs(old_s - s[index]) < 0.00001]] = False
+            searching &= abs(up_down_rate - r_ud) > eps
 
-        return squeeze(self.legend_c(x, y, p, s))
+        return z
 
     def t_rate(self, x):
         """Compute by cubic polynomial function. This function correlates the Up_Down_Ratio shows with the peak ratio, and this correlation is hardly influenced by the noise.
@@ -262,55 +303,105 @@ class Goldindec(SpectrumFunctionContainerBase):
 
         return 0.7679 + 11.2358 * x - 39.7064 * x ** 2 + 92.3583 * x ** 3
 
-    def legend_c(self, x, y, order, s):
-        """Compute p-order coefficients and return fitted line.
+    def projection(self, x, order):
+        """Compute the Vandermonde matrix of x rescaled to [-1, 1] and the matrix to solve for its coefficients.
+        The result depends only on x and order, so it is cached and reused for every "s" and every spectrum with the same x.
 
         Args:
             x (ndarray): Raman wave number. This array should be monotonically increasing and column vector.
-            y (ndarray): Raman intensity. This array should be column vector.
             order (int): the polynomial order.
-            s (float): positively correlated with the noise standard deviation.
 
         Returns:
-            [type]: [description]
+            tuple of ndarray: the Vandermonde matrix and its pseudo inverse.
         """
-        n = len(x)
+        key = (order, x.shape, x.tobytes())
+        if key in self.__projection_cache:
+            return self.__projection_cache[key]
 
         xmax = x.max(0)
         xmin = x.min(0)
-        ymax = y.max(0)
-        ymin = y.min(0)
-
         x = 2 * (x - xmax) / (xmax - xmin) + 1  # rescale to [-1, 1]
-        y = 2 * (y - ymax) / (ymax - ymin) + 1  # rescale to [-1, 1]
 
         p = array(range(0, order + 1))
         # The Vandermonde matrix of wave number x.
-        t = tile(x, (1, order + 1)) ** tile(p, (n, 1))
-
+        t = x ** p[newaxis, :]
         Tinv = pinv(t.T @ t) @ t.T
-        a = Tinv @ y  # The polynomial coefficients
-        z = t @ a
-        alpha = 0.99 * 1 / 2
 
-        zp = ones((n, 1))
-        d = zeros((n, 1))  # an auxiliary vector to solve for "a".
+        if len(self.__projection_cache) >= self.PROJECTION_CACHE_SIZE:
+            del self.__projection_cache[next(iter(self.__projection_cache))]
+
+        self.__projection_cache[key] = (t, Tinv)
+        return t, Tinv
 
-        while sum((z - zp) ** 2) / sum(zp ** 2) > 1e-9:
-            zp = z
-            residual = y - z
+    def legend_c(self, x, y, order, s):
+        """Compute p-order coefficients and return fitted line.
+
+        Args:
+            x (ndarray): Raman wave number. This array should be monotonically increasing and column vector.
+            y (ndarray): Raman intensity. Each column is a spectrum, so the shape should be (size of x, number of spectra).
+            order (int): the polynomial order.
+            s (float or ndarray): positively correlated with the noise standard deviation. If s is ndarray, each element is used for the corresponding column of y.
+
+        Returns:
+            ndarray: fitted lines. Each column is the line fitted to the corresponding column of y.
+        """
+        ymax = y.max(0)
+        ymin = y.min(0)
 
-            for num in range(n):
-                if residual[num] < s:
-                    d[num] = residual[num] * (2 * alpha - 1)
+        # rescale to [-1, 1] and transpose so that each row is a spectrum.
+        # "einsum" is used instead of "@" because its result of each row does not depend on the number of rows.
+        y = (2 * (y - ymax) / (ymax - ymin) + 1).T.copy()
+        s = s * ones(len(y))
 
-                elif residual[num] >= s:
-                    d[num] = -residual[num] - alpha * \
-                        (s ** 3) / (2 * residual[num] ** 2)
-            a = Tinv @ (y + d)
-            z = t @ a
+        t, Tinv = self.projection(x, order)
+        a = einsum('kn,pn->kp', y, Tinv)  # The polynomial coefficients
+        z = einsum('kp,np->kn', a, t)
+        alpha = 0.99 * 1 / 2
 
-        return reshape((z - 1) @ (ymax - ymin) / 2 + ymax, (n, 1))
+        zp = ones(y.shape)
+        index = flatnonzero(((z - zp) ** 2).sum(1) / (zp ** 2).sum(1) > 1e-9)
+        y_fit = y[index]
+        z_fit = z[index]
+        s_fit = s[index, newaxis]
+
+        while len(index) != 0:
+            zp = z_fit
+            residual = y_fit - zp
+
+            # an auxiliary vector to solve for "a".
+            over = residual >= s_fit
+            safe_residual = where(over, residual, 1)
+            d = where(over, -residual - alpha * (s_fit ** 3) / (2 * safe_residual ** 2), residual * (2 * alpha - 1))
+
+            a = einsum('kn,pn->kp', y_fit + d, Tinv)
+            z_fit = einsum('kp,np->kn', a, t)
+
+            converged = ~(((z_fit - zp) ** 2).sum(1) / (zp ** 2).sum(1) > 1e-9)
+            if converged.any():
+                z[index[converged]] = z_fit[converged]
+                index = index[~converged]
+                y_fit = y_fit[~converged]
+                z_fit = z_fit[~converged]
+                s_fit = s_fit[~converged]
+
+        return (z - 1).T * (ymax - ymin) / 2 + ymax
+
+    def BatchFunction(self, x, y_list, peaks_list):
+        """Batch version of "Function" for spectra sharing the same x. The baselines are estimated at once by "goldindec_batch".
+
+        :param x: xdata shared by the spectra
+        :type x: ndarray
+        :param y_list: ydata of the spectra. This can be a matrix whose rows are the spectra.
+        :type y_list: Iterable[ndarray]
+        :param peaks_list: peaks of the spectra
+        :type peaks_list: Iterable[PeakFunctionContainerList]
+        :return: Same as the return value of "Function" for each spectrum.
+        :rtype: List[Tuple[ndarray, ndarray, PeakFunctionContainerList]]
+        """
+        poly_order, ratio = self.GetArgs()
+        y_matrix = array(y_list, dtype=float, ndmin=2)
+        bg_matrix = self.goldindec_batch(x, y_matrix.T, poly_order, ratio)
+        return [self.__SubtractBackground(x, y, bg, peaks) for y, bg, peaks in zip(y_matrix, bg_matrix.T, peaks_list)]
 
     def SendRequireParams(self):
         return 'xyp'
@@ -405,24 +496,40 @@ class CurveFit(SpectrumFunctionContainerBase):
         self.__arg_buffer = {}
 
     def Function(self, args):
+        x, y, peaks, window, *thresholds = args
+        return self.__Fit(x, y, peaks, window, thresholds)
+
+    def SeededFunction(self, args, seed):
+        # The fit starts from the converged peaks of the neighbour, and falls back to the local guess if it fails.
+        x, y, peaks, window, *thresholds = args
+        if len(seed) == len(peaks) and len(peaks) != 0 and all(type(s) is type(p) for s, p in zip(seed, peaks)):
+            try:
+                return self.__Fit(x, y, peaks, window, thresholds, [list(s.GetArgs()) for s in seed])
+            except (RuntimeError, ValueError):
+                pass
+
+        return self.__Fit(x, y, peaks, window, thresholds)
+
+    def __Fit(self, x, y, peaks, window, thresholds, initial_args_list=None):
         if (peak_type := self.data_accessor.GetPeakType()) is None:
             raise AttributeError()
 
-        x, y, peaks, *thresholds = args
-
         if (peak_length := len(peaks)) == 0:
             return PeakFunctionContainerList()
 
         peak_arg_length = peak_type.GetArgumentLength()
 
-        culc_y_func = peak_type.GetFunction()
+        # All the peaks are calculated in a single broadcast. The analytic jacobian is used if the peak provides it.
+        peak_func_container = peak_type.GetPeakInstance()
 
         def culc_spectrum_value(xdata, *param):
-            values = []
-            for n in range(peak_length):
-                values.append(culc_y_func(xdata, param[peak_arg_length * n: peak_arg_length * (n + 1)]))
+            return peak_func_container.FunctionArray(xdata, reshape(param, (peak_length, peak_arg_length))).sum(axis=0)
 
-            return sum(values)
+        def culc_jacobian(xdata, *param):
+            derivative = peak_func_container.DerivativeArray(xdata, reshape(param, (peak_length, peak_arg_length)))
+            return derivative.reshape(peak_length * peak_arg_length, -1).T
+
+        jac = culc_jacobian if peak_func_container.HasDerivative() else None
 
         lower_threshold = [inf if t[0] is None else t[0] for t in thresholds]
         upper_threshold = [inf if t[1] is None else t[1] for t in thresholds]
@@ -437,26 +544,84 @@ class CurveFit(SpectrumFunctionContainerBase):
                 upper_bounds.append(min(v + ut, ub))
 
         bounds = [lower_bounds, upper_bounds]
-        p0 = sum([list(peak.GetArgs()) for peak in peaks], [])
+        if initial_args_list is None:
+            p0 = sum([list(peak.GetArgs()) for peak in peaks], [])
+        else:
+            # The bounds stay around the local guess, so the seed is clipped into them.
+            p0 = clip(sum(initial_args_list, []), lower_bounds, upper_bounds)
 
-        popt, _ = curve_fit(culc_spectrum_value, x, y, p0=p0, bounds=bounds, check_finite=True)
+        if window is None:
+            popt, _ = curve_fit(culc_spectrum_value, asarray(x, dtype=float), y, p0=p0, bounds=bounds, check_finite=True, jac=jac)
+        else:
+            popt = self.__WindowedFit(peak_func_container, asarray(x, dtype=float), asarray(y, dtype=float), p0, bounds, window, peak_length, peak_arg_length)
 
         for n, peak in enumerate(peaks):
             peak.SetArgs(popt[peak_arg_length * n: peak_arg_length * (n + 1)])
 
         return (peaks,)
 
+    def __WindowedFit(self, peak_func_container, x, y, p0, bounds, window, peak_length, peak_arg_length):
+        if window <= 0:
+            raise ValueError('"Window" should be larger than 0.')
+
+        # Each peak is calculated only within "window" times Wid of Ctr. The windows follow the parameters during the fit.
+        order = argsort(x)
+        sorted_x = x[order]
+
+        def culc_window(param_matrix):
+            ctr, wid = param_matrix[:, 1], param_matrix[:, 2]
+            start = searchsorted(sorted_x, ctr - window * wid, 'left')
+            count = searchsorted(sorted_x, ctr + window * wid, 'right') - start
+            offset = arange(max(count.max(), 1))
+            mask = offset < count[:, newaxis]
+            index = order[minimum(start[:, newaxis] + offset, len(order) - 1)]
+            return index, mask
+
+        # The peaks whose windows contain no point would be returned unchanged as if they were fitted.
+        _, mask = culc_window(reshape(p0, (peak_length, peak_arg_length)))
+        if len(empty_index := flatnonzero(~mask.any(axis=1))) != 0:
+            raise ValueError(f'No point of x is within "Window" of the peaks {empty_index.tolist()}.')
+
+        def culc_residual(param):
+            param_matrix = reshape(param, (peak_length, peak_arg_length))
+            index, mask = culc_window(param_matrix)
+            value = peak_func_container.FunctionArray(x[index], param_matrix)
+            return bincount(index[mask], value[mask], len(x)) - y
+
+        # The jacobian is sparse, and banded when the peaks are sorted by Ctr.
+        def culc_jacobian(param):
+            param_matrix = reshape(param, (peak_length, peak_arg_length))
+            index, mask = culc_window(param_matrix)
+            derivative = peak_func_container.DerivativeArray(x[index], param_matrix)
+            shape = derivative.shape
+            mask = broadcast_to(mask[:, newaxis, :], shape)
+            rows = broadcast_to(index[:, newaxis, :], shape)[mask]
+            cols = broadcast_to(arange(peak_length * peak_arg_length).reshape(peak_length, peak_arg_length, 1), shape)[mask]
+            return csr_matrix((derivative[mask], (rows, cols)), shape=(len(x), peak_length * peak_arg_length))
+
+        jac = culc_jacobian if peak_func_container.HasDerivative() else '2-point'
+        result = least_squares(culc_residual, p0, jac=jac, bounds=bounds)
+        if not result.success:
+            raise RuntimeError('Optimal parameters not found: ' + result.message)
+
+        return result.x
+
     def SendRequireParams(self):
         return 'xyp'
 
     def SendReturnParams(self):
         return 'p'
 
+    def IsGoodCondition(self, *args) -> bool:
+        window, *_ = args
+        return window is None or window > 0
+
     def OnPeakTypeChanged(self, event):
         peak_type = self.data_accessor.GetPeakType()
 
         arg_names = peak_type.GetArgumentNames()
-        self.arg_container_dict = {}
+        # "Window" is the multiple of Wid within which each peak is calculated. If None, the peaks are calculated over the whole x.
+        self.arg_container_dict = {'Window': self.arg_container_dict.get('Window', OptionalFloatContainer(None, 0, None))}
 
         for name in arg_names:
             key = name + ' threshold'
@@ -0,0 +1,344 @@
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from copy import deepcopy
+from importlib import import_module
+from inspect import getmembers, isabstract, isclass
+from json import load
+from logging import DEBUG, getLogger
+from os import cpu_count
+from os.path import abspath, basename, dirname, isdir, join
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from const import (CUSTOM, DECODE_ENCODING, DEFAULT, ENCODE_ENCODING,
+                   PEAK_TYPE, SELECTED_DECODE_FUNCTION,
+                   SELECTED_ENCODE_FUNCTION, SETTING_FILE_PATH,
+                   SPECTRUM_FUNCTION_PRESET_LIST)
+from core import LoadStorableObject, StorableObject
+from objects import (DEFAULT_DECODE_FUNCTION, DEFAULT_ENCODE_FUNCTION,
+                     DEFAULT_PEAK_TYPE, ArgumentContainerBase, DataContainer,
+                     DecodeFunctionContainerBase, EncodeFunctionContainerBase,
+                     FunctionContainerBase, PeakType, Preset, Project, Recipe,
+                     Spectrum, SpectrumFunctionContainerAccessorSnapshot,
+                     SpectrumFunctionContainerBase)
+from util import DotChain, DotNotationDict, GetFileName
+
+logger = getLogger('__main__').getChild(__name__)
+logger.setLevel(DEBUG)
+
+
+class HeadlessEngine:
+    """Engine that executes presets on experimental data without GUI.
+    The encode functions, the decode functions and the presets are the same as those registered in the application, but neither wx nor the managers are imported.
+    """
+    DEFAULT_MODULE_PATH_LIST: Tuple[str, ...] = (
+        'objects.py',
+        'defaultpeakfunction.py',
+        'defaultdecodefunction.py',
+        'defaultencodefunction.py',
+        'defaultspectrumfunction.py',
+        'defaultmappingfunction.py',
+    )
+
+    def __init__(self, setting_file_path: str = SETTING_FILE_PATH, plugin_path_list: Optional[Iterable[str]] = None):
+        """Default constructor
+
+        :param setting_file_path: Path to a file to read the setting. It is relative to this module like "IOManager", defaults to SETTING_FILE_PATH
+        :type setting_file_path: str, optional
+        :param plugin_path_list: Paths of the plugin modules to be imported in addition to the default modules. Plugins importing wx should not be given. Defaults to None
+        :type plugin_path_list: Optional[Iterable[str]], optional
+        """
+        dir_name = dirname(__file__)
+        plugin_path_list = [] if plugin_path_list is None else list(plugin_path_list)
+        class_list = self.__ImportClassList([join(dir_name, path) for path in HeadlessEngine.DEFAULT_MODULE_PATH_LIST] + plugin_path_list)
+
+        self.__storable_dict = {Class.__name__: Class for Class in class_list if issubclass(Class, StorableObject)}
+        self.__encode_function_dict = {Class.__name__: Class for Class in class_list if issubclass(Class, EncodeFunctionContainerBase)}
+        self.__decode_function_dict = {Class.__name__: Class for Class in class_list if issubclass(Class, DecodeFunctionContainerBase)}
+        setting_file_path = join(dir_name, setting_file_path)
+        self.__setting = self.__ImportSetting(setting_file_path)
+
+        # The arguments of some spectrum functions depend on the type of peak, so the setting is imported again after the type is known.
+        SpectrumFunctionContainerBase.SetDataAccessor(SpectrumFunctionContainerAccessorSnapshot(self.GetPeakType(), None, 0))
+        self.__setting = self.__ImportSetting(setting_file_path)
+
+    def GetPresetList(self) -> List[Preset]:
+        """Get the presets saved in the setting. This value is deepcopied.
+
+        :rtype: List[Preset]
+        """
+        return deepcopy(self.__GetSetting(SPECTRUM_FUNCTION_PRESET_LIST, []))
+
+    def GetPreset(self, name: str) -> Preset:
+        """Get the preset of the specified name.
+
+        :type name: str
+        :raises KeyError: Sent if the preset is not found.
+        :rtype: Preset
+        """
+        for preset in self.GetPresetList():
+            if preset.GetName() == name:
+                return preset
+
+        raise KeyError(f'Preset "{name}" was not found.')
+
+    def GetPeakType(self) -> PeakType:
+        """Get the type of peak selected in the setting.
+
+        :rtype: PeakType
+        """
+        return self.__GetSetting(PEAK_TYPE, DEFAULT_PEAK_TYPE)
+
+    def GetEncodeFunction(self, name: Optional[str] = None) -> EncodeFunctionContainerBase:
+        """Get an encode function. The arguments are the same as the setting if it is selected in the setting.
+
+        :param name: Name of the class. If None, the selected function is returned. Defaults to None
+        :type name: Optional[str], optional
+        :rtype: EncodeFunctionContainerBase
+        """
+        return self.__GetFunction(name, SELECTED_ENCODE_FUNCTION, DEFAULT_ENCODE_FUNCTION, self.__encode_function_dict)
+
+    def GetDecodeFunction(self, name: Optional[str] = None) -> DecodeFunctionContainerBase:
+        """Get a decode function. The arguments are the same as the setting if it is selected in the setting.
+
+        :param name: Name of the class. If None, the selected function is returned. Defaults to None
+        :type name: Optional[str], optional
+        :rtype: DecodeFunctionContainerBase
+        """
+        return self.__GetFunction(name, SELECTED_DECODE_FUNCTION, DEFAULT_DECODE_FUNCTION, self.__decode_function_dict)
+
+    def GetEncodeFunctionNameList(self) -> List[str]:
+        """Get the names of the registered encode functions.
+
+        :rtype: List[str]
+        """
+        return list(self.__encode_function_dict)
+
+    def GetDecodeFunctionNameList(self) -> List[str]:
+        """Get the names of the registered decode functions.
+
+        :rtype: List[str]
+        """
+        return list(self.__decode_function_dict)
+
+    def Encode(self, path_list: Iterable[str], encode_function: Optional[EncodeFunctionContainerBase] = None, encoding: Optional[str] = None, max_workers: Optional[int] = None) -> Project:
+        """Read the files in a process pool and create a project.
+
+        :param path_list: Paths of the files containing the experimental data.
+        :type path_list: Iterable[str]
+        :param encode_function: If None, the function selected in the setting is used. Defaults to None
+        :type encode_function: Optional[EncodeFunctionContainerBase], optional
+        :param encoding: Encoding of the files. If None, the encoding of the setting is used. Defaults to None
+        :type encoding: Optional[str], optional
+        :param max_workers: The number of worker processes. If None, the number of processors is used. Defaults to None
+        :type max_workers: Optional[int], optional
+        :return: Project containing the data which are read successfully, in the order of path_list.
+        :rtype: Project
+        """
+        path_list = list(path_list)
+        encode_function = self.GetEncodeFunction() if encode_function is None else encode_function
+        encoding = self.__GetSettingValue(ENCODE_ENCODING, 'utf-8') if encoding is None else encoding
+
+        # Only the latest data is used, so the history is not kept.
+        data_dict = {}
+        with ProcessPoolExecutor(max_workers) as executor:
+            future_dict = {executor.submit(encode_function.ExecutionFromFile, path, encoding): index for index, path in enumerate(path_list)}
+            for future in as_completed(future_dict):
+                index = future_dict[future]
+                path = path_list[index]
+                try:
+                    spectrum = Spectrum(*encode_function.GetSpectrumParams(future.result()))
+                except Exception as e:
+                    logger.error(f'{basename(path)} is failed.\n' + '\n'.join([str(arg) for arg in e.args]))
+                    continue
+
+                data = DataContainer(path, 1)
+                data.Append(spectrum, msg=path)
+                data_dict[index] = data
+
+        return Project(data_list=[data_dict[index] for index in sorted(data_dict)], peak_type=self.GetPeakType())
+
+    def Execute(self, project: Project, recipe: Recipe, max_workers: Optional[int] = None) -> Dict[int, str]:
+        """Apply the recipe to all the data of the project and execute it in a process pool.
+
+        :type project: Project
+        :type recipe: Recipe
+        :param max_workers: The number of worker processes. If None, the number of processors is used. Defaults to None
+        :type max_workers: Optional[int], optional
+        :return: Error messages of the failed data for each index.
+        :rtype: Dict[int, str]
+        """
+        data_list = project.GetDataList()
+        snapshot = SpectrumFunctionContainerAccessorSnapshot(project.GetPeakType(), recipe, len(data_list))
+        SpectrumFunctionContainerBase.SetDataAccessor(snapshot)
+
+        error_msg_dict = {}
+        recipe_dict = {}
+        with ProcessPoolExecutor(max_workers, initializer=Recipe.InitializeWorker, initargs=(snapshot, None)) as executor:
+            future_dict = {}
+            for index, data in enumerate(data_list):
+                data.ApplyRecipe(deepcopy(recipe))
+                recipe_dict[index] = data.Recipe
+                x, y = data.XY
+                future = executor.submit(recipe_dict[index].Execution, Spectrum(x, y, data.BackGround, data.Peaks), data.SuccessList)
+                future_dict[future] = index
+
+            for future in as_completed(future_dict):
+                index = future_dict[future]
+                data = data_list[index]
+                try:
+                    history, _, error_msg = future.result()
+                except Exception as e:
+                    history, error_msg = [], '\n'.join([str(arg) for arg in e.args]) or f'{data.Path} is failed.'
+
+                for spectrum, success_list, msg, return_params in history:
+                    data.Append(spectrum, recipe_dict[index], success_list, msg, return_params)
+
+                if error_msg is not None:
+                    logger.error(f'{basename(data.Path)} is failed.\n{error_msg}')
+                    error_msg_dict[index] = error_msg
+
+        return error_msg_dict
+
+    def Decode(self, project: Project, path: str, decode_function: Optional[DecodeFunctionContainerBase] = None, encoding: Optional[str] = None) -> List[str]:
+        """Output the project with a decode function in the same way as "ExportDialog".
+
+        :type project: Project
+        :param path: Path of the output file. If the function returns multiple files or the path is a directory, the files are written in the directory.
+        :type path: str
+        :param decode_function: If None, the function selected in the setting is used. Defaults to None
+        :type decode_function: Optional[DecodeFunctionContainerBase], optional
+        :param encoding: Encoding of the output files. If None, the encoding of the setting is used. Defaults to None
+        :type encoding: Optional[str], optional
+        :return: Paths of the written files
+        :rtype: List[str]
+        """
+        decode_function = self.GetDecodeFunction() if decode_function is None else decode_function
+        encoding = self.__GetSettingValue(DECODE_ENCODING, 'utf-8') if encoding is None else encoding
+
+        is_single_file, file_list = decode_function.ExecutionToFiles(project)
+        if is_single_file:
+            file_name, _ = file_list[0]
+            path_list = [join(path, file_name) if isdir(path) else path]
+        else:
+            if not isdir(path):
+                raise NotADirectoryError(f'"{path}" should be a directory, because {decode_function} outputs multiple files.')
+
+            path_list = [join(path, file_name) for file_name, _ in file_list]
+
+        for file_path, (_, contents) in zip(path_list, file_list):
+            with open(file_path, mode='w', encoding=encoding) as f:
+                f.write(contents)
+
+        return path_list
+
+    def __GetFunction(self, name, key, default, function_dict):
+        selected_function = self.__GetSetting(key, default)
+        if name is None or name == selected_function.__class__.__name__:
+            return deepcopy(selected_function)
+
+        if name not in function_dict:
+            raise KeyError(f'"{name}" is not registered.')
+
+        return function_dict[name]()
+
+    def __GetSetting(self, key, default=None):
+        # The same priority as "IOManager.GetSetting".
+        for setting_type in (DEFAULT, CUSTOM):
+            value = self.__setting.get(DotChain(setting_type, key), None)
+            if value is not None:
+                return value
+
+        return default
+
+    def __GetSettingValue(self, key, default):
+        value = self.__GetSetting(key, default)
+        return value.GetValue() if isinstance(value, ArgumentContainerBase) else value
+
+    def __ImportSetting(self, path):
+        try:
+            with open(path, mode='r', encoding='utf-8') as f:
+                return DotNotationDict(load(f, object_hook=self.__AsStorableObject))
+        except FileNotFoundError:
+            logger.warning(f'"{path}" was not found. The default setting is used.')
+            return DotNotationDict()
+
+    def __AsStorableObject(self, dct):
+        # The same format as "IOManager.AsStorableObject". Objects of unknown classes, like panels and plugins, are left as dict.
+        return LoadStorableObject(dct, self.__CreateStorableObject)
+
+    def __CreateStorableObject(self, class_name):
+        if class_name not in self.__storable_dict:
+            return None
+
+        obj = self.__storable_dict[class_name]()
+        if isinstance(obj, SpectrumFunctionContainerBase) and SpectrumFunctionContainerBase.data_accessor is not None:
+            obj.OnPeakTypeChanged(None)
+
+        return obj
+
+    def __ImportClassList(self, module_path_list):
+        class_list = []
+        for module_path in module_path_list:
+            abs_module_path = abspath(module_path)
+            dir_name = dirname(abs_module_path)
+            if dir_name not in sys.path:
+                sys.path.append(dir_name)
+
+            try:
+                module = import_module(GetFileName(abs_module_path))
+            except ModuleNotFoundError as e:
+                logger.error(f'"{module_path}" could not be imported.\n{e}')
+                continue
+
+            for _, value in getmembers(module):
+                if isclass(value) and issubclass(value, (FunctionContainerBase, StorableObject)) and not isabstract(value) and value not in class_list:
+                    class_list.append(value)
+
+        return class_list
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface of "HeadlessEngine".
+
+    :param argv: Command line arguments. If None, sys.argv is used. Defaults to None
+    :type argv: Optional[List[str]], optional
+    :return: Exit status. 1 if any file or data is failed.
+    :rtype: int
+    """
+    parser = ArgumentParser(description='Execute a preset of iSATex on experimental data without GUI.')
+    parser.add_argument('path', nargs='+', help='files containing the experimental data')
+    parser.add_argument('-p', '--preset', required=True, help='name of the preset saved in the setting')
+    parser.add_argument('-o', '--output', required=True, help='output file, or output directory if the decode function outputs multiple files')
+    parser.add_argument('--encode', default=None, help='name of the encode function. defaults to the selected one in the setting')
+    parser.add_argument('--decode', default=None, help='name of the decode function. defaults to the selected one in the setting')
+    parser.add_argument('--encoding', default=None, help='encoding of the input files. defaults to the setting')
+    parser.add_argument('--decode-encoding', default=None, help='encoding of the output files. defaults to the setting')
+    parser.add_argument('--setting', default=SETTING_FILE_PATH, help='setting file. defaults to %(default)s')
+    parser.add_argument('--plugin', nargs='*', default=[], help='plugin modules containing the functions used in the preset')
+    parser.add_argument('-j', '--jobs', type=int, default=cpu_count(), help='number of worker processes. defaults to %(default)s')
+    args = parser.parse_args(argv)
+
+    engine = HeadlessEngine(args.setting, args.plugin)
+    recipe = engine.GetPreset(args.preset)
+    project = engine.Encode(args.path, engine.GetEncodeFunction(args.encode), args.encoding, args.jobs)
+    if len(project.GetDataList()) == 0:
+        logger.error('No data was read.')
+        return 1
+
+    error_msg_dict = engine.Execute(project, recipe, args.jobs)
+    path_list = engine.Decode(project, args.output, engine.GetDecodeFunction(args.decode), args.decode_encoding)
+    print('\n'.join(path_list))
+
+    return int(len(project.GetDataList()) != len(args.path) or len(error_msg_dict) != 0)
+
+
+__all__ = [
+    'HeadlessEngine',
+]
+
+if __name__ == "__main__":
+    from logging import WARNING, basicConfig
+
+    basicConfig(level=WARNING)
+    sys.exit(main())
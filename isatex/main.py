@@ -63,7 +63,7 @@ class CoreManager(Singleton):
         self.__public_mgr_dict = self.__CreatePublicManager()
         self.__temp_setting[MANAGER_LIST] = lambda: list(self.__public_mgr_dict.values())
 
-        SpectrumFunctionContainerBase.data_accessor = SpectrumFunctionContainerAccessor(self.Get(DATA_MANAGER), self.Get(PEAK_MANAGER))
+        SpectrumFunctionContainerBase.SetDataAccessor(SpectrumFunctionContainerAccessor(self.Get(DATA_MANAGER), self.Get(PEAK_MANAGER)))
         self.__InitializePublicManagers()
         self.__RestoreStorableObjSetting()
 
@@ -1,24 +1,30 @@
-import sys
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from copy import deepcopy
 from datetime import date
 from glob import glob
-from importlib import import_module
-from inspect import getmembers, isclass, isfunction
+from hashlib import blake2b
+from inspect import isclass, isfunction
 from json import JSONEncoder, dumps, load, loads
 from json.decoder import JSONDecodeError
 from logging import DEBUG, getLogger
-from os import getcwd, mkdir
-from os.path import abspath, dirname, exists, join
+from os import SEEK_END, fsync, getcwd, mkdir, replace
+from os.path import abspath, dirname, exists, join, splitext
+from struct import calcsize, pack, unpack
 from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from zlib import compress, decompress
 
-from matplotlib.colors import Colormap
+from matplotlib.collections import LineCollection
+from matplotlib.colors import Colormap, to_rgb
+from matplotlib.image import AxesImage
 from matplotlib.lines import Line2D
-from numpy import inf, ndarray
+from numpy import (array, asarray, ascontiguousarray, dtype, frombuffer,
+                   fromfile, full, inf, memmap, nan, nanmax, nanmin, ndarray,
+                   zeros)
 from wx import (CANCEL, CENTRE, ICON_INFORMATION, ID_CANCEL, ID_CLOSE,
-                ITEM_NORMAL, NOT_FOUND, OK, LogError, Menu, MenuBar, MenuItem,
-                MessageDialog, NewIdRef, Window, wxEVT_COMMAND_MENU_SELECTED)
+                ITEM_NORMAL, NOT_FOUND, OK, CallLater, LogError, Menu, MenuBar,
+                MenuItem, MessageDialog, NewIdRef, SafeYield, Window,
+                wxEVT_COMMAND_MENU_SELECTED)
 from wx.lib.agw.aui.framemanager import (AUI_BUTTON_CLOSE,
                                          AUI_MGR_ALLOW_ACTIVE_PANE,
                                          AUI_MGR_ALLOW_FLOATING,
@@ -26,43 +32,50 @@ from wx.lib.agw.aui.framemanager import (AUI_BUTTON_CLOSE,
                                          AUI_MGR_TRANSPARENT_DRAG, AuiManager,
                                          AuiPaneInfo)
 
-from const import (ABOUT_MENU_ITEM, COLOR, COLOR_THEME,
-                   COLOR_THEME_FOLDER_PATH, COLOR_THEME_LIST, COLORMAP, CUSTOM,
-                   DATA_BUFFER_SIZE, DATA_MANAGER, DECODE, DECODE_ENCODING,
+from const import (ABOUT_MENU_ITEM, BINARY_SAVEFILE_ALIGNMENT,
+                   BINARY_SAVEFILE_EXTENSION, BINARY_SAVEFILE_GARBAGE_RATIO,
+                   COLOR, COLOR_THEME, COLOR_THEME_FOLDER_PATH,
+                   COLOR_THEME_LIST, COLORMAP, CUSTOM, DATA_BUFFER_SIZE,
+                   DATA_MANAGER, DECODE, DECODE_ENCODING,
                    DECODE_FUNCTION_CLASS_LIST, DEFAULT, DEFAULT_COLOR_THEME,
                    DEFAULT_COLORMAP, DELIMITER, DIRECTION, EDIT_MENU, ENCODE,
                    ENCODE_DELIMITER, ENCODE_ENCODING,
                    ENCODE_FUNCTION_CLASS_LIST, ENCODING, ERROR_COLOR,
-                   EVENT_LIST, EVENT_MANAGER, EVENT_RECEPTOR_CLASS_LIST,
+                   EVENT_COALESCING_INTERVAL, EVENT_LIST, EVENT_MANAGER,
+                   EVENT_RECEPTOR_CLASS_LIST, EXECUTION_EVENT_BATCH_SIZE,
                    EXIT_MENU_ITEM, EXPORT_MENU_ITEM, EXPORT_PLUGIN_MENU_ITEM,
                    FILE_MENU, FUNCTION, FUNCTION_CLASS_LIST, FUNCTION_MANAGER,
-                   HELP_MENU, ID_SAVE, IMPORT_PLUGIN_MENU_ITEM, LAYOUT,
-                   LAYOUT_MENU, LIST, MAIN_SELECTION_COLOR, MAIN_WINDOW,
-                   MANAGER_LIST, MAPPING, MAPPING_COLORMAP, MAPPING_DIRECTION,
-                   MAPPING_FUNCTION_CLASS_LIST, MAPPING_TABLE_SIZE,
-                   MAX_DATA_BUFFER_SIZE, MENU_ITEM_LIST, MENUBAR_MANAGER, NAME,
-                   NEW_MENU_ITEM, OPEN_MENU_ITEM, PANEL_CLASS_LIST,
-                   PANEL_MANAGER, PEAK_FUNCTION_CLASS_LIST, PEAK_MANAGER,
-                   PEAK_MENU, PEAK_TYPE, PERSPECTIVE_SETTING,
-                   PLUGIN_FOLDER_PATH, PLUGIN_MENU, PREFERENCE_MENU_ITEM,
-                   PRESET_LIST, PROJECT_MANAGER, PROJECT_MEMO_MENU_ITEM,
-                   PROJECT_MENU, SAVE_AS_MENU_ITEM, SAVE_ENCODING,
+                   HELP_MENU, IMPORT_PLUGIN_MENU_ITEM, LAYOUT, LAYOUT_MENU,
+                   LIST, MAIN_SELECTION_COLOR, MAIN_WINDOW, MANAGER_LIST,
+                   MAPPING, MAPPING_COLORMAP, MAPPING_DIRECTION,
+                   MAPPING_FUNCTION_CLASS_LIST, MAPPING_MANAGER,
+                   MAPPING_TABLE_SIZE, MAX_DATA_BUFFER_SIZE, MENU_ITEM_LIST,
+                   MENUBAR_MANAGER, MODULE_MANIFEST_PATH,
+                   MULTI_DRAW_DENSITY_THRESHOLD, NAME, NEW_MENU_ITEM,
+                   OPEN_MENU_ITEM, PANEL_CLASS_LIST, PANEL_MANAGER,
+                   PEAK_FUNCTION_CLASS_LIST, PEAK_MANAGER, PEAK_MENU,
+                   PEAK_TYPE, PERSPECTIVE_SETTING, PLUGIN_FOLDER_PATH,
+                   PLUGIN_MENU, PREFERENCE_MENU_ITEM, PRESET_LIST,
+                   PROJECT_MANAGER, PROJECT_MEMO_MENU_ITEM, PROJECT_MENU,
+                   RESULT_CACHE_MEMORY_BUDGET, SAVE_AS_MENU_ITEM,
+                   SAVE_ENCODING, SAVE_MARKER_CLASS_NAME, SAVE_MARKER_DATA,
                    SAVE_MENU_ITEM, SELECTED, SELECTED_DECODE_FUNCTION,
                    SELECTED_ENCODE_FUNCTION, SELECTED_LAYOUT,
                    SELECTED_MAPPING_FUNCTION, SELECTION_COLOR, SEPARATOR,
                    SETTING_FILE_PATH, SETTING_STORABLE_OBJECT_CLASS_LIST, SHOW,
                    SHOW_PANEL_MENU, SPECTRUM, SPECTRUM_FUNCTION_CLASS_LIST,
                    SPECTRUM_FUNCTION_PRESET_LIST, SPECTRUM_LAYOUT,
-                   SPECTRUM_PANEL, STORABLE_OBJECT_DICT, SUCCESS_COLOR,
-                   TABLE_SIZE, TEMPORARY, TUTORIAL_MENU_ITEM, UNKNOWN,
-                   VIEW_MENU, WINDOW_SIZE)
+                   SPECTRUM_PANEL, SPECTRUM_VIEW_LIMIT_TOLERANCE,
+                   STORABLE_OBJECT_DICT, SUCCESS_COLOR, TABLE_SIZE, TEMPORARY,
+                   TUTORIAL_MENU_ITEM, UNKNOWN, VIEW_MENU, WINDOW_SIZE)
 from container import (CustomCheckMenuItemBase, CustomMenuItemBase,
                        CustomNormalMenuItemBase, CustomRadioMenuItemBase,
                        EventReceptorBase, LayoutMenuItem, PanelBase,
                        PeakMenuItem, ShowPanelMenuItem)
-from control import SaveCheckDialog
-from core import (CommunicableObjectBase, RestrictedStorableListBase,
-                  SettingStorableObjectBase, StorableObject, iSATexObject)
+from control import ID_SAVE, SaveCheckDialog
+from core import (CommunicableObjectBase, LoadStorableObject,
+                  RestrictedStorableListBase, SettingStorableObjectBase,
+                  StorableObject, iSATexObject)
 from defaultevent import (ColormapChangeEvent, ColorRegisterEvent,
                           ColorSelectionEvent, DataContentsChangeEvent,
                           DataSelectionChangeEvent, DecodeEvent,
@@ -116,15 +129,16 @@ from objects import (DEFAULT_BUFFER_SIZE, DEFAULT_DECODE_FUNCTION,
                      DEFAULT_MAPPING_FUNCTION, DEFAULT_PEAK_TYPE,
                      NEW_PROJECT_NAME, ArgumentContainerBase,
                      BoundedArgumentContainerBase, ChoiceContainer,
-                     DataContainer, DecodeFunctionContainerBase,
-                     EncodeFunctionContainerBase, FunctionContainerBase,
-                     IntContainer, MappingFunctionContainerBase,
-                     PeakFunctionContainerBase, PeakFunctionContainerList,
-                     PeakType, Preset, Project, Recipe, Spectrum,
-                     SpectrumFunctionContainerBase)
-from util import (Camel2Pascal, DotChain, DotNotationDict,
-                  FindWindowToAncestors, GetFileName, GetShowPanelLabel,
-                  HasValidElement, Singleton)
+                     CountDensity, DataContainer, DecimateMinMax,
+                     DecodeFunctionContainerBase, EncodeFunctionContainerBase,
+                     ExecutePeaks, FunctionContainerBase, IntContainer,
+                     MappingFunctionContainerBase, PeakFunctionContainerBase,
+                     PeakFunctionContainerList, PeakSnapshot, PeakTable,
+                     PeakType, Preset, Project, Recipe, RecipeResultCache,
+                     Spectrum, SpectrumFunctionContainerBase, StackSpectra)
+from util import (Camel2Pascal, ClassRegistry, DotChain, DotNotationDict,
+                  FindWindowToAncestors, GetShowPanelLabel, HasValidElement,
+                  Singleton)
 
 logger = getLogger('__main__').getChild(__name__)
 logger.setLevel(DEBUG)
@@ -135,15 +149,20 @@ class IOManager(Singleton):
     This class manages the external communication.
     The communication is mainly for configuring the application and loading and saving experimental data.
     """
-    SAVE_MARKER_CLASS_NAME: str = '0__SAVE_CLASS_NAME__'
-    SAVE_MARKER_DATA: str = '1__SAVE_DATA__'
+    SAVE_MARKER_CLASS_NAME: str = SAVE_MARKER_CLASS_NAME
+    SAVE_MARKER_DATA: str = SAVE_MARKER_DATA
+    BINARY_SAVE_MAGIC: bytes = b'iSATexB\x00'
+    BINARY_SAVE_PREFIX_FORMAT: str = '<8sQQ'
+    BINARY_SAVE_VERSION: int = 1
 
-    def __init__(self, setting_file_path: str, core_mgr):
+    def __init__(self, setting_file_path: str, core_mgr, manifest_path: Optional[str] = MODULE_MANIFEST_PATH):
         """Default constructor
 
         :param setting_file_path: Path to a file to read the setting.
         :type setting_file_path: str
         :type core_mgr: CoreManager
+        :param manifest_path: Path of the manifest caching the classes of the modules. It is relative to this module. If None, the manifest is not used. Defaults to MODULE_MANIFEST_PATH
+        :type manifest_path: Optional[str], optional
         """
         super().__init__()
         self.__id = NewIdRef()
@@ -155,6 +174,7 @@ class IOManager(Singleton):
         dir_name = dirname(__file__)
 
         default_path_list = [
+            'core.py',
             'objects.py',
             'container.py',
             'defaultevent.py',
@@ -190,14 +210,15 @@ class IOManager(Singleton):
             LayoutMenuItem,
         ]
 
+        # Only the names are collected here. The modules are imported when their classes are requested.
         plugin_path_list = self.__GetPluginPathList()
-        iSATex_obj_list = self.__ImportObjectList(default_path_list + plugin_path_list, iSATexObject, exclude_class_list)
-
-        storable_object_list = [Class() for Class in iSATex_obj_list if isclass(Class) and issubclass(Class, StorableObject) and Class not in exclude_class_list]
-        storable_dict = {storable_object.__class__.__name__: storable_object for storable_object in storable_object_list}
+        self.__registry = ClassRegistry([join(dir_name, path) for path in default_path_list] + plugin_path_list, None if manifest_path is None else join(dir_name, manifest_path))
+        self.__exclude_class_name_set = {Class.__name__ for Class in exclude_class_list}
+        self.__storable_object_dict = {}
+        self.__object_list_dict = {}
 
         self.__temp_setting = DotNotationDict()
-        self.__temp_setting.forced_setitem(STORABLE_OBJECT_DICT, storable_dict)
+        self.__temp_setting.forced_setitem(STORABLE_OBJECT_DICT, lambda: {class_name: self.__GetStorableObject(class_name) for class_name in self.__GetClassNameList(StorableObject)})
 
         dir_name = dirname(__file__)
         self.__setting = self.__ImportSetting(join(dir_name, setting_file_path))
@@ -217,18 +238,7 @@ class IOManager(Singleton):
         )
 
         for key, BaseClass, instanced in class_import_design:
-            obj_list = []
-            for iSATex_obj in iSATex_obj_list:
-                if instanced:
-                    if not isinstance(iSATex_obj, BaseClass):
-                        continue
-                else:
-                    if not (isclass(iSATex_obj) and issubclass(iSATex_obj, BaseClass) or iSATex_obj in exclude_class_list):
-                        continue
-
-                obj_list.append(iSATex_obj)
-
-            self.__temp_setting.forced_setitem(key, obj_list)
+            self.__temp_setting.forced_setitem(key, lambda key=key, BaseClass=BaseClass, instanced=instanced: self.__GetObjectList(key, BaseClass, instanced))
 
         color_theme_list = []
         for path in self.__GetColorThemePathList():
@@ -486,55 +496,77 @@ class IOManager(Singleton):
 
         return glob(f'{path}**/*.json', recursive=True)
 
-    def __ImportObjectList(self, module_path_list, BaseClass, ExcludeClass=None):
-        ExcludeClass = tuple(ExcludeClass)
-
-        def is_match(x):
-            if isclass(x):
-                return issubclass(x, BaseClass) and (ExcludeClass is None or x not in ExcludeClass)
+    def __GetObjectList(self, key, BaseClass, instanced):
+        # The modules defining the objects are imported at the first request, and the objects are kept.
+        if key not in self.__object_list_dict:
+            if instanced:
+                name_list = self.__registry.GetInstanceNameList(BaseClass.__name__)
+                obj_list = self.__ImportObjectList(name_list, self.__registry.GetInstance)
+                obj_list = [obj for obj in obj_list if isinstance(obj, BaseClass)]
             else:
-                return isinstance(x, BaseClass)
+                obj_list = self.__ImportObjectList(self.__GetClassNameList(BaseClass), self.__registry.GetClass)
+                obj_list = [obj for obj in obj_list if isclass(obj) and issubclass(obj, BaseClass)]
+
+            self.__object_list_dict[key] = obj_list
+
+        return list(self.__object_list_dict[key])
+
+    def __GetClassNameList(self, BaseClass):
+        base_class_list = BaseClass if isinstance(BaseClass, tuple) else (BaseClass,)
+        return [class_name for class_name in self.__registry.GetClassNameList(iSATexObject.__name__) if class_name not in self.__exclude_class_name_set and any([self.__registry.IsSubclass(class_name, Base.__name__) for Base in base_class_list])]
 
+    def __ImportObjectList(self, name_list, GetObject):
         obj_list = []
-        for module_path in module_path_list:
-            abs_module_path = abspath(module_path)
-            dir_name = dirname(abs_module_path)
-            module_name = GetFileName(abs_module_path)
-            if dir_name not in sys.path:
-                sys.path.append(dir_name)
+        for name in name_list:
             try:
-                module = import_module(module_name)
-            except ModuleNotFoundError:
-                LogError(f'"{module_name}" module was not found.\n Please check the "setting.json"')
-                continue
-
-            for _, value in getmembers(module):
-                if is_match(value):
-                    obj_list.append(value)
+                obj_list.append(GetObject(name))
+            except ModuleNotFoundError as e:
+                LogError(f'"{e.name}" module was not found.\n Please check the "setting.json"')
 
         return obj_list
 
-    def OpenProject(self, path: str) -> Project:
-        """Load an existing project.
+    def __GetStorableObject(self, class_name):
+        # Only the classes referred to by the setting or the project are instantiated.
+        if class_name not in self.__storable_object_dict:
+            if class_name in self.__exclude_class_name_set or not self.__registry.IsSubclass(class_name, StorableObject.__name__):
+                raise KeyError(class_name)
+
+            self.__storable_object_dict[class_name] = self.__registry.GetClass(class_name)()
+
+        return self.__storable_object_dict[class_name]
+
+    def OpenProject(self, path: str, lazy: bool = True) -> Project:
+        """Load an existing project. Both the binary format and the json format are supported, they are distinguished by the leading bytes of the file.
 
         :param path: Path to an existing project
         :type path: str
+        :param lazy: If True, the arrays of the binary format are memory-mapped and read from the file only when they are accessed. defaults to True
+        :type lazy: bool, optional
         :rtype: Project
         """
         with open(path, mode='rb') as f:
+            if f.read(len(IOManager.BINARY_SAVE_MAGIC)) == IOManager.BINARY_SAVE_MAGIC:
+                return self.__OpenBinaryProject(f, path, lazy)
+
+            f.seek(0)
             compressed_contents = f.read()
 
         contents = decompress(compressed_contents).decode(SAVE_ENCODING, 'replace')
         return loads(contents, object_hook=self.AsStorableObject)
 
-    def SaveProject(self, project: Project):
-        """Save the project.
+    def SaveProject(self, project: Project, dirty_index_list: Optional[Iterable[int]] = None):
+        """Save the project. If the extension of the path is BINARY_SAVEFILE_EXTENSION, the project is saved in the binary format, otherwise in the json format.
 
         :type project: Project
+        :param dirty_index_list: Index list of the data changed since the project was last saved to the same path. If specified and the existing file is in the binary format, only these data are appended to the file. Otherwise, the whole project is written. defaults to None
+        :type dirty_index_list: Optional[Iterable[int]], optional
         """
         if not isinstance(project, Project):
             raise TypeError()
 
+        if splitext(project.GetPath())[1].lower() == BINARY_SAVEFILE_EXTENSION:
+            return self.__SaveBinaryProject(project, dirty_index_list)
+
         contents = dumps(project, separators=(',', ':'), allow_nan=False, cls=IOManager.iSATexJsonEncoder)
         compressed_contents = compress(contents.encode(SAVE_ENCODING, 'replace'))
 
@@ -543,6 +575,247 @@ class IOManager(Singleton):
         with open(path, mode='wb') as f:
             f.write(compressed_contents)
 
+    def __OpenBinaryProject(self, f, path: str, lazy: bool) -> Project:
+        header, _ = self.__ReadBinaryHeader(f, self.AsStorableObject)
+        block_list = header['blocks']
+        file_map = memmap(f, mode='r') if lazy else None
+
+        def read_block(block_index):
+            offset, dtype_str, size = block_list[block_index]
+            if lazy:
+                return frombuffer(file_map, dtype=dtype_str, count=size, offset=offset)
+
+            f.seek(offset)
+            return fromfile(f, dtype=dtype_str, count=size)
+
+        peak_class_list = header['peak_classes']
+        peak_table_dict = {}
+        # The tables are copied into the peaks at once if the registered peaks have the arguments in the same order and can be stored in "PeakTable".
+        peak_prototype_list = [self.SearchStorableObject(class_name) for class_name, _, _ in peak_class_list]
+        is_same_order = all(PeakTable.IsStorable(peak) and peak.GetArgumentNames() == tuple(arg_name_list) for peak, (_, arg_name_list, _) in zip(peak_prototype_list, peak_class_list))
+
+        # x is shared between spectra measured on the same grid.
+        x_dict = {}
+        data_list = []
+        for record in header['data']:
+            if 'peak_range' in record:
+                table_index, start, stop = record['peak_range']
+                if table_index not in peak_table_dict:
+                    peak_class_index_block, peak_args_block, peak_args_width = header['peak_tables'][table_index]
+                    peak_table_dict[table_index] = (read_block(peak_class_index_block), read_block(peak_args_block).reshape(-1, peak_args_width))
+
+                peak_class_index_array, peak_args_matrix = peak_table_dict[table_index]
+                peaks = PeakFunctionContainerList()
+                if is_same_order:
+                    peaks.ExtendArray(peak_prototype_list, peak_class_index_array[start:stop], peak_args_matrix[start:stop])
+                else:
+                    for class_index, args in zip(peak_class_index_array[start:stop], peak_args_matrix[start:stop]):
+                        class_name, arg_name_list, kinds = peak_class_list[class_index]
+                        peak = self.SearchStorableObject(class_name)
+                        peak.ReceiveSaveData({name: int(value) if kind == 'i' else float(value) for name, value, kind in zip(arg_name_list, args, kinds)})
+                        peaks.append(peak)
+
+            else:
+                peaks = record['peaks']
+
+            if record['x'] not in x_dict:
+                x_dict[record['x']] = read_block(record['x'])
+
+            # The blocks are memory-mapped or read into new arrays, so they are held without copying.
+            spectrum = Spectrum(x_dict[record['x']], read_block(record['y']), read_block(record['bg']), peaks, copy=False)
+            recipe = deepcopy(header['recipes'][record['recipe']])
+
+            data = self.SearchStorableObject(DataContainer.__name__)
+            data.ReceiveSaveData((record['path'], (spectrum, recipe, record['success'], record['msg'])))
+            data_list.append(data)
+
+        project = self.SearchStorableObject(Project.__name__)
+        project.ReceiveSaveData((path, header['note'], header['peak_type'], data_list, header['date']))
+        return project
+
+    def __SaveBinaryProject(self, project: Project, dirty_index_list: Optional[Iterable[int]]):
+        path, note, peak_type, data_list, date_value = project.SendSaveData()
+
+        if dirty_index_list is not None and exists(path):
+            with open(path, mode='r+b') as f:
+                header, header_length = self.__ReadBinaryHeader(f)
+                if header is not None and len(header['data']) == len(data_list):
+                    header['garbage'] += header_length
+                    if header['garbage'] <= f.seek(0, SEEK_END) * BINARY_SAVEFILE_GARBAGE_RATIO:
+                        self.__WriteBinaryData(f, header, data_list, dirty_index_list)
+                        self.__WriteBinaryHeader(f, header, note, peak_type, date_value)
+                        return
+
+        temp_path = f'{path}.tmp'
+        with open(temp_path, mode='wb') as f:
+            f.write(bytes(calcsize(IOManager.BINARY_SAVE_PREFIX_FORMAT)))
+
+            header = {
+                'version': IOManager.BINARY_SAVE_VERSION,
+                'garbage': 0,
+                'blocks': [],
+                'shared_blocks': {},
+                'recipes': [],
+                'peak_classes': [],
+                'peak_tables': [],
+                'data': [None] * len(data_list),
+            }
+            self.__WriteBinaryData(f, header, data_list, range(len(data_list)))
+            self.__WriteBinaryHeader(f, header, note, peak_type, date_value)
+
+        # The file being replaced may be memory-mapped by the data. x shared between the data stays shared.
+        memo = {}
+        for data in data_list:
+            data.Load(memo)
+
+        replace(temp_path, path)
+
+    def __ReadBinaryHeader(self, f, object_hook=None) -> Tuple[Optional[dict], int]:
+        # Returns (None, 0) if the file is not in the binary format.
+        f.seek(0)
+        prefix = f.read(calcsize(IOManager.BINARY_SAVE_PREFIX_FORMAT))
+        if not prefix.startswith(IOManager.BINARY_SAVE_MAGIC) or len(prefix) != calcsize(IOManager.BINARY_SAVE_PREFIX_FORMAT):
+            return None, 0
+
+        _, header_offset, header_length = unpack(IOManager.BINARY_SAVE_PREFIX_FORMAT, prefix)
+        f.seek(header_offset)
+        header = loads(f.read(header_length).decode(SAVE_ENCODING, 'replace'), object_hook=object_hook)
+        if header['version'] > IOManager.BINARY_SAVE_VERSION:
+            raise ValueError(f'Version {header["version"]} of the project file is not supported.')
+
+        return header, header_length
+
+    def __WriteBinaryData(self, f, header: dict, data_list: List[DataContainer], index_list: Iterable[int]):
+        # Appends the blocks of the specified data to the end of the file and updates the header.
+        block_list = header['blocks']
+        shared_block_dict = header['shared_blocks']
+        recipe_list = header['recipes']
+        recipe_dict = {dumps(recipe, separators=(',', ':'), allow_nan=False, cls=IOManager.iSATexJsonEncoder): i for i, recipe in enumerate(recipe_list)}
+        peak_class_list = header['peak_classes']
+        peak_class_dict = {(class_name, kinds): i for i, (class_name, _, kinds) in enumerate(peak_class_list)}
+        peak_class_index_list = []
+        peak_args_list = []
+        record_list = header['data']
+        table_index = len(header['peak_tables'])
+
+        f.seek(0, SEEK_END)
+
+        def write_block(array):
+            array = ascontiguousarray(array)
+            array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+            f.write(bytes(-f.tell() % BINARY_SAVEFILE_ALIGNMENT))
+            block_list.append((f.tell(), array.dtype.str, array.size))
+            f.write(array.data)
+            return len(block_list) - 1
+
+        def write_shared_block(array):
+            array = ascontiguousarray(array)
+            key = f'{array.dtype.str}:{array.size}:{blake2b(array.data, digest_size=16).hexdigest()}'
+            if key not in shared_block_dict:
+                shared_block_dict[key] = write_block(array)
+
+            return shared_block_dict[key]
+
+        def get_block_nbytes(block_index):
+            _, dtype_str, size = block_list[block_index]
+            return dtype(dtype_str).itemsize * size
+
+        # The blocks of the replaced records are counted as garbage. The rows of the peak tables are counted, because the tables are shared by the records of the same save.
+        replaced_x_block_set = set()
+        for index in index_list:
+            if (previous_record := record_list[index]) is not None:
+                header['garbage'] += get_block_nbytes(previous_record['y']) + get_block_nbytes(previous_record['bg'])
+                replaced_x_block_set.add(previous_record['x'])
+                if 'peak_range' in previous_record:
+                    previous_table_index, start, stop = previous_record['peak_range']
+                    peak_class_index_block, peak_args_block, peak_args_width = header['peak_tables'][previous_table_index]
+                    row_nbytes = dtype(block_list[peak_class_index_block][1]).itemsize + dtype(block_list[peak_args_block][1]).itemsize * peak_args_width
+                    header['garbage'] += row_nbytes * (stop - start)
+
+            data_path, (spectrum, recipe, success_list, msg) = data_list[index].SendSaveData()
+            x, y = spectrum.XYView
+
+            record = {
+                'path': data_path,
+                'x': write_shared_block(x),
+                'y': write_block(y),
+                'bg': write_block(spectrum.BackGroundView),
+                'success': success_list,
+                'msg': msg,
+            }
+
+            recipe_key = dumps(recipe, separators=(',', ':'), allow_nan=False, cls=IOManager.iSATexJsonEncoder)
+            if recipe_key not in recipe_dict:
+                recipe_dict[recipe_key] = len(recipe_list)
+                recipe_list.append(recipe)
+
+            record['recipe'] = recipe_dict[recipe_key]
+
+            peak_row_list = self.__GetPeakRowList(spectrum.PeaksView, peak_class_dict, peak_class_list)
+            if peak_row_list is None:
+                record['peaks'] = spectrum.Peaks
+
+            else:
+                record['peak_range'] = (table_index, len(peak_class_index_list), len(peak_class_index_list) + len(peak_row_list))
+                for class_index, args in peak_row_list:
+                    peak_class_index_list.append(class_index)
+                    peak_args_list.append(args)
+
+            record_list[index] = record
+
+        # The shared x blocks no longer referred to are counted once, and are not reused by the later saves.
+        unreferenced_x_block_set = replaced_x_block_set - {record['x'] for record in record_list if record is not None}
+        for key, block_index in list(shared_block_dict.items()):
+            if block_index in unreferenced_x_block_set:
+                header['garbage'] += get_block_nbytes(block_index)
+                del shared_block_dict[key]
+
+        peak_args_width = max([len(peak_class[1]) for peak_class in peak_class_list], default=0)
+        peak_args_matrix = full((len(peak_args_list), peak_args_width), nan)
+        for row, args in zip(peak_args_matrix, peak_args_list):
+            row[:len(args)] = args
+
+        header['peak_tables'].append((write_block(array(peak_class_index_list, dtype='<i4')), write_block(peak_args_matrix), peak_args_width))
+
+    def __WriteBinaryHeader(self, f, header: dict, note: str, peak_type: PeakType, date_value: str):
+        # The prefix is rewritten last, so the previous header stays valid until the new one is completely written.
+        header['note'] = note
+        header['peak_type'] = peak_type
+        header['date'] = date_value
+        contents = dumps(header, separators=(',', ':'), allow_nan=False, cls=IOManager.iSATexJsonEncoder).encode(SAVE_ENCODING, 'replace')
+
+        f.seek(0, SEEK_END)
+        f.write(bytes(-f.tell() % BINARY_SAVEFILE_ALIGNMENT))
+        header_offset = f.tell()
+        f.write(contents)
+        f.flush()
+        fsync(f.fileno())
+
+        f.seek(0)
+        f.write(pack(IOManager.BINARY_SAVE_PREFIX_FORMAT, IOManager.BINARY_SAVE_MAGIC, header_offset, len(contents)))
+
+    def __GetPeakRowList(self, peaks: Iterable[PeakSnapshot], peak_class_dict: dict, peak_class_list: list) -> Optional[List[Tuple[int, Tuple[Union[int, float], ...]]]]:
+        # Returns None if the peaks can not be stored in the numeric table.
+        row_list = []
+        for peak in peaks:
+            args = peak.GetArgs()
+            if any([isinstance(value, bool) or not isinstance(value, (int, float)) for value in args]):
+                return None
+
+            class_name = peak.GetPeakClass().__name__
+            kinds = ''.join(['i' if isinstance(value, int) else 'f' for value in args])
+            if (class_name, kinds) not in peak_class_dict:
+                arg_name_list = self.SearchStorableObject(class_name).GetArgumentNames()
+                if len(arg_name_list) != len(args):
+                    return None
+
+                peak_class_dict[(class_name, kinds)] = len(peak_class_list)
+                peak_class_list.append((class_name, arg_name_list, kinds))
+
+            row_list.append((peak_class_dict[(class_name, kinds)], args))
+
+        return row_list
+
     # def ImportPlugin(self, path):
     #     """[summary]
 
@@ -561,7 +834,7 @@ class IOManager(Singleton):
         :type class_name: str
         :rtype: StorableObject
         """
-        return deepcopy(self.GetSetting(STORABLE_OBJECT_DICT)[class_name])
+        return deepcopy(self.__GetStorableObject(class_name))
 
     def AsStorableObject(self, dct: dict) -> StorableObject:
         """Convert json to storable object
@@ -570,14 +843,7 @@ class IOManager(Singleton):
         :type dct: dict
         :rtype: StorableObject
         """
-        if IOManager.SAVE_MARKER_CLASS_NAME not in dct or IOManager.SAVE_MARKER_DATA not in dct:
-            return dct
-
-        class_name = dct[IOManager.SAVE_MARKER_CLASS_NAME]
-        save_data = dct[IOManager.SAVE_MARKER_DATA]
-        obj = self.SearchStorableObject(class_name)
-        obj.ReceiveSaveData(save_data)
-        return obj
+        return LoadStorableObject(dct, self.SearchStorableObject)
 
     class iSATexJsonEncoder(JSONEncoder):
         """Class for converting iSATex to json files
@@ -634,6 +900,10 @@ class EventManager(Singleton):
         self.__event_list = []
 
         self.__event_receptor_list = []
+        self.__dispatch_dict = {}
+
+        self.__pending_event_list = []
+        self.__flush_timer = None
 
     def GetEventList(self) -> Iterable[iSATexEventBinder]:
         """Get a list of registered events.
@@ -667,17 +937,53 @@ class EventManager(Singleton):
         if not HasValidElement(event_receptor_list, EventReceptorBase):
             raise TypeError()
 
+        # The receptors are kept in the order of reception, and the receptors of each event are looked up again.
         self.__event_receptor_list.extend(event_receptor_list)
+        self.__event_receptor_list.sort(key=self.GetReceptionOrder)
+        self.__dispatch_dict.clear()
 
     def SendEvent(self, event):
         """
         This function sends an event to an instance of the "PanelBase" class and to the manager.
         Note that the event will not be sent until the project is started.
+        The data selection and data contents events are held for "EVENT_COALESCING_INTERVAL" milliseconds, and consecutive events of the same kind fired in the meantime are merged into one event.
 
         :param event: Event object to be sent.
         :type event: Any type
         """
         logger.debug(f'Event of {event.__class__.__name__} is occur.')
+        if isinstance(event, (DataSelectionChangeEvent, DataContentsChangeEvent)):
+            self.__HoldEvent(event)
+            return
+
+        # The held events are sent first so that the order of events does not change.
+        self.FlushEvent()
+        self.__DispatchEvent(event)
+
+    def FlushEvent(self):
+        """Send the data selection and data contents events held for coalescing immediately.
+        """
+        if self.__flush_timer is not None:
+            self.__flush_timer.Stop()
+            self.__flush_timer = None
+
+        pending_event_list, self.__pending_event_list = self.__pending_event_list, []
+        for event in pending_event_list:
+            self.__DispatchEvent(event)
+
+    def __HoldEvent(self, event):
+        # A burst of the same event within the interval is merged into one event, and sent when the interval has elapsed.
+        # Only consecutive events are merged, so that the order of the different kinds of events is kept.
+        pending_event = self.__pending_event_list[-1] if len(self.__pending_event_list) != 0 else None
+        if pending_event is not None and pending_event.__class__ is event.__class__ and pending_event.GetId() == event.GetId():
+            self.__pending_event_list[-1] = pending_event.Merge(event)
+        else:
+            self.__pending_event_list.append(event)
+
+        if self.__flush_timer is None:
+            self.__flush_timer = CallLater(EVENT_COALESCING_INTERVAL, self.FlushEvent)
+
+    def __DispatchEvent(self, event):
         self.__core_mgr.OnEvent(event)
         for manager in self.__core_mgr.Get(MANAGER_LIST, []):
             if not hasattr(manager, 'OnEvent'):
@@ -692,9 +998,36 @@ class EventManager(Singleton):
         :type event: iSATexEvent
         """
         event.Skip()
-        receptor_list = sorted(self.__event_receptor_list, key=lambda x: self.GetReceptionOrder(x))
-        for receptor in receptor_list:
-            receptor.OnEvent(event)
+        key = (event.__class__, event.GetEventType())
+        if key not in self.__dispatch_dict:
+            self.__dispatch_dict[key] = self.__CreateDispatchList(event)
+
+        for receptor, name_list in self.__dispatch_dict[key]:
+            if name_list is None:
+                receptor.OnEvent(event)
+                continue
+
+            if event.GetId() == receptor.GetId():
+                continue
+
+            for name in name_list:
+                receptor.CallEventHandler(name, event)
+
+    def __CreateDispatchList(self, event):
+        # Only the receptors overriding at least one of the handlers called for the event are notified.
+        handler_name_list = EventReceptorBase.GetEventHandlerNameList(event)
+        dispatch_list = []
+        for receptor in self.__event_receptor_list:
+            Receptor = receptor.__class__
+            if Receptor.OnEvent is not EventReceptorBase.OnEvent:
+                dispatch_list.append((receptor, None))
+                continue
+
+            name_list = tuple([name for name in handler_name_list if getattr(Receptor, name) is not getattr(EventReceptorBase, name)])
+            if len(name_list) > 0:
+                dispatch_list.append((receptor, name_list))
+
+        return dispatch_list
 
     def GetReceptionOrder(self, receptor: EventReceptorBase) -> int:
         """
@@ -1987,6 +2320,10 @@ class ProjectManager(Singleton):
 
         self.__project = Project()
 
+        # Used for saving only the changed data to the file where the project was last saved.
+        self.__saved_path = None
+        self.__dirty_index_set = set()
+
     def GetProject(self) -> Project:
         """Get project
 
@@ -2007,6 +2344,7 @@ class ProjectManager(Singleton):
         self.__project = Project()
         self.__project.SetDataList(data_list)
         self.__project.SetPeakType(peak_type)
+        self.__ResetDirtyData(None)
         self.__SetIsProjectSaved(False)
 
         event = ProjectNewEvent(data_list, peak_type, id=self.__id)
@@ -2025,6 +2363,7 @@ class ProjectManager(Singleton):
         project = self.__io_mgr.OpenProject(path)
         self.__project = project
 
+        self.__ResetDirtyData(project.GetPath())
         self.__SetIsProjectSaved(True)
 
         path = project.GetPath()
@@ -2056,12 +2395,19 @@ class ProjectManager(Singleton):
         note = project.GetNote()
         peak_type = project.GetPeakType()
         experimental_date = project.GetExperimentalDate()
-        self.__project = deepcopy(project)
+
+        if project is self.__project and path == self.__saved_path:
+            dirty_index_list = sorted(self.__dirty_index_set)
+
+        else:
+            dirty_index_list = None
+            self.__project = deepcopy(project)
 
         event = ProjectSaveEvent(path, data_list, peak_type, note, experimental_date, id=self.__id)
         self.__core_mgr.SendEvent(event)
 
-        self.__io_mgr.SaveProject(self.__project)
+        self.__io_mgr.SaveProject(self.__project, dirty_index_list)
+        self.__ResetDirtyData(path)
         self.__SetIsProjectSaved(True)
 
     def SetProjectMemo(self, experimental_date: date, note: str):
@@ -2094,6 +2440,8 @@ class ProjectManager(Singleton):
 
         :rtype: bool
         """
+        # The data contents events held for coalescing may mark the project as changed.
+        self.__core_mgr.Get(EVENT_MANAGER).FlushEvent()
         return self.__is_saved
 
     def AskProjectSaving(self) -> bool:
@@ -2132,6 +2480,10 @@ class ProjectManager(Singleton):
         name = self.__project.GetFileName()
         self.__core_mgr.SetTitle(name)
 
+    def __ResetDirtyData(self, saved_path):
+        self.__saved_path = saved_path
+        self.__dirty_index_set.clear()
+
     def OnEvent(self, event):
         event.Skip()
         if event.GetId() == self.__id:
@@ -2145,6 +2497,7 @@ class ProjectManager(Singleton):
             peak_type = event.GetPeakType()
             self.__project.SetPeakType(peak_type)
 
+            self.__ResetDirtyData(None)
             self.__SetIsProjectSaved(False)
 
         elif event_type == wxEVT_PROJECT_OPEN:
@@ -2157,6 +2510,7 @@ class ProjectManager(Singleton):
             peak_type = event.GetPeakType()
             self.__project.SetPeakType(peak_type)
 
+            self.__ResetDirtyData(None)
             self.__SetIsProjectSaved(True)
 
         elif event_type == wxEVT_PROJECT_SAVE:
@@ -2171,6 +2525,7 @@ class ProjectManager(Singleton):
 
             # Eventがパネルに飛ぶ通達される前に実行されちゃう
             self.__io_mgr.SaveProject(self.__project)
+            self.__ResetDirtyData(self.__project.GetPath())
             self.__SetIsProjectSaved(True)
 
         elif event_type == wxEVT_PROJECT_MEMO_CHANGE:
@@ -2182,6 +2537,7 @@ class ProjectManager(Singleton):
             self.__SetIsProjectSaved(False)
 
         elif event_type == wxEVT_DATA_CONTENTS_CHANGE:
+            self.__dirty_index_set.update(event.GetIndexList())
             self.__SetIsProjectSaved(False)
 
 
@@ -2328,6 +2684,9 @@ class DataManager(Singleton):
         self.__selection = deque([set(), set()], 2)
         self.__selected_recipe = Recipe()
 
+        self.__result_cache = RecipeResultCache(RESULT_CACHE_MEMORY_BUDGET)
+        Recipe.SetResultCache(self.__result_cache)
+
     def __GetProject(self):
         return self.__core_mgr.Get(PROJECT_MANAGER).GetProject()
 
@@ -2347,15 +2706,17 @@ class DataManager(Singleton):
         """
         self.SetDataList([index], [data])
 
-    def GetDataList(self, index_list: Iterable[int] = None) -> List[DataContainer]:
+    def GetDataList(self, index_list: Iterable[int] = None, copy: bool = True) -> List[DataContainer]:
         """Returns the data specified in the list of indexes. If index_list is None, returns the all data list. This value is deepcopied.
 
         :type index_list: Iterable[int], optional
+        :param copy: If False, the data is not copied. The data must not be modified then, so use only read-only accessors such as "XYView". Defaults to True
+        :type copy: bool, optional
         :rtype: List[DataContainer]
         """
         data_list = self.__GetDataList()
-        data_list = data_list if index_list is None else [data_list[index] for index in index_list]
-        return deepcopy(data_list)
+        data_list = list(data_list) if index_list is None else [data_list[index] for index in index_list]
+        return deepcopy(data_list) if copy else data_list
 
     def SetDataList(self, index_list: Iterable[int], data_list: Iterable[DataContainer]):
         """Sets the list of data corresponding to the specified list of indexes.
@@ -2376,45 +2737,60 @@ class DataManager(Singleton):
     def __GetDataList(self):
         return self.__GetProject().GetDataList()
 
-    def GetX(self, index: int) -> ndarray:
+    def GetX(self, index: int, copy: bool = True) -> ndarray:
         """Returns the x data of spectrum for a specified index.
 
         :type index: int
+        :param copy: If False, returns read-only view instead of copy. Defaults to True
+        :type copy: bool, optional
         :rtype: ndarray
         """
-        return self.__GetDataList()[index].X
+        data = self.__GetDataList()[index]
+        return data.X if copy else data.XView
 
-    def GetY(self, index: int) -> ndarray:
+    def GetY(self, index: int, copy: bool = True) -> ndarray:
         """Returns the y data of spectrum for a specified index.
 
         :type index: int
+        :param copy: If False, returns read-only view instead of copy. Defaults to True
+        :type copy: bool, optional
         :rtype: ndarray
         """
-        return self.__GetDataList()[index].Y
+        data = self.__GetDataList()[index]
+        return data.Y if copy else data.YView
 
-    def GetXY(self, index: int) -> Tuple[ndarray, ndarray]:
+    def GetXY(self, index: int, copy: bool = True) -> Tuple[ndarray, ndarray]:
         """Returns the data of spectrum for a specified index.
 
         :type index: int
+        :param copy: If False, returns read-only views instead of copies. Defaults to True
+        :type copy: bool, optional
         :rtype: Tuple[ndarray, ndarray]
         """
-        return self.__GetDataList()[index].XY
+        data = self.__GetDataList()[index]
+        return data.XY if copy else data.XYView
 
-    def GetBackground(self, index: int) -> ndarray:
+    def GetBackground(self, index: int, copy: bool = True) -> ndarray:
         """Returns the background of spectrum for a specified index.
 
         :type index: int
+        :param copy: If False, returns read-only view instead of copy. Defaults to True
+        :type copy: bool, optional
         :rtype: ndarray
         """
-        return self.__GetDataList()[index].BackGround
+        data = self.__GetDataList()[index]
+        return data.BackGround if copy else data.BackGroundView
 
-    def GetPeaks(self, index: int) -> PeakFunctionContainerList:
+    def GetPeaks(self, index: int, copy: bool = True) -> Union[PeakFunctionContainerList, Tuple[PeakSnapshot, ...]]:
         """Returns the peaks of spectrum for a specified index.
 
         :type index: int
-        :rtype: PeakFunctionContainerList
+        :param copy: If False, returns snapshots of the peaks instead of copies. Defaults to True
+        :type copy: bool, optional
+        :rtype: Union[PeakFunctionContainerList, Tuple[PeakSnapshot, ...]]
         """
-        return self.__GetDataList()[index].Peaks
+        data = self.__GetDataList()[index]
+        return data.Peaks if copy else data.PeaksView
 
     def GetRecipe(self, index: int) -> Recipe:
         """Returns the recipe for a specified index.
@@ -2459,11 +2835,10 @@ class DataManager(Singleton):
         if len(index_list) == 0:
             index_list = list(range(len(data_list)))
 
-        for index in index_list:
-            data = data_list[index]
-            data.Recipe = deepcopy(recipe)
+        # The data resumed from an older history have the spectrum of it.
+        resumed_list = [data_list[index].ApplyRecipe(deepcopy(recipe)) for index in index_list]
 
-        event = DataContentsChangeEvent(index_list, data_list, recipe_changed_list=[True] * len(index_list), id=self.__id)
+        event = DataContentsChangeEvent(index_list, data_list, resumed_list, resumed_list, resumed_list, resumed_list, [True] * len(index_list), resumed_list, id=self.__id)
         self.__core_mgr.SendEvent(event)
 
     def GetMsg(self, index: int) -> str:
@@ -2561,76 +2936,120 @@ class DataManager(Singleton):
         index_dict = {data: n for n, data in enumerate(self.__GetDataList())}
         return [index_dict[data] for data in data_list]
 
-    def ExecuteSpectrumFunction(self, index_list: Optional[Iterable[int]] = None):
+    def ConfigureResultCache(self, memory_budget: Optional[int] = None, spill_dir: Optional[str] = None):
+        """Configure the cache of the results of recipe steps. Steps whose input spectrum, function and arguments are the same as before are not executed again.
+
+        :param memory_budget: Maximum size of the cached spectra in bytes. If None, it is not changed. Defaults to None
+        :type memory_budget: Optional[int], optional
+        :param spill_dir: Directory where the spectra evicted from the memory are written. If None, they are discarded. Defaults to None
+        :type spill_dir: Optional[str], optional
+        """
+        if memory_budget is not None:
+            self.__result_cache.SetMemoryBudget(memory_budget)
+
+        self.__result_cache.SetSpillDirectory(spill_dir)
+
+    def ClearResultCache(self):
+        """Remove the results cached in the memory.
+        """
+        self.__result_cache.Clear()
+
+    def ExecuteSpectrumFunction(self, index_list: Optional[Iterable[int]] = None, parallel: bool = False, max_workers: Optional[int] = None, warm_start: bool = False):
         """Executes the recipe provided for the data specified in the index list.
+        The results are appended to each data as soon as it is finished, and "DataContentsChangeEvent" is sent for every "EXECUTION_EVENT_BATCH_SIZE" data.
 
         :param index_list: If index_list is None, it will convert to all selections. Defaults to None
         :type index_list: Optional[Iterable[int]], optional
-        :raises ValueError: [description]
+        :param parallel: If True, the recipes are executed in a process pool. Defaults to False
+        :type parallel: bool, optional
+        :param max_workers: The number of worker processes. If None, the number of processors is used. Defaults to None
+        :type max_workers: Optional[int], optional
+        :param warm_start: If True, the data are executed one by one in the scan order of "MappingManager", and each execution is seeded with the converged peaks of a neighbour. "parallel" is ignored. Defaults to False
+        :type warm_start: bool, optional
         """
         data_list = self.__GetDataList()
-        index_list = list(range(self.GetDataSize())) if index_list is None else index_list
+        index_list = list(range(self.GetDataSize())) if index_list is None else list(index_list)
+        recipe_dict = {index: data_list[index].Recipe for index in index_list}
+
+        if warm_start:
+            result_iter = self.__ExecuteWithWarmStart(data_list, index_list, recipe_dict)
+        elif parallel and len(index_list) > 1:
+            result_iter = self.__ExecuteInProcessPool(data_list, index_list, recipe_dict, max_workers)
+        else:
+            result_iter = ((index, recipe_dict[index].Execution(self.__GetSpectrum(data_list[index]), data_list[index].SuccessList)) for index in index_list)
 
+        batch_index_list = []
         x_changed_list = []
         y_changed_list = []
         bg_changed_list = []
         peaks_changed_list = []
         msg_changed_list = []
-        for index in index_list:
+        for index, (history, changed_params, error_msg) in result_iter:
             data = data_list[index]
+            for spectrum, success_list, msg, return_params in history:
+                data.Append(spectrum, recipe_dict[index], success_list, msg, return_params)
+
+            if error_msg is not None:
+                LogError(error_msg)
+
+            batch_index_list.append(index)
+            x_changed_list.append('x' in changed_params)
+            y_changed_list.append('y' in changed_params)
+            bg_changed_list.append('b' in changed_params)
+            peaks_changed_list.append('p' in changed_params)
+            msg_changed_list.append(len(history) != 0 or error_msg is not None)
+
+            if len(batch_index_list) >= EXECUTION_EVENT_BATCH_SIZE:
+                self.__SendExecutionEvent(data_list, batch_index_list, x_changed_list, y_changed_list, bg_changed_list, peaks_changed_list, msg_changed_list)
+                batch_index_list, x_changed_list, y_changed_list, bg_changed_list, peaks_changed_list, msg_changed_list = [], [], [], [], [], []
+                SafeYield(None, True)
+
+        if len(batch_index_list) != 0:
+            self.__SendExecutionEvent(data_list, batch_index_list, x_changed_list, y_changed_list, bg_changed_list, peaks_changed_list, msg_changed_list)
+
+    def __GetSpectrum(self, data):
+        x, y = data.XY
+        return Spectrum(x, y, data.BackGround, data.Peaks)
+
+    def __ExecuteInProcessPool(self, data_list, index_list, recipe_dict, max_workers):
+        data_accessor = SpectrumFunctionContainerBase.data_accessor
+        snapshot = None if data_accessor is None else data_accessor.GetSnapshot()
+
+        # Each worker has its own cache in the memory, and they share the spill directory.
+        with ProcessPoolExecutor(max_workers, initializer=Recipe.InitializeWorker, initargs=(snapshot, self.__result_cache)) as executor:
+            future_dict = {}
+            for index in index_list:
+                data = data_list[index]
+                future = executor.submit(recipe_dict[index].Execution, self.__GetSpectrum(data), data.SuccessList)
+                future_dict[future] = index
+
+            for future in as_completed(future_dict):
+                index = future_dict[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = ([], '', '\n'.join([str(arg) for arg in e.args]) or f'{data_list[index].Path} is failed.')
 
-            x_changed_list.append(False)
-            y_changed_list.append(False)
-            bg_changed_list.append(False)
-            peaks_changed_list.append(False)
-            msg_changed_list.append(False)
+                yield index, result
 
-            new_success_list = deepcopy(data.SuccessList)
-            new_recipe = deepcopy(data.Recipe)
-            for n in range(len(new_recipe)):
-                if new_success_list[n]:
-                    continue
+    def __ExecuteWithWarmStart(self, data_list, index_list, recipe_dict):
+        # The peaks of the data whose recipe has been completed are kept as the seeds of their neighbours.
+        converged_peaks_dict = {}
+        for index, neighbour_list in self.__core_mgr.Get(MAPPING_MANAGER).GetScanOrder(index_list):
+            seed = next((converged_peaks_dict[n] for n in neighbour_list if n in converged_peaks_dict), None)
+            data = data_list[index]
+            result = recipe_dict[index].Execution(self.__GetSpectrum(data), data.SuccessList, seed)
 
-                func_container = new_recipe[n]
-                x, y = data.XY
-                bg = data.BackGround
-                peaks = data.Peaks
+            history, _, error_msg = result
+            if error_msg is None and len(history) != 0:
+                converged_peaks_dict[index] = history[-1][0].Peaks
 
-                try:
-                    params = func_container.Execution(x, y, bg, peaks)
-                    new_success_list[n] = True
-                    msg = f'{str(func_container)} is successful in the execution.'
-                    msg_changed_list[-1] = True
-                except Exception as e:
-                    params = []
-                    new_success_list[n] = False
-                    msg = '\n'.join(e.args)
-                    msg_changed_list[-1] = True
-                    LogError(msg)
-                    break
-
-                for param, return_param in zip(params, func_container.SendReturnParams()):
-                    if return_param == 'x':
-                        x = param
-                        x_changed_list[-1] = True
-                    elif return_param == 'y':
-                        y = param
-                        y_changed_list[-1] = True
-                    elif return_param == 'b':
-                        bg = param
-                        bg_changed_list[-1] = True
-                    elif return_param == 'p':
-                        if isinstance(param, PeakFunctionContainerBase):
-                            param = PeakFunctionContainerList([param])
-                        peaks = param
-                        peaks_changed_list[-1] = True
-                    else:
-                        raise ValueError()
-
-                data.Append(Spectrum(x, y, bg, peaks), new_recipe, new_success_list, msg)
-
-        index_list = self.GetIndexList(data_list)
-        event = DataContentsChangeEvent(index_list, data_list, x_changed_list, y_changed_list, bg_changed_list, peaks_changed_list, [True] * len(index_list), msg_changed_list, id=self.__id)
+            yield index, result
+
+    def __SendExecutionEvent(self, data_list, index_list, x_changed_list, y_changed_list, bg_changed_list, peaks_changed_list, msg_changed_list):
+        batch_data_list = [data_list[index] for index in index_list]
+        recipe_changed_list = [True] * len(index_list)
+        event = DataContentsChangeEvent(index_list, batch_data_list, x_changed_list, y_changed_list, bg_changed_list, peaks_changed_list, recipe_changed_list, msg_changed_list, id=self.__id)
         self.__core_mgr.SendEvent(event)
 
     def OnEvent(self, event):
@@ -2672,8 +3091,17 @@ class SpectrumManager(Singleton):
         self.__id = NewIdRef()
         self.__focus_panel = None
 
+        # The lines are kept for each data and redrawn on the background saved at the last full drawing.
+        self.__spectrum_panel = None
+        self.__line_dict = {}
+        self.__overlay_dict = {}
+        self.__overlay_key = None
+        self.__background = None
+        self.__view_limit_list = None
+
     def Draw(self, need_bg=True, need_peaks=False, multi_draw_alpha=0.0):
-        """Draws a spectrum.
+        """Draws a spectrum. The lines drawn previously are reused, and only the lines are redrawn if the ranges of the axes do not change.
+        If multiple spectra are selected, they are decimated to the width of the axes and drawn under the main selection as one collection, or as an image of their density if there are more than "MULTI_DRAW_DENSITY_THRESHOLD".
 
         :param need_bg: Whether the background needs to be drawn or not. Defaults to True
         :type need_bg: bool, optional
@@ -2688,56 +3116,225 @@ class SpectrumManager(Singleton):
             print('set spectrum panel first!!')
             return
 
-        spectrum_panel.Clear()
+        if spectrum_panel is not self.__spectrum_panel:
+            self.__SetSpectrumPanel(spectrum_panel)
 
         data_mgr = self.__core_mgr.Get(DATA_MANAGER)
-
-        if len(data_mgr.GetSelection()) == 0:
-            spectrum_panel.canvas.draw()
-            return
-
         main_selection = data_mgr.GetMainSelection()
         selection = data_mgr.GetSelection()
 
-        line_list = []
-        bg_line_list = []
-
+        line_design_list = []
         if main_selection is not None:
-            x, y = data_mgr.GetXY(main_selection)
-            line_list.append(Line2D(x, y, ls='', marker='.', ms=3, c='gray'))
+            x, y = data_mgr.GetXY(main_selection, copy=False)
+            line_design_list.append((('spectrum', main_selection), spectrum_panel.main_ax, x, y, dict(ls='', marker='.', ms=3, c='gray')))
 
             if need_bg:
-                bg = data_mgr.GetBackground(main_selection)
+                bg = data_mgr.GetBackground(main_selection, copy=False)
                 if len(bg) != 0:
-                    bg_line_list.append(Line2D(x, bg, ls='', marker='.', ms=3, c='gray'))
+                    line_design_list.append((('background', main_selection), spectrum_panel.bg_ax, x, bg, dict(ls='', marker='.', ms=3, c='gray')))
 
             if need_peaks:
-                for peak in data_mgr.GetPeaks(main_selection):
-                    p_v = peak.Execution(x)
-                    spectrum_panel.main_ax.add_line(Line2D(x, p_v, c='orange'))
+                for i, p_v in enumerate(ExecutePeaks(x, data_mgr.GetPeaks(main_selection, copy=False))):
+                    line_design_list.append((('peak', i), spectrum_panel.main_ax, x, p_v, dict(c='orange')))
+
+        # The main selection is also included in the overlay, so that the overlay is not rebuilt while only the main selection moves.
+        overlay_index_list = list(selection) if multi_draw_alpha > 0 and len(selection) > 1 else []
+        overlay_key = (tuple(overlay_index_list), need_bg, multi_draw_alpha, spectrum_panel.main_ax.bbox.bounds, spectrum_panel.bg_ax.bbox.bounds)
+        if overlay_key != self.__overlay_key:
+            xy_list = []
+            bg_xy_list = []
+            for i in overlay_index_list:
+                x, y = data_mgr.GetXY(i, copy=False)
+                xy_list.append((x, y))
 
-        if multi_draw_alpha > 0:
-            for i in selection:
-                if i == main_selection:
-                    continue
+                if need_bg:
+                    bg = data_mgr.GetBackground(i, copy=False)
+                    if len(bg) != 0:
+                        bg_xy_list.append((x, bg))
 
-                x, y = data_mgr.GetXY(i)
-                line_list.append(Line2D(x, y, alpha=multi_draw_alpha, ls='', marker='.', ms=3, c='gray'))
+            self.__UpdateOverlay(spectrum_panel.main_ax, xy_list, multi_draw_alpha)
+            self.__UpdateOverlay(spectrum_panel.bg_ax, bg_xy_list, multi_draw_alpha)
+            self.__overlay_key = overlay_key
+            # The overlay is not animated, so that it is saved in the background by the next full drawing.
+            self.__background = None
 
-                if need_bg:
-                    bg = data_mgr.GetBackground(i)
-                    line_list.append(Line2D(x, y, alpha=multi_draw_alpha, ls='', marker='.', ms=3, c='gray'))
+        self.__UpdateLineDict(line_design_list)
+
+        if len(line_design_list) == 0 and len(self.__overlay_dict) == 0:
+            self.__overlay_key = None
+            spectrum_panel.Clear()
+            spectrum_panel.canvas.draw()
+            return
 
-        for line in line_list:
-            spectrum_panel.main_ax.add_line(line)
+        for ax in (spectrum_panel.main_ax, spectrum_panel.bg_ax):
+            ax.relim()
+            # "relim" ignores collections.
+            if ax in self.__overlay_dict:
+                ax.update_datalim(self.__overlay_dict[ax][1])
 
-        if need_bg:
-            for line in bg_line_list:
-                spectrum_panel.bg_ax.add_line(line)
+            ax.autoscale()
 
-        spectrum_panel.main_ax.autoscale()
-        spectrum_panel.bg_ax.autoscale()
-        spectrum_panel.canvas.draw()
+        if self.__background is None or not self.__KeepViewLimit():
+            # The lines are drawn on the new background in "__OnCanvasDraw".
+            spectrum_panel.canvas.draw()
+            return
+
+        spectrum_panel.canvas.restore_region(self.__background)
+        self.__DrawLines(spectrum_panel.canvas.get_renderer())
+        spectrum_panel.canvas.blit(spectrum_panel.fig.bbox)
+
+    def __SetSpectrumPanel(self, spectrum_panel):
+        for artist in list(self.__line_dict.values()) + [artist for artist, *_ in self.__overlay_dict.values()]:
+            if artist.axes is not None:
+                artist.remove()
+
+        self.__spectrum_panel = spectrum_panel
+        self.__line_dict = {}
+        self.__overlay_dict = {}
+        self.__overlay_key = None
+        self.__background = None
+        self.__view_limit_list = None
+        spectrum_panel.canvas.mpl_connect('draw_event', self.__OnCanvasDraw)
+
+    def __UpdateLineDict(self, line_design_list):
+        line_dict = {}
+        for key, ax, x, y, style_dict in line_design_list:
+            line = self.__line_dict.pop(key, None)
+            if line is None or line.axes is not ax:
+                # The axes may have been cleared by "SpectrumPanel.Clear", in which case the saved background is no longer valid.
+                if line is not None:
+                    self.__background = None
+
+                line = Line2D(x, y, animated=True, **style_dict)
+                ax.add_line(line)
+            else:
+                line.set_data(x, y)
+                line.set_alpha(style_dict.get('alpha'))
+
+            line_dict[key] = line
+
+        for line in self.__line_dict.values():
+            if line.axes is not None:
+                line.remove()
+
+        self.__line_dict = line_dict
+
+    def __UpdateOverlay(self, ax, xy_list, alpha, use_view_limit=False):
+        # If "use_view_limit" is True, the spectra are binned over the visible range of x instead of the whole range, so that the overlay keeps the resolution of the axes when zoomed.
+        artist, *_ = self.__overlay_dict.pop(ax, (None,))
+        point_list = [(nanmin(x), nanmin(y), nanmax(x), nanmax(y)) for x, y in StackSpectra(xy_list) if x.size != 0 and y.size != 0]
+        if len(point_list) == 0:
+            if artist is not None and artist.axes is not None:
+                artist.remove()
+
+            return
+
+        x_min, y_min, x_max, y_max = nanmin(point_list, axis=0)[:2].tolist() + nanmax(point_list, axis=0)[2:].tolist()
+        column_count = max(int(ax.bbox.width), 1)
+        bin_key = self.__GetOverlayBinKey(ax, x_min, x_max) if use_view_limit else ((x_min, x_max), ax.bbox.bounds)
+        x_range = bin_key[0]
+        select_range = None
+        if x_range != (x_min, x_max):
+            # The points outside the visible range would be put in the bins at the ends, so only the points in one more bin on each side are binned.
+            width = (x_range[1] - x_range[0]) / column_count
+            x_range = select_range = (x_range[0] - width, x_range[1] + width)
+            column_count += 2
+
+        if len(xy_list) <= MULTI_DRAW_DENSITY_THRESHOLD:
+            # Each spectrum is reduced to the minimum and the maximum in each pixel column.
+            segment_list = [DecimateMinMax(*self.__SelectRange(x, y, select_range), x_range, column_count) for x, y in xy_list]
+            if isinstance(artist, LineCollection) and artist.axes is ax:
+                artist.set_segments(segment_list)
+                artist.set_alpha(alpha)
+            else:
+                if artist is not None and artist.axes is not None:
+                    artist.remove()
+
+                artist = LineCollection(segment_list, colors='gray', linewidths=1, alpha=alpha)
+                ax.add_collection(artist, autolim=False)
+        else:
+            # The number of spectra passing through each pixel is converted to the opacity of the same number of overlapped lines.
+            row_count = max(int(ax.bbox.height), 1)
+            density = CountDensity((self.__SelectRange(x, y, select_range) for x, y in StackSpectra(xy_list)), x_range, (y_min, y_max), (row_count, column_count))
+            image = zeros((row_count, column_count, 4))
+            image[:, :, :3] = to_rgb('gray')
+            image[:, :, 3] = 1 - (1 - min(float(alpha), 1.0)) ** density
+            if not (isinstance(artist, AxesImage) and artist.axes is ax):
+                if artist is not None and artist.axes is not None:
+                    artist.remove()
+
+                artist = AxesImage(ax, interpolation='nearest', origin='lower')
+                ax.add_image(artist)
+
+            artist.set_data(image)
+            artist.set_extent((x_range[0], x_range[1], y_min, y_max))
+            # The margins of the axes are kept the same as those of the lines.
+            artist.sticky_edges.x.clear()
+            artist.sticky_edges.y.clear()
+
+        self.__overlay_dict[ax] = (artist, [(x_min, y_min), (x_max, y_max)], xy_list, alpha, bin_key)
+
+    def __GetOverlayBinKey(self, ax, x_min, x_max):
+        view_min, view_max = sorted(ax.get_xlim())
+        x_range = (max(x_min, view_min), min(x_max, view_max))
+        if not x_range[0] < x_range[1]:
+            x_range = (x_min, x_max)
+
+        return x_range, ax.bbox.bounds
+
+    def __SelectRange(self, x, y, x_range):
+        if x_range is None:
+            return x, y
+
+        x = asarray(x, dtype=float)
+        is_inside = (x_range[0] <= x) & (x <= x_range[1])
+        return x[is_inside], asarray(y)[..., is_inside]
+
+    def __UpdateOverlayBins(self):
+        # Returns True if the overlay is rebuilt because the visible range of x or the size of the axes is changed.
+        is_updated = False
+        for ax, (_, ((x_min, _), (x_max, _)), xy_list, alpha, bin_key) in list(self.__overlay_dict.items()):
+            if self.__GetOverlayBinKey(ax, x_min, x_max) != bin_key:
+                self.__UpdateOverlay(ax, xy_list, alpha, True)
+                is_updated = True
+
+        return is_updated
+
+    def __GetViewLimitList(self):
+        return [ax.viewLim.get_points().copy() for ax in (self.__spectrum_panel.main_ax, self.__spectrum_panel.bg_ax)]
+
+    def __KeepViewLimit(self):
+        # Slight changes of the ranges are ignored so that the saved background can be used. The data are still inside the axes, because the margins are wider than the tolerance.
+        ax_list = [self.__spectrum_panel.main_ax, self.__spectrum_panel.bg_ax]
+        for limit, previous_limit in zip(self.__GetViewLimitList(), self.__view_limit_list):
+            tolerance = SPECTRUM_VIEW_LIMIT_TOLERANCE * (previous_limit[1] - previous_limit[0])
+            if not (abs(limit - previous_limit) <= tolerance).all():
+                return False
+
+        for ax, ((x_min, y_min), (x_max, y_max)) in zip(ax_list, self.__view_limit_list):
+            ax.set_xlim(x_min, x_max, auto=None)
+            ax.set_ylim(y_min, y_max, auto=None)
+
+        return True
+
+    def __DrawLines(self, renderer):
+        for line in self.__line_dict.values():
+            line.draw(renderer)
+
+    def __OnCanvasDraw(self, event):
+        # Called whenever the whole figure is drawn, including resizing, zooming and panning with the toolbar.
+        # Saving the figure to a file also draws it, with another canvas for vector formats and with another renderer for raster formats, and the result is not on the screen.
+        canvas = self.__spectrum_panel.canvas
+        if event.canvas is canvas and not canvas.is_saving():
+            if self.__UpdateOverlayBins():
+                # The background is saved when the rebuilt overlay is drawn.
+                self.__background = None
+                canvas.draw_idle()
+            else:
+                self.__background = canvas.copy_from_bbox(self.__spectrum_panel.fig.bbox)
+                self.__view_limit_list = self.__GetViewLimitList()
+
+        self.__DrawLines(event.renderer)
 
     def OnEvent(self, event):
         event.Skip()
@@ -2751,6 +3348,9 @@ class SpectrumManager(Singleton):
             if panel is not None and panel.NeedDraw():
                 self.__focus_panel = panel
 
+        if event_type == wxEVT_DATA_CONTENTS_CHANGE:
+            self.__overlay_key = None
+
         if event_type in [wxEVT_DATA_SELECTION_CHANGE, wxEVT_DATA_CONTENTS_CHANGE, wxEVT_PANEL_SELECTION_CHANGE, wxEVT_PANEL_VIEW]:
             if self.__focus_panel is None or not self.__focus_panel.NeedDraw():
                 self.Draw()
@@ -2972,6 +3572,54 @@ class MappingManager(Singleton):
         event = TableSizeChangeEvent(size, prev_size, id=self.__id)
         self.__core_mgr.SendEvent(event)
 
+    def GetTableSize(self) -> Tuple[int, int]:
+        """Get table size related to the mapping.
+
+        :rtype: Tuple[int, int]
+        """
+        return self.__table_size
+
+    def GetScanOrder(self, index_list: Iterable[int]) -> List[Tuple[int, List[int]]]:
+        """Sort the data in a serpentine order over the mapping table, so that consecutive data are next to each other on the map.
+        The data outside the table are placed at the end in index order.
+
+        :param index_list: Indices of the data to be sorted.
+        :type index_list: Iterable[int]
+        :return: Pairs of a data index and the indices of its neighbours that appear earlier in the order. The nearest one in the order comes first.
+        :rtype: List[Tuple[int, List[int]]]
+        """
+        c, r = self.__table_size
+        # The data are measured along lines whose length depends on the direction. The flips of the direction do not change the neighbours.
+        line_length = c if self.GetDirection() in ['r2d', 'l2d', 'r2u', 'l2u'] else r
+
+        index_set = set(index_list)
+        inner_list = sorted(index for index in index_set if 0 <= index < c * r)
+        outer_list = sorted(index_set.difference(inner_list))
+
+        def serpentine_key(index):
+            line, pos = divmod(index, line_length)
+            return line, pos if line % 2 == 0 else -pos
+
+        order_dict = {index: n for n, index in enumerate(sorted(inner_list, key=serpentine_key))}
+
+        scan_order = []
+        for index in sorted(order_dict, key=order_dict.get):
+            line, pos = divmod(index, line_length)
+            neighbour_list = []
+            if pos != 0:
+                neighbour_list.append(index - 1)
+            if pos != line_length - 1:
+                neighbour_list.append(index + 1)
+            neighbour_list.append(index - line_length)
+            neighbour_list.append(index + line_length)
+
+            neighbour_list = [n for n in neighbour_list if order_dict.get(n, len(order_dict)) < order_dict[index]]
+            neighbour_list.sort(key=order_dict.get, reverse=True)
+            scan_order.append((index, neighbour_list))
+
+        scan_order.extend((index, []) for index in outer_list)
+        return scan_order
+
     def GetDirection(self) -> str:
         """
         Direction related to the mapping. The returned values are "r2u, "r2d", "l2u", "l2d", "u2r", "u2l", "d2r", "d2l".
@@ -1,16 +1,26 @@
 from abc import abstractmethod
-from collections import deque
-from copy import deepcopy
+from collections import OrderedDict, deque
+from copy import copy, deepcopy
 from datetime import date
-from os.path import basename, dirname, isdir, join
+from hashlib import blake2b
+from os import getpid, makedirs, replace
+from os.path import basename, dirname, isdir, isfile, join
+from pickle import UnpicklingError, dump, load
 from random import random
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, final
-
-from numpy import array, cos, exp, inf, log, ndarray, sin, zeros
-from wx import FileSelectorDefaultWildcardStr
+from sys import platform
+from typing import (Any, Dict, Iterable, Iterator, List, Optional, Tuple,
+                    Union, final)
+from weakref import WeakValueDictionary
+
+from numpy import (arange, argsort, array, array_equal, asarray,
+                   ascontiguousarray, atleast_2d, bincount, broadcast_to, clip,
+                   concatenate, cos, diff, empty, exp, flatnonzero, fmax, fmin,
+                   full, inf, int32, int64, intp, isnan, lexsort, loadtxt, log,
+                   maximum, minimum, nan, nan_to_num, ndarray, ones, repeat,
+                   shape, sin, stack, unique, where, zeros)
 
 from core import RestrictedStorableListBase, StorableObject
-from util import GetFileName, HasValidElement
+from util import GetExtension, GetFileName, HasValidElement
 
 # default value is not storable
 
@@ -809,6 +819,17 @@ class FunctionContainerBase(StorableObject):
 class PeakFunctionContainerBase(FunctionContainerBase):
     """Contain function of peak
     """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # The broadcast formulas are those of the class defining "Function". A subclass overriding only "Function" does not inherit the formulas of its parent,
+        # and calculates each row with its own "Function" and the derivatives by finite differences.
+        mro = cls.__mro__
+        function_owner_index = next(n for n, Class in enumerate(mro) if 'Function' in vars(Class))
+        for name in ('FunctionArray', 'DerivativeArray'):
+            if next(n for n, Class in enumerate(mro) if name in vars(Class)) > function_owner_index:
+                setattr(cls, name, vars(PeakFunctionContainerBase)[name])
+
     @abstractmethod
     def Function(self, x, args: Tuple) -> ndarray:
         """Describe the formula for calculating the peak.
@@ -831,6 +852,39 @@ class PeakFunctionContainerBase(FunctionContainerBase):
         """
         return self.Function(x, self.GetArgs())
 
+    def FunctionArray(self, x: ndarray, params: ndarray) -> ndarray:
+        """Calculate the peaks of all the rows of params at once. By default, "Function" is called for each row. Override this method with a broadcast formula for speed.
+        The formula is used only by the class overriding it and its subclasses which do not override "Function".
+
+        :param x: xdata of spectral data. This can also be a matrix whose rows are used for the corresponding peaks, shape (number of peaks, number of points).
+        :type x: ndarray
+        :param params: The peak arguments. Each row is the arguments of a peak, shape (number of peaks, number of arguments).
+        :type params: ndarray
+        :return: Values of each peak, shape (number of peaks, number of points)
+        :rtype: ndarray
+        """
+        x_rows = broadcast_to(x, (len(params), shape(x)[-1]))
+        return array([zeros(len(x_row)) + self.Function(x_row, tuple(args)) for x_row, args in zip(x_rows, params)]).reshape(x_rows.shape)
+
+    def DerivativeArray(self, x: ndarray, params: ndarray) -> Optional[ndarray]:
+        """Calculate the partial derivatives of the peaks with respect to each argument. This method is intended to be overridden. If not, the derivatives are approximated by finite differences.
+
+        :param x: Same as "FunctionArray"
+        :type x: ndarray
+        :param params: Same as "FunctionArray"
+        :type params: ndarray
+        :return: shape (number of peaks, number of arguments, number of points), or None if the derivatives are not provided.
+        :rtype: Optional[ndarray]
+        """
+        return None
+
+    def HasDerivative(self) -> bool:
+        """Returns True if "DerivativeArray" is provided.
+
+        :rtype: bool
+        """
+        return type(self).DerivativeArray is not PeakFunctionContainerBase.DerivativeArray
+
     @property
     def Amp(self) -> float:
         """Amplitude
@@ -885,6 +939,13 @@ class PeakFunctionContainerBase(FunctionContainerBase):
         args[2] = max(args[2], 0.0)
         super().SetArgs(args)
 
+    def GetSnapshot(self):
+        """Get read-only snapshot of the current arguments. It is much lighter than deepcopy.
+
+        :rtype: PeakSnapshot
+        """
+        return PeakSnapshot(self)
+
     @abstractmethod
     def GetTex(self) -> str:
         """Get statement of function following the Tex syntax.
@@ -909,6 +970,21 @@ class Gaussian(PeakFunctionContainerBase):
     def Function(self, x, args):
         return args[0] * exp(- 4 * log(2) * ((x - args[1]) / args[2]) ** 2) if args[2] != 0 else 1e10
 
+    def FunctionArray(self, x, params):
+        amp, ctr, wid = params.T[:, :, None]
+        is_zero_wid = wid == 0
+        wid = where(is_zero_wid, 1.0, wid)
+        return where(is_zero_wid, 1e10, amp * exp(- 4 * log(2) * ((x - ctr) / wid) ** 2))
+
+    def DerivativeArray(self, x, params):
+        amp, ctr, wid = params.T[:, :, None]
+        is_zero_wid = wid == 0
+        wid = where(is_zero_wid, 1.0, wid)
+        u = (x - ctr) / wid
+        d_amp = exp(- 4 * log(2) * u ** 2)
+        d_ctr = 8 * log(2) * amp * d_amp * u / wid
+        return where(is_zero_wid[:, None], 0.0, stack([d_amp, d_ctr, d_ctr * u], axis=1))
+
     def GetTex(self):
         return r'$Amp\ exp\left(-4\ \ln{2}\left( \frac{x - Ctr}{Wid}\right)^2 \right)$'
 
@@ -924,8 +1000,16 @@ class SpectrumFunctionContainerBase(FunctionContainerBase):
         cls._instance_list.append(self)
         return self
 
-    def Execution(self, x: Iterable, y: Iterable, bg: Iterable, peaks: Iterable[PeakFunctionContainerBase]):
-        """ "Function" wrapper
+    @classmethod
+    def SetDataAccessor(cls, data_accessor):
+        """Set the accessor shared by all spectrum functions. This is also used as the initializer of worker processes.
+
+        :type data_accessor: Union[SpectrumFunctionContainerAccessor, SpectrumFunctionContainerAccessorSnapshot]
+        """
+        SpectrumFunctionContainerBase.data_accessor = data_accessor
+
+    def Execution(self, x: Iterable, y: Iterable, bg: Iterable, peaks: Iterable[PeakFunctionContainerBase], seed: Optional[Iterable[PeakFunctionContainerBase]] = None):
+        """ "Function" wrapper. If seed is given, "SeededFunction" is called instead of "Function".
 
         :param x: xdata of spectrum
         :type x: Iterable
@@ -935,6 +1019,8 @@ class SpectrumFunctionContainerBase(FunctionContainerBase):
         :type bg: Iterable
         :param peaks: peak of spectrum
         :type peaks: Iterable[PeakFunctionContainerBase, ...]
+        :param seed: Converged peaks of a neighbouring spectrum. Defaults to None
+        :type seed: Optional[Iterable[PeakFunctionContainerBase, ...]], optional
         :rtype: Any
         """
         args = []
@@ -950,7 +1036,10 @@ class SpectrumFunctionContainerBase(FunctionContainerBase):
 
         args += self.GetArgs()
 
-        return self.Function(args)
+        if seed is None:
+            return self.Function(args)
+
+        return self.SeededFunction(args, seed)
 
     @abstractmethod
     def Function(self, args):
@@ -961,6 +1050,15 @@ class SpectrumFunctionContainerBase(FunctionContainerBase):
         """
         raise NotImplementedError()
 
+    def SeededFunction(self, args, seed):
+        """Called instead of "Function" when the converged peaks of a neighbouring spectrum are available. This method is intended to be overridden by functions that can be warm-started. By default, the seed is ignored.
+
+        :param args: Same as the argument of "Function".
+        :param seed: Converged peaks of a neighbouring spectrum
+        :type seed: PeakFunctionContainerList
+        """
+        return self.Function(args)
+
     def SendRequireParams(self) -> str:
         """Send the required parameters.
 
@@ -1004,6 +1102,49 @@ class EncodeFunctionContainerBase(FunctionContainerBase):
         """
         return self.Function(contents, self.GetArgs())
 
+    @final
+    def ExecutionFromFile(self, path: str, encoding: str):
+        """Read the file and execute "Function" with its contents. The contents are released as soon as "Function" returns.
+
+        :param path: Path of the file containing the experimental data
+        :type path: str
+        :param encoding: Encoding of the file
+        :type encoding: str
+        """
+        with open(path, mode='r', encoding=encoding) as f:
+            contents = f.read()
+
+        return self.Function(contents, self.GetArgs())
+
+    @final
+    def GetSpectrumParams(self, params) -> Tuple[Any, Any, Any]:
+        """Sort the return value of "Function" into x, y and the background in the order of "SendReturnParams".
+
+        :param params: Return value of "Execution" or "ExecutionFromFile"
+        :raises ValueError: Sent if x is empty or the sizes of x, y and the background are not the same.
+        :return: x, y and the background. The background is empty if it is not returned.
+        :rtype: Tuple[Any, Any, Any]
+        """
+        if params is None:
+            raise ValueError('The encode function returned nothing.')
+
+        x, y, bg = [], [], []
+        for param, return_param in zip(params, self.SendReturnParams()):
+            if return_param == 'x':
+                x = param
+            elif return_param == 'y':
+                y = param
+            elif return_param == 'b':
+                bg = param
+
+        if len(x) == 0 or len(x) != len(y):
+            raise ValueError('The size of x and y should be the same and larger than 0.')
+
+        if len(bg) != 0 and len(bg) != len(x):
+            raise ValueError('The size of background should be the same as x.')
+
+        return x, y, bg
+
     @abstractmethod
     def Function(self, contents: str, args):
         """Describe the body of the function here.
@@ -1026,312 +1167,1499 @@ class EncodeFunctionContainerBase(FunctionContainerBase):
     def SendFileTypeWildcard(self) -> str:
         """Send the supported file formats.
 
-        :return: default to FileSelectorDefaultWildcardStr. If you want to know more details, please refer the wxPython document at (https://docs.wxpython.org/wx.functions.html?highlight=fileselector#wx.FileSelector).
+        :return: default to FILE_SELECTOR_DEFAULT_WILDCARD, which is the same as FileSelectorDefaultWildcardStr. If you want to know more details, please refer the wxPython document at (https://docs.wxpython.org/wx.functions.html?highlight=fileselector#wx.FileSelector).
         :rtype: str
         """
-        return FileSelectorDefaultWildcardStr
+        return FILE_SELECTOR_DEFAULT_WILDCARD
 
 
 class Text(EncodeFunctionContainerBase):
+    """Two-column text, like csv. Header lines before the data, comments starting with "#", blank lines and CRLF are allowed.
+    """
+    DELIMITER_DICT = {'Colon': ':', 'Tab': '\t', 'Space': ' ', 'Comma': ',', 'Equals Sign': '=', 'Semicolon': ';'}
+    COMMENT = '#'
+
     def __init__(self):
         super().__init__({'Delimiter': ChoiceContainer('Comma', ['Colon', 'Tab', 'Space', 'Comma', 'Equals Sign', 'Semicolon'])})
 
     def Function(self, contents, args):
-        xdata = []
-        ydata = []
-        delimiter_name, = self.GetArgs()
-        delimiter_dict = {'Colon': ':', 'Tab': '\t', 'Space': ' ', 'Comma': ',', 'Equals Sign': '=', 'Semicolon': ';'}
-        delimiter = delimiter_dict[delimiter_name]
-        for line in contents.split('\n'):
-            if line == '':
+        delimiter_name, = args
+        delimiter = Text.DELIMITER_DICT[delimiter_name]
+        # Any run of whitespace separates the values if the delimiter is whitespace.
+        delimiter = None if delimiter.isspace() else delimiter
+
+        lines = contents.splitlines()
+        header_size = self.__GetHeaderSize(lines, delimiter)
+        if header_size == len(lines):
+            raise ValueError('No data was found.')
+
+        data = loadtxt(lines[header_size:], dtype=float, delimiter=delimiter, comments=Text.COMMENT, ndmin=2)
+        if data.shape[1] != 2:
+            raise ValueError(f'The number of columns should be 2, but it was {data.shape[1]}.')
+
+        return data[:, 0], data[:, 1]
+
+    def __GetHeaderSize(self, lines, delimiter):
+        for n, line in enumerate(lines):
+            values = line.split(Text.COMMENT, 1)[0].split(delimiter)
+            if len(values) == 1 and values[0].strip() == '':
                 continue
 
-            x, y = map(float, line.split(delimiter))
+            try:
+                if len([float(value) for value in values]) == 2:
+                    return n
 
-            xdata.append(x)
-            ydata.append(y)
+            except ValueError:
+                pass
 
-        return xdata, ydata
+        return len(lines)
 
 
-class PeakFunctionContainerList(RestrictedStorableListBase):
-    @classmethod
-    def CreateDummyPeaks(cls, x=None, size=None):
-        """Generate dummy data. Can be used for testing, etc.
+class PeakSnapshot:
+    """Frozen arguments of a peak. Used for reading peaks without deepcopy.
+    """
 
-        :param x: xdata, If "x" is none, it will be converted to an array of size 100, defaults to None
-        :type x: ndrray, optional
-        :param size: size of peaks, if size is none, then a value between 0 and 5 will be randomly selected, defaults to None
-        :type size: int, optional
-        :return: instance of PeakFunctionContainerList
-        :rtype: PeakFunctionContainerList
-        """
-        peaks = PeakFunctionContainerList()
-        x = array(range(300))
-        size = int(random() * 5) if size is None else size
-        for _ in range(size):
-            peak = DEFAULT_PEAK
-            peak.X = x
-            peak.Amp = random()
-            peak.Ctr = size * random()
-            peak.Wid = size * random()
-            peaks.append(peak)
-        return peaks
+    def __init__(self, peak: PeakFunctionContainerBase, args: Optional[Tuple] = None):
+        """Default constructor
 
-    def __init__(self, *args, **kwargs):
-        """List with elements restricted to PeakFunctionContainerBase
+        :type peak: PeakFunctionContainerBase
+        :param args: Arguments used instead of the ones of the peak. This is used to make snapshots from "PeakTable". Defaults to None
+        :type args: Optional[Tuple], optional
         """
-        super().__init__(PeakFunctionContainerBase, *args, **kwargs)
+        self.__function = peak.Function
+        self.__function_array = peak.FunctionArray
+        self.__peak_class = type(peak)
+        self.__args = peak.GetArgs() if args is None else args
 
+    def GetPeakClass(self) -> type:
+        """Get class of the peak.
 
-class PeakType(StorableObject):
-    """Data object for peak type
-    """
+        :rtype: type
+        """
+        return self.__peak_class
 
-    def __init__(self, peak_func_container: PeakFunctionContainerList = None):
-        """Default constructor
+    def GetArgs(self) -> Tuple:
+        """Get arguments of the peak.
 
-        :param peak_func_container: The original peak function, defaults to None
-        :type peak_func_container: PeakFunctionContainerList, optional
+        :rtype: Tuple
         """
-        if peak_func_container is not None and not isinstance(peak_func_container, PeakFunctionContainerBase):
-            raise TypeError()
-        self.__peak_func_container = peak_func_container
+        return self.__args
 
-    def GetName(self) -> str:
-        """Get name of peak
+    @property
+    def Amp(self) -> float:
+        """Amplitude
 
-        :rtype: str
+        :type: float
         """
-        return self.__peak_func_container.__class__.__name__
+        return self.__args[0]
 
-    def GetArgumentLength(self) -> int:
-        """Get length of argument
+    @property
+    def Ctr(self) -> float:
+        """Center position of peak
 
-        :rtype: int
+        :type: float
         """
-        return len(self.__peak_func_container.GetArgs())
+        return self.__args[1]
 
-    def GetArgumentNames(self) -> Tuple[str, ...]:
-        """Get a list of argument names
+    @property
+    def Wid(self) -> float:
+        """Width of peak, like half maximum full width (HMFW).
 
-        :rtype: Tuple[str, ...]
+        :type: float
         """
-        return self.__peak_func_container.GetArgumentNames()
+        return self.__args[2]
 
-    def GetArgumentContainerList(self) -> List[ArgumentContainerBase]:
-        """Get a list of "ArgumentContainerBase" class. This value is deepcopied.
+    def Execution(self, x) -> ndarray:
+        """Same as "PeakFunctionContainerBase.Execution"
 
-        :rtype: List[ArgumentContainerBase, ...]
+        :type x: Iterable
+        :rtype: ndarray
         """
-        return deepcopy(self.__peak_func_container.GetArgumentContainerList())
+        return self.__function(x, self.__args)
 
-    def GetFunction(self) -> callable:
-        """Get function of peak
+    def FunctionArray(self, x, params) -> ndarray:
+        """Same as "PeakFunctionContainerBase.FunctionArray"
 
-        :rtype: callable
+        :type x: ndarray
+        :type params: ndarray
+        :rtype: ndarray
         """
-        return self.__peak_func_container.Function
+        return self.__function_array(x, params)
 
-    def GetPeakInstance(self) -> PeakFunctionContainerBase:
-        """Get an instance of the "PeakFunctionContainerBase" class contained. This value is deepcopied.
 
-        :rtype: PeakFunctionContainerBase
-        """
-        return deepcopy(self.__peak_func_container)
+class PeakArgumentProxy:
+    """Argument container of a peak stored in "PeakTable". The value is read from and written to the table, and the conversion and the bounds follow the original container.
+    The proxy refers to the peak, not to the row, so it follows the peak when the rows move. After the peak is removed from the table, the proxy holds the value by itself.
+    """
 
-    def GetHelpText(self) -> str:
-        """Returns text to help understand the "Function".
+    def __init__(self, table, peak_id: int, column: int, container: BoundedArgumentContainerBase):
+        """Default constructor
 
-        :rtype: str
+        :type table: PeakTable
+        :param peak_id: Identifier of the peak in the table, which does not change when the rows move
+        :type peak_id: int
+        :param column: Index of the argument
+        :type column: int
+        :param container: The original container shared by the peaks of the same class
+        :type container: BoundedArgumentContainerBase
         """
-        return self.__peak_func_container.GetHelpText()
+        self.__table = table
+        self.__peak_id = peak_id
+        self.__column = column
+        self.__container = container
 
-    def GetTex(self) -> str:
-        """Get statement of function following the Tex syntax.
+    def GetTable(self):
+        """Get the table of the peak, or None if the peak has been removed from the table.
 
-        :rtype: str
+        :rtype: Optional[PeakTable]
         """
-        return self.__peak_func_container.GetTex()
+        return self.__table
 
-    def SendSaveData(self) -> PeakFunctionContainerBase:
-        """Send contained instance of peak.
+    def GetPeakId(self) -> int:
+        """Get the identifier of the peak in the table.
 
-        :rtype: PeakFunctionContainerBase
+        :rtype: int
         """
-        return (self.__peak_func_container,)
+        return self.__peak_id
 
-    def ReceiveSaveData(self, save_data) -> PeakFunctionContainerBase:
-        """Receive saved data
+    def Bind(self, table, peak_id: int):
+        """Refer to the peak in the table. This is called by "PeakTable" when the peak is inserted.
 
-        :type save_data: PeakFunctionContainerBase
+        :type table: PeakTable
+        :type peak_id: int
         """
-        self.__peak_func_container = save_data[0]
+        self.__table = table
+        self.__peak_id = peak_id
 
+    def Detach(self):
+        """Hold the current value by itself. This is called by "PeakTable" when the peak is removed.
+        """
+        self.__container = self.Materialize()
+        self.__table = None
 
-class Spectrum(StorableObject):
-    """Data object for spectrum
-    """
+    def GetContainer(self) -> BoundedArgumentContainerBase:
+        """Get the original container. Do not modify it, because it is shared.
 
-    @classmethod
-    def CreateDummySpectrum(cls, size=100):
-        """Generate dummy data. Can be used for testing, etc.
+        :rtype: BoundedArgumentContainerBase
+        """
+        return self.__container
 
-        :param size: data size, defaults to 100
-        :type size: int, optional
-        :rtype: Spectrum
+    def GetValue(self) -> Union[int, float, None]:
+        """Same as "ArgumentContainerBase.GetValue"
+
+        :rtype: Union[int, float, None]
         """
-        x = array(range(size))
-        y = cos([v + 0.05 * random() for v in x])
-        bg = sin([0.05 * v + 0.01 * random() for v in x])
-        peaks = PeakFunctionContainerList.CreateDummyPeaks(x)
-        return Spectrum(x, y, bg, peaks)
+        if self.__table is None:
+            return self.__container.GetValue()
 
-    def __init__(self, x: ndarray = None, y: ndarray = None, bg: ndarray = None, peaks: PeakFunctionContainerList = None):
-        """Default constructor
+        return self.__table.GetValue(self.__table.GetRow(self.__peak_id), self.__column)
 
-        :param x: xdata of spectrum. if x is None, x convert to empty ndarray. defaults to None
-        :type x: ndarray, optional
-        :param y: ydata of spectrum. y should be same size of x. if x is None or None, y convert to empty ndarray. defaults to None
-        :type y: ndarray, optional
-        :param bg: background of spectrum. bg should be same size of x or None. if bg is None, bg convert to empty ndarray. defaults to None
-        :type bg: ndarray, optional
-        :param peaks: peak of spectrum. if peaks is None, peaks convert to empty list, defaults to None
-        :type peaks: PeakFunctionContainerList, optional
-        :raises ValueError: [description]
+    def SetValue(self, v):
+        """Same as "ArgumentContainerBase.SetValue". If the value is invalid, the default value is stored.
+
+        :type v: Any
         """
-        self.__x = array([0]) if x is None else array(x)
-        self.__y = array(zeros(self.__x.shape, dtype=float)) if y is None else array(y)
-        self.__bg = array(zeros(self.__x.shape, dtype=float)) if bg is None or len(bg) == 0 else bg
-        self.__peaks = PeakFunctionContainerList() if peaks is None else PeakFunctionContainerList(peaks)
+        container = copy(self.__container)
+        container.SetValue(v)
+        if self.__table is None:
+            self.__container = container
+            return
 
-        if not(len(self.__x) == len(self.__y) == len(self.__bg)):
-            raise ValueError()
+        self.__table.SetValue(self.__table.GetRow(self.__peak_id), self.__column, container.GetValue())
 
-    @property
-    def X(self) -> ndarray:
-        """xdata of spectrum. This value is deepcopied.
+    def GetDefault(self) -> Union[int, float, None]:
+        """Same as "ArgumentContainerBase.GetDefault"
+        """
+        return self.__container.GetDefault()
 
-        :rtype: ndarray
+    def IsValidValue(self, value) -> bool:
+        """Same as "ArgumentContainerBase.IsValidValue"
         """
-        return deepcopy(self.__x)
+        return self.__container.IsValidValue(value)
 
-    @X.setter
-    def X(self, x):
-        if len(x) != len(self.__y):
-            raise TypeError('The length of "x" should be the same as the length of "y".')
+    def HasValidValue(self) -> bool:
+        """Always True, because the table holds only valid values, and the default value is stored instead of an invalid value.
+        """
+        return True
 
-        self.__x = array(x)
-        for peak in self.__peaks:
-            peak.X = self.__x
+    def GetMin(self) -> Union[int, float]:
+        """Same as "BoundedArgumentContainerBase.GetMin"
+        """
+        return self.__container.GetMin()
 
-    @property
-    def Y(self) -> ndarray:
-        """ydata of spectrum. This value is deepcopied.
+    def GetMax(self) -> Union[int, float]:
+        """Same as "BoundedArgumentContainerBase.GetMax"
+        """
+        return self.__container.GetMax()
 
-        :rtype: ndarray
+    def GetBounds(self) -> Tuple[Union[int, float], Union[int, float]]:
+        """Same as "BoundedArgumentContainerBase.GetBounds"
         """
-        return deepcopy(self.__y)
+        return self.__container.GetBounds()
 
-    @Y.setter
-    def Y(self, y):
-        if len(y) != len(self.__x):
-            raise TypeError('The length of "y" should be the same as the length of "x".')
+    def SendSaveData(self) -> Tuple[Union[int, float], Union[int, float], Union[int, float]]:
+        """Same as "BoundedArgumentContainerBase.SendSaveData"
+        """
+        return (self.GetValue(), *self.GetBounds())
 
-        self.__y = array(y)
+    def ReceiveSaveData(self, save_data: Tuple[Union[int, float], Union[int, float], Union[int, float]]):
+        """Same as "BoundedArgumentContainerBase.ReceiveSaveData", but only the value is received because the bounds are shared.
+        """
+        self.SetValue(save_data[0])
 
-    @property
-    def XY(self) -> Tuple[ndarray, ndarray]:
-        """data of spectrum. This value is deepcopied.
+    def Materialize(self) -> BoundedArgumentContainerBase:
+        """Get a standalone container with the current value.
 
-        :rtype: Tuple[ndarray, ndarray]
+        :rtype: BoundedArgumentContainerBase
         """
-        return deepcopy(self.__x), deepcopy(self.__y)
+        container = copy(self.__container)
+        container.SetValue(self.GetValue())
+        return container
 
-    @XY.setter
-    def XY(self, x, y=None):
-        if y is None:
-            x, y = x
+    def __str__(self):
+        v = self.GetValue()
+        return '' if v is None else str(v)
 
-        if len(x) != len(y):
-            raise TypeError('The length of "x" should be the same as the length of "y".')
+    # Copies of the proxy do not refer to the table.
+    def __deepcopy__(self, memo):
+        return self.Materialize()
 
-        self.__x = array(x)
-        self.__y = array(y)
-        self.__bg = self.__x * 0
-        for peak in self.__peaks:
-            peak.X = self.__x
+    # The standalone container is pickled as the argument, and a copy of it is restored in place of the proxy.
+    def __reduce_ex__(self, protocol):
+        return copy, (self.Materialize(),)
 
-    @property
-    def BackGround(self):
-        return deepcopy(self.__bg)
 
-    @BackGround.setter
-    def BackGround(self, bg):
-        """Background of spectrum. This value is deepcopied.
+class PeakTable:
+    """Struct-of-arrays storage of peaks used by "PeakFunctionContainerList".
+    The arguments of all the peaks are stored in a float matrix, and the classes, names and bounds of the arguments are shared through prototypes.
+    Peaks whose arguments are not numbers, or which have attributes other than the arguments, are stored as they are.
+    """
+    # Prototypes shared by all the tables. The key is the class and the names, types, bounds and defaults of the arguments.
+    __prototype_dict = {}
 
-        :rtype: ndarray
+    def __init__(self):
+        """Default constructor
         """
-        if len(bg) != len(self.__x):
-            raise TypeError('The length of "bg" should be the same as the length of "x".')
+        self.__kind_key_list = []
+        self.__kind_list = []
+        self.__kind_dict = {}
+        self.__kind_array = zeros(0, dtype=int32)
+        self.__args_matrix = zeros((0, 0))
+        self.__size = 0
+        # Each row has an identifier which does not change when the rows move. The peaks taken by "GetPeak" are kept while they are referred to.
+        self.__id_array = zeros(0, dtype=int64)
+        self.__next_id = 0
+        self.__row_dict = None
+        self.__peak_dict = WeakValueDictionary()
 
-        self.__bg = array(bg)
+    def __len__(self):
+        return self.__size
 
-    @BackGround.deleter
-    def BackGround(self):
-        self.__bg = array(zeros(self.__x.shape, dtype=float))
+    def GetNbytes(self) -> int:
+        """Get memory size of the arrays in bytes.
 
-    @property
-    def Peaks(self) -> PeakFunctionContainerList:
-        """Peaks of spectrum. This value is deepcopied.
+        :rtype: int
+        """
+        return self.__kind_array.nbytes + self.__args_matrix.nbytes + self.__id_array.nbytes
 
+    def GetPeak(self, row: int) -> PeakFunctionContainerBase:
+        """Get the peak whose arguments are proxies of the row. Like the elements of a list, the same peak is returned while it is referred to, and it follows the row when the other rows are inserted or removed.
+
+        :type row: int
+        :rtype: PeakFunctionContainerBase
+        """
+        kind = self.__kind_array[row]
+        prototype = self.__kind_list[kind]
+        if self.__kind_key_list[kind] is None:
+            return prototype
+
+        peak_id = int(self.__id_array[row])
+        if (peak := self.__peak_dict.get(peak_id)) is None:
+            # The peaks in the table have no attributes other than the arguments, so "__init__" is not needed.
+            peak = prototype.__class__.__new__(prototype.__class__)
+            peak.arg_container_dict = {name: PeakArgumentProxy(self, peak_id, column, container) for column, (name, container) in enumerate(prototype.arg_container_dict.items())}
+            self.__peak_dict[peak_id] = peak
+
+        return peak
+
+    def GetRow(self, peak_id: int) -> int:
+        """Get the current row of the peak.
+
+        :type peak_id: int
+        :raises KeyError: Sent if the peak is not in the table.
+        :rtype: int
+        """
+        if self.__row_dict is None:
+            self.__row_dict = dict(zip(self.__id_array[:self.__size].tolist(), range(self.__size)))
+
+        return self.__row_dict[peak_id]
+
+    def GetSnapshot(self, row: int):
+        """Get a snapshot of the peak without creating the proxy.
+
+        :type row: int
+        :rtype: PeakSnapshot
+        """
+        kind = self.__kind_array[row]
+        prototype = self.__kind_list[kind]
+        if self.__kind_key_list[kind] is None:
+            return prototype.GetSnapshot()
+
+        return PeakSnapshot(prototype, self.GetArgs(row))
+
+    def GetArgs(self, row: int) -> Tuple[Union[int, float, None], ...]:
+        """Get the arguments of the peak.
+
+        :type row: int
+        :rtype: Tuple[Union[int, float, None], ...]
+        """
+        kind = self.__kind_array[row]
+        prototype = self.__kind_list[kind]
+        if self.__kind_key_list[kind] is None:
+            return prototype.GetArgs()
+
+        return tuple([self.GetValue(row, column) for column in range(len(prototype.arg_container_dict))])
+
+    def GetValue(self, row: int, column: int) -> Union[int, float, None]:
+        """Get an argument of the peak.
+
+        :type row: int
+        :type column: int
+        :rtype: Union[int, float, None]
+        """
+        v = self.__args_matrix[row, column]
+        if isnan(v):
+            return None
+
+        container_class = self.__kind_key_list[self.__kind_array[row]][1][column][1]
+        return int(v) if issubclass(container_class, OptionalIntContainer) else float(v)
+
+    def SetValue(self, row: int, column: int, v: Union[int, float, None]):
+        """Set an argument of the peak. The value is not validated.
+
+        :type row: int
+        :type column: int
+        :type v: Union[int, float, None]
+        """
+        self.__args_matrix[row, column] = nan if v is None else v
+
+    def GetGroups(self) -> List[Tuple[PeakFunctionContainerBase, ndarray, ndarray]]:
+        """Get the rows of each prototype.
+
+        :return: Tuples of the prototype, the indices of the rows and their arguments, or None for the peaks stored as they are.
+        :rtype: List[Tuple[PeakFunctionContainerBase, ndarray, Optional[ndarray]]]
+        """
+        kind_array = self.__kind_array[:self.__size]
+        group_list = []
+        for kind in unique(kind_array):
+            prototype = self.__kind_list[kind]
+            row_array = flatnonzero(kind_array == kind)
+            args_matrix = None if self.__kind_key_list[kind] is None else self.__args_matrix[row_array, :len(prototype.arg_container_dict)]
+            group_list.append((prototype, row_array, args_matrix))
+
+        return group_list
+
+    def GetArgsMatrix(self, column_count: int) -> ndarray:
+        """Get the first arguments of all the peaks as a float matrix. The missing and non-numerical arguments are NaN.
+
+        :param column_count: Number of the arguments taken from the first
+        :type column_count: int
+        :return: shape (number of peaks, column_count)
+        :rtype: ndarray
+        """
+        if self.__args_matrix.shape[1] >= column_count and None not in self.__kind_key_list:
+            return self.__args_matrix[:self.__size, :column_count].copy()
+
+        args_matrix = full((self.__size, column_count), nan)
+        width = min(column_count, self.__args_matrix.shape[1])
+        args_matrix[:, :width] = self.__args_matrix[:self.__size, :width]
+        for kind, key in enumerate(self.__kind_key_list):
+            if key is not None:
+                continue
+
+            args = [v if isinstance(v, (int, float)) and not isinstance(v, bool) else nan for v in self.__kind_list[kind].GetArgs()[:column_count]]
+            args_matrix[self.__kind_array[:self.__size] == kind, :len(args)] = args
+
+        return args_matrix
+
+    def Insert(self, row: int, peak: PeakFunctionContainerBase):
+        """Insert a peak before the row. The arguments are copied into the table, and the arguments of the peak are replaced with proxies of the row, so the peak and the row are changed together.
+        If the peak refers to another row, that row no longer returns the peak from "GetPeak".
+
+        :type row: int
+        :type peak: PeakFunctionContainerBase
+        """
+        key, args = self.__GetKeyAndArgs(peak)
+        kind = self.__GetKind(key, peak)
+        self.__Reserve(self.__size + 1, len(args))
+
+        size = self.__size
+        self.__kind_array[row + 1:size + 1] = self.__kind_array[row:size]
+        self.__args_matrix[row + 1:size + 1] = self.__args_matrix[row:size]
+        self.__id_array[row + 1:size + 1] = self.__id_array[row:size]
+        self.__kind_array[row] = kind
+        self.__args_matrix[row] = nan
+        self.__args_matrix[row, :len(args)] = args
+        self.__id_array[row] = peak_id = self.__next_id
+        self.__next_id += 1
+        self.__size += 1
+        self.__row_dict = None
+
+        if key is not None:
+            self.__Bind(peak, peak_id, self.__kind_list[kind])
+
+    def Extend(self, table):
+        """Append all the peaks of the other table.
+
+        :type table: PeakTable
+        """
+        kind_map = array([self.__GetKind(key, prototype) for key, prototype in zip(table.__kind_key_list, table.__kind_list)], dtype=int32)
+        size, other_size = self.__size, table.__size
+        self.__Reserve(size + other_size, table.__args_matrix.shape[1])
+        self.__kind_array[size:size + other_size] = kind_map[table.__kind_array[:other_size]]
+        self.__args_matrix[size:size + other_size] = nan
+        self.__args_matrix[size:size + other_size, :table.__args_matrix.shape[1]] = table.__args_matrix[:other_size]
+        self.__AppendId(other_size)
+
+    def ExtendArray(self, prototype_list: List[PeakFunctionContainerBase], kind_array: ndarray, args_matrix: ndarray):
+        """Append peaks given as a table. The arguments should fit the containers of the prototypes.
+
+        :param prototype_list: A peak of each class. Only the class and the containers are used.
+        :type prototype_list: List[PeakFunctionContainerBase]
+        :param kind_array: Index of the prototype of each peak
+        :type kind_array: ndarray
+        :param args_matrix: Arguments of each peak, padded with NaN
+        :type args_matrix: ndarray
+        :raises TypeError: Sent if a prototype can not be stored in the table.
+        """
+        key_list = [self.__GetKeyAndArgs(prototype)[0] for prototype in prototype_list]
+        if None in key_list:
+            raise TypeError('The prototypes should have only numerical arguments.')
+
+        kind_map = array([self.__GetKind(key, prototype) for key, prototype in zip(key_list, prototype_list)], dtype=int32)
+
+        size, other_size = self.__size, len(kind_array)
+        self.__Reserve(size + other_size, args_matrix.shape[1])
+        self.__kind_array[size:size + other_size] = kind_map[asarray(kind_array, dtype=intp)]
+        self.__args_matrix[size:size + other_size] = nan
+        self.__args_matrix[size:size + other_size, :args_matrix.shape[1]] = args_matrix
+        self.__AppendId(other_size)
+
+    def Delete(self, rows: Iterable[int]):
+        """Remove the rows. The peaks taken by "GetPeak" hold their arguments by themselves, like the elements removed from a list.
+
+        :type rows: Iterable[int]
+        """
+        mask = ones(self.__size, dtype=bool)
+        mask[list(rows)] = False
+        for peak_id in self.__id_array[:self.__size][~mask].tolist():
+            if (peak := self.__peak_dict.pop(peak_id, None)) is not None:
+                for container in peak.arg_container_dict.values():
+                    if isinstance(container, PeakArgumentProxy):
+                        container.Detach()
+
+        self.__kind_array = self.__kind_array[:self.__size][mask]
+        self.__args_matrix = self.__args_matrix[:self.__size][mask]
+        self.__id_array = self.__id_array[:self.__size][mask]
+        self.__size = len(self.__kind_array)
+        self.__row_dict = None
+
+    def Reorder(self, rows: Iterable[int]):
+        """Rearrange the rows. The peaks taken by "GetPeak" follow their rows.
+
+        :param rows: All the rows in the new order
+        :type rows: Iterable[int]
+        """
+        rows = asarray(list(rows), dtype=intp)
+        if sorted(rows.tolist()) != list(range(self.__size)):
+            raise ValueError('"rows" should be a permutation of the rows.')
+
+        self.__kind_array[:self.__size] = self.__kind_array[rows]
+        self.__args_matrix[:self.__size] = self.__args_matrix[rows]
+        self.__id_array[:self.__size] = self.__id_array[rows]
+        self.__row_dict = None
+
+    def Take(self, rows: Iterable[int]):
+        """Get a new table with the given rows.
+
+        :type rows: Iterable[int]
+        :rtype: PeakTable
+        """
+        rows = asarray(list(rows), dtype=intp)
+        return self.__Copy(self.__kind_array[rows], self.__args_matrix[rows])
+
+    def IsSame(self, table) -> bool:
+        """Returns True if the peaks of the tables have the same classes and arguments.
+
+        :type table: PeakTable
+        :rtype: bool
+        """
+        if self.__size != table.__size:
+            return False
+
+        for row in range(self.__size):
+            kind, other_kind = self.__kind_array[row], table.__kind_array[row]
+            key, other_key = self.__kind_key_list[kind], table.__kind_key_list[other_kind]
+            if key is None or other_key is None:
+                return False
+
+            if key != other_key:
+                return False
+
+        width = min(self.__args_matrix.shape[1], table.__args_matrix.shape[1])
+        return array_equal(self.__args_matrix[:self.__size, :width], table.__args_matrix[:table.__size, :width], equal_nan=True)
+
+    @classmethod
+    def IsStorable(cls, peak: PeakFunctionContainerBase) -> bool:
+        """Returns True if the arguments of the peak can be stored in the table.
+
+        :type peak: PeakFunctionContainerBase
+        :rtype: bool
+        """
+        return cls.__GetKeyAndArgs(peak)[0] is not None
+
+    @staticmethod
+    def __GetKeyAndArgs(peak):
+        # The key is None if the peak can not be stored in the table.
+        if set(vars(peak)) != {'arg_container_dict'}:
+            return None, ()
+
+        key_list = []
+        args = []
+        for name, container in peak.GetArgumentContainerDict().items():
+            v = container.GetValue()
+            if isinstance(container, PeakArgumentProxy):
+                container = container.GetContainer()
+
+            if not isinstance(container, BoundedArgumentContainerBase) or not (v is None or (isinstance(v, (int, float)) and not isinstance(v, bool))):
+                return None, ()
+
+            key_list.append((name, type(container), container.GetBounds(), container.GetDefault()))
+            args.append(nan if v is None else v)
+
+        return (type(peak), tuple(key_list)), args
+
+    def __GetKind(self, key, peak):
+        if key is None:
+            self.__kind_key_list.append(None)
+            self.__kind_list.append(peak)
+            return len(self.__kind_list) - 1
+
+        if key not in self.__kind_dict:
+            if key not in PeakTable.__prototype_dict:
+                PeakTable.__prototype_dict[key] = deepcopy(peak)
+
+            self.__kind_dict[key] = len(self.__kind_list)
+            self.__kind_key_list.append(key)
+            self.__kind_list.append(PeakTable.__prototype_dict[key])
+
+        return self.__kind_dict[key]
+
+    def __Bind(self, peak, peak_id, prototype):
+        for column, (name, container) in enumerate(list(peak.arg_container_dict.items())):
+            if not isinstance(container, PeakArgumentProxy):
+                peak.arg_container_dict[name] = PeakArgumentProxy(self, peak_id, column, prototype.arg_container_dict[name])
+                continue
+
+            if (table := container.GetTable()) is not None:
+                table.__peak_dict.pop(container.GetPeakId(), None)
+
+            container.Bind(self, peak_id)
+
+        self.__peak_dict[peak_id] = peak
+
+    def __AppendId(self, size):
+        self.__id_array[self.__size:self.__size + size] = arange(self.__next_id, self.__next_id + size)
+        self.__next_id += size
+        self.__size += size
+        self.__row_dict = None
+
+    def __Reserve(self, size, width):
+        capacity, current_width = self.__args_matrix.shape
+        if size <= capacity and width <= current_width:
+            return
+
+        capacity = max(size, 2 * capacity) if size > capacity else capacity
+        width = max(width, current_width)
+        kind_array = zeros(capacity, dtype=int32)
+        args_matrix = full((capacity, width), nan)
+        id_array = zeros(capacity, dtype=int64)
+        kind_array[:self.__size] = self.__kind_array[:self.__size]
+        args_matrix[:self.__size, :current_width] = self.__args_matrix[:self.__size]
+        id_array[:self.__size] = self.__id_array[:self.__size]
+        self.__kind_array = kind_array
+        self.__args_matrix = args_matrix
+        self.__id_array = id_array
+
+    def __Copy(self, kind_array, args_matrix, memo=None):
+        # The shared prototypes are not copied. The peaks stored as they are are copied only if memo is given.
+        table = PeakTable()
+        table.__kind_key_list = list(self.__kind_key_list)
+        table.__kind_list = [prototype if key is not None or memo is None else deepcopy(prototype, memo) for key, prototype in zip(self.__kind_key_list, self.__kind_list)]
+        table.__kind_dict = dict(self.__kind_dict)
+        table.__kind_array = kind_array
+        table.__args_matrix = args_matrix
+        table.__id_array = zeros(len(kind_array), dtype=int64)
+        table.__AppendId(len(kind_array))
+        return table
+
+    def __deepcopy__(self, memo):
+        return self.__Copy(self.__kind_array[:self.__size].copy(), self.__args_matrix[:self.__size].copy(), memo)
+
+    # The prototypes are replaced with the shared ones after unpickling.
+    def __getstate__(self):
+        return self.__kind_key_list, self.__kind_list, self.__kind_array[:self.__size], self.__args_matrix[:self.__size]
+
+    def __setstate__(self, state):
+        self.__kind_key_list, self.__kind_list, self.__kind_array, self.__args_matrix = state
+        self.__kind_dict = {}
+        for kind, key in enumerate(self.__kind_key_list):
+            if key is not None:
+                self.__kind_list[kind] = PeakTable.__prototype_dict.setdefault(key, self.__kind_list[kind])
+                self.__kind_dict[key] = kind
+
+        self.__size = 0
+        self.__id_array = zeros(len(self.__kind_array), dtype=int64)
+        self.__next_id = 0
+        self.__peak_dict = WeakValueDictionary()
+        self.__AppendId(len(self.__kind_array))
+
+
+class PeakFunctionContainerList(RestrictedStorableListBase):
+    @classmethod
+    def CreateDummyPeaks(cls, x=None, size=None):
+        """Generate dummy data. Can be used for testing, etc.
+
+        :param x: xdata, If "x" is none, it will be converted to an array of size 100, defaults to None
+        :type x: ndrray, optional
+        :param size: size of peaks, if size is none, then a value between 0 and 5 will be randomly selected, defaults to None
+        :type size: int, optional
+        :return: instance of PeakFunctionContainerList
         :rtype: PeakFunctionContainerList
         """
-        return deepcopy(self.__peaks)
+        peaks = PeakFunctionContainerList()
+        x = array(range(300))
+        size = int(random() * 5) if size is None else size
+        for _ in range(size):
+            peak = DEFAULT_PEAK
+            peak.X = x
+            peak.Amp = random()
+            peak.Ctr = size * random()
+            peak.Wid = size * random()
+            peaks.append(peak)
+        return peaks
+
+    def __init__(self, *args, **kwargs):
+        """List with elements restricted to PeakFunctionContainerBase. The peaks are stored in "PeakTable", and the elements are proxies that read and write the table.
+        """
+        self.__table = PeakTable()
+        super().__init__(PeakFunctionContainerBase)
+        self.extend(list(*args, **kwargs) if len(args) == 0 or not isinstance(args[0], PeakFunctionContainerList) else args[0])
+
+    def __iter__(self):
+        return (self.__table.GetPeak(row) for row in range(len(self.__table)))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.__FromTable(self.__table.Take(range(len(self))[key]))
+
+        return self.__table.GetPeak(self.__GetRow(key))
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            peak_list = list(self)
+            peak_list[key] = value
+            self.clear()
+            self.extend(peak_list)
+            return
+
+        row = self.__GetRow(key)
+        self.__table.Insert(row, self.__Validate(value))
+        self.__table.Delete([row + 1])
+
+    def __delitem__(self, key):
+        rows = range(len(self))[key] if isinstance(key, slice) else [self.__GetRow(key)]
+        self.__table.Delete(rows)
+
+    def __contains__(self, key):
+        return any(self.__IsSamePeak(peak, key) for peak in self)
+
+    def __add__(self, value):
+        return list(self) + value
+
+    def __iadd__(self, value):
+        self.extend(value)
+        return self
+
+    def __len__(self):
+        return len(self.__table)
+
+    def append(self, object):
+        """Same as default list. The arguments of the peak are stored in the table, and the peak refers to them.
+        """
+        self.__table.Insert(len(self), self.__Validate(object))
+
+    def insert(self, index, object):
+        """Same as default list. The arguments of the peak are stored in the table, and the peak refers to them.
+        """
+        self.__table.Insert(min(max(index + len(self) if index < 0 else index, 0), len(self)), self.__Validate(object))
+
+    def extend(self, iterable):
+        """Same as default list, but the peaks of another "PeakFunctionContainerList" are copied.
+        """
+        if isinstance(iterable, PeakFunctionContainerList):
+            self.__table.Extend(iterable.__table)
+            return
+
+        for peak in list(iterable):
+            self.append(peak)
+
+    def remove(self, x):
+        """Same as default list. The peaks are compared by their classes and arguments.
+        """
+        del self[self.index(x)]
+
+    def pop(self, i=-1):
+        """Same as default list.
+        """
+        peak = self[i]
+        del self[i]
+        return peak
+
+    def clear(self):
+        """Same as default list.
+        """
+        self.__table.Delete(range(len(self)))
+
+    def index(self, x, start=0, end=None):
+        """Same as default list. The peaks are compared by their classes and arguments.
+        """
+        for n in range(len(self))[start:end]:
+            if self.__IsSamePeak(self[n], x):
+                return n
+
+        raise ValueError(f'{x} is not in list')
+
+    def count(self, x):
+        """Same as default list. The peaks are compared by their classes and arguments.
+        """
+        return sum(self.__IsSamePeak(peak, x) for peak in self)
+
+    def reverse(self):
+        """Same as default list.
+        """
+        self.__table.Reorder(range(len(self) - 1, -1, -1))
+
+    def copy(self):
+        """Same as default list, but the peaks are also copied.
+        """
+        return deepcopy(self)
+
+    def GetTable(self) -> PeakTable:
+        """Get the table that stores the peaks. Modifying it changes the peaks.
+
+        :rtype: PeakTable
+        """
+        return self.__table
+
+    def GetSnapshots(self) -> Tuple[PeakSnapshot, ...]:
+        """Get snapshots of the peaks without creating the proxies.
+
+        :rtype: Tuple[PeakSnapshot, ...]
+        """
+        return tuple([self.__table.GetSnapshot(row) for row in range(len(self))])
+
+    def ExtendArray(self, prototype_list: List[PeakFunctionContainerBase], kind_array: ndarray, args_matrix: ndarray):
+        """Append peaks given as a table. Refer to "PeakTable.ExtendArray" for details.
+
+        :type prototype_list: List[PeakFunctionContainerBase]
+        :type kind_array: ndarray
+        :type args_matrix: ndarray
+        """
+        self.__table.ExtendArray(prototype_list, kind_array, args_matrix)
+
+    def IsSame(self, peaks) -> bool:
+        """Returns True if the peaks have the same classes and arguments. Peaks which are not stored in the table are regarded as different.
+
+        :type peaks: PeakFunctionContainerList
+        :rtype: bool
+        """
+        return self.__table.IsSame(peaks.__table)
+
+    def ExecutionArray(self, x) -> ndarray:
+        """Calculate all the peaks at once with a "FunctionArray" call for each class of peak.
+
+        :param x: xdata of spectral data
+        :type x: Iterable
+        :return: Values of each peak, shape (number of peaks, len(x))
+        :rtype: ndarray
+        """
+        x = asarray(x, dtype=float)
+        values = zeros((len(self), len(x)))
+        for prototype, row_array, args_matrix in self.__table.GetGroups():
+            if args_matrix is None:
+                values[row_array] = prototype.Execution(x)
+            else:
+                values[row_array] = prototype.FunctionArray(x, args_matrix)
+
+        return values
+
+    def __GetRow(self, index):
+        row = index + len(self) if index < 0 else index
+        if not 0 <= row < len(self):
+            raise IndexError('list index out of range')
+
+        return row
+
+    def __Validate(self, peak):
+        if not isinstance(peak, PeakFunctionContainerBase):
+            raise TypeError(f'Can not include anything other than an instance of "{PeakFunctionContainerBase}".')
+
+        return peak
+
+    def __IsSamePeak(self, peak, other_peak):
+        return type(peak) is type(other_peak) and peak.GetArgs() == other_peak.GetArgs()
+
+    @classmethod
+    def __FromTable(cls, table):
+        peaks = cls()
+        peaks.__table = table
+        return peaks
+
+
+class PeakType(StorableObject):
+    """Data object for peak type
+    """
+
+    def __init__(self, peak_func_container: PeakFunctionContainerList = None):
+        """Default constructor
+
+        :param peak_func_container: The original peak function, defaults to None
+        :type peak_func_container: PeakFunctionContainerList, optional
+        """
+        if peak_func_container is not None and not isinstance(peak_func_container, PeakFunctionContainerBase):
+            raise TypeError()
+        self.__peak_func_container = peak_func_container
+
+    def GetName(self) -> str:
+        """Get name of peak
+
+        :rtype: str
+        """
+        return self.__peak_func_container.__class__.__name__
+
+    def GetArgumentLength(self) -> int:
+        """Get length of argument
+
+        :rtype: int
+        """
+        return len(self.__peak_func_container.GetArgs())
+
+    def GetArgumentNames(self) -> Tuple[str, ...]:
+        """Get a list of argument names
+
+        :rtype: Tuple[str, ...]
+        """
+        return self.__peak_func_container.GetArgumentNames()
+
+    def GetArgumentContainerList(self) -> List[ArgumentContainerBase]:
+        """Get a list of "ArgumentContainerBase" class. This value is deepcopied.
+
+        :rtype: List[ArgumentContainerBase, ...]
+        """
+        return deepcopy(self.__peak_func_container.GetArgumentContainerList())
+
+    def GetFunction(self) -> callable:
+        """Get function of peak
+
+        :rtype: callable
+        """
+        return self.__peak_func_container.Function
+
+    def GetPeakInstance(self) -> PeakFunctionContainerBase:
+        """Get an instance of the "PeakFunctionContainerBase" class contained. This value is deepcopied.
+
+        :rtype: PeakFunctionContainerBase
+        """
+        return deepcopy(self.__peak_func_container)
+
+    def GetHelpText(self) -> str:
+        """Returns text to help understand the "Function".
+
+        :rtype: str
+        """
+        return self.__peak_func_container.GetHelpText()
+
+    def GetTex(self) -> str:
+        """Get statement of function following the Tex syntax.
+
+        :rtype: str
+        """
+        return self.__peak_func_container.GetTex()
+
+    def SendSaveData(self) -> PeakFunctionContainerBase:
+        """Send contained instance of peak.
+
+        :rtype: PeakFunctionContainerBase
+        """
+        return (self.__peak_func_container,)
+
+    def ReceiveSaveData(self, save_data) -> PeakFunctionContainerBase:
+        """Receive saved data
+
+        :type save_data: PeakFunctionContainerBase
+        """
+        self.__peak_func_container = save_data[0]
+
+
+class Spectrum(StorableObject):
+    """Data object for spectrum
+    """
+
+    @classmethod
+    def CreateDummySpectrum(cls, size=100):
+        """Generate dummy data. Can be used for testing, etc.
+
+        :param size: data size, defaults to 100
+        :type size: int, optional
+        :rtype: Spectrum
+        """
+        x = array(range(size))
+        y = cos([v + 0.05 * random() for v in x])
+        bg = sin([0.05 * v + 0.01 * random() for v in x])
+        peaks = PeakFunctionContainerList.CreateDummyPeaks(x)
+        return Spectrum(x, y, bg, peaks)
+
+    def __init__(self, x: ndarray = None, y: ndarray = None, bg: ndarray = None, peaks: PeakFunctionContainerList = None, copy: bool = True):
+        """Default constructor
+
+        :param x: xdata of spectrum. if x is None, x convert to empty ndarray. defaults to None
+        :type x: ndarray, optional
+        :param y: ydata of spectrum. y should be same size of x. if x is None or None, y convert to empty ndarray. defaults to None
+        :type y: ndarray, optional
+        :param bg: background of spectrum. bg should be same size of x or None. if bg is None, bg convert to empty ndarray. defaults to None
+        :type bg: ndarray, optional
+        :param peaks: peak of spectrum. if peaks is None, peaks convert to empty list, defaults to None
+        :type peaks: PeakFunctionContainerList, optional
+        :param copy: If False, the arrays are held without copying. This is used for memory-mapped arrays, which are read from the file when they are accessed. defaults to True
+        :type copy: bool, optional
+        :raises ValueError: [description]
+        """
+        to_array = array if copy else asarray
+        self.__x = array([0]) if x is None else to_array(x)
+        self.__y = array(zeros(self.__x.shape, dtype=float)) if y is None else to_array(y)
+        self.__bg = array(zeros(self.__x.shape, dtype=float)) if bg is None or len(bg) == 0 else to_array(bg)
+        self.__peaks = PeakFunctionContainerList() if peaks is None else PeakFunctionContainerList(peaks)
+
+        if not(len(self.__x) == len(self.__y) == len(self.__bg)):
+            raise ValueError()
+
+    @property
+    def X(self) -> ndarray:
+        """xdata of spectrum. This value is deepcopied.
+
+        :rtype: ndarray
+        """
+        return deepcopy(self.__x)
+
+    @X.setter
+    def X(self, x):
+        if len(x) != len(self.__y):
+            raise TypeError('The length of "x" should be the same as the length of "y".')
+
+        self.__x = array(x)
+        for peak in self.__peaks:
+            peak.X = self.__x
+
+    @property
+    def Y(self) -> ndarray:
+        """ydata of spectrum. This value is deepcopied.
+
+        :rtype: ndarray
+        """
+        return deepcopy(self.__y)
+
+    @Y.setter
+    def Y(self, y):
+        if len(y) != len(self.__x):
+            raise TypeError('The length of "y" should be the same as the length of "x".')
+
+        self.__y = array(y)
+
+    @property
+    def XY(self) -> Tuple[ndarray, ndarray]:
+        """data of spectrum. This value is deepcopied.
+
+        :rtype: Tuple[ndarray, ndarray]
+        """
+        return deepcopy(self.__x), deepcopy(self.__y)
+
+    @XY.setter
+    def XY(self, x, y=None):
+        if y is None:
+            x, y = x
+
+        if len(x) != len(y):
+            raise TypeError('The length of "x" should be the same as the length of "y".')
+
+        self.__x = array(x)
+        self.__y = array(y)
+        self.__bg = self.__x * 0
+        for peak in self.__peaks:
+            peak.X = self.__x
+
+    @property
+    def BackGround(self):
+        return deepcopy(self.__bg)
+
+    @BackGround.setter
+    def BackGround(self, bg):
+        """Background of spectrum. This value is deepcopied.
+
+        :rtype: ndarray
+        """
+        if len(bg) != len(self.__x):
+            raise TypeError('The length of "bg" should be the same as the length of "x".')
+
+        self.__bg = array(bg)
+
+    @BackGround.deleter
+    def BackGround(self):
+        self.__bg = array(zeros(self.__x.shape, dtype=float))
+
+    @property
+    def Peaks(self) -> PeakFunctionContainerList:
+        """Peaks of spectrum. This value is deepcopied.
+
+        :rtype: PeakFunctionContainerList
+        """
+        return deepcopy(self.__peaks)
+
+    @Peaks.setter
+    def Peaks(self, peaks):
+        self.__peaks = PeakFunctionContainerList(peaks)
+
+    @Peaks.deleter
+    def Peaks(self):
+        self.__peaks = PeakFunctionContainerList()
+
+    @property
+    def XView(self) -> ndarray:
+        """xdata of spectrum. This value is read-only view, so use "X" to get writable copy.
+
+        :rtype: ndarray
+        """
+        return self.__GetView(self.__x)
+
+    @property
+    def YView(self) -> ndarray:
+        """ydata of spectrum. This value is read-only view, so use "Y" to get writable copy.
+
+        :rtype: ndarray
+        """
+        return self.__GetView(self.__y)
+
+    @property
+    def XYView(self) -> Tuple[ndarray, ndarray]:
+        """data of spectrum. These values are read-only views, so use "XY" to get writable copies.
+
+        :rtype: Tuple[ndarray, ndarray]
+        """
+        return self.__GetView(self.__x), self.__GetView(self.__y)
+
+    @property
+    def BackGroundView(self) -> ndarray:
+        """Background of spectrum. This value is read-only view, so use "BackGround" to get writable copy.
+
+        :rtype: ndarray
+        """
+        return self.__GetView(self.__bg)
+
+    @property
+    def PeaksView(self) -> Tuple[PeakSnapshot, ...]:
+        """Snapshots of peaks of spectrum. Use "Peaks" to get modifiable peaks.
+
+        :rtype: Tuple[PeakSnapshot, ...]
+        """
+        return self.__peaks.GetSnapshots()
+
+    @property
+    def PeakTableView(self) -> PeakTable:
+        """Table of peaks of spectrum. Do not modify it, and use "Peaks" to get modifiable peaks.
+
+        :rtype: PeakTable
+        """
+        return self.__peaks.GetTable()
+
+    def Load(self, memo: Optional[dict] = None):
+        """Load the arrays held without copying, like memory-mapped arrays, into memory. After this, the spectrum no longer refers to the file.
+
+        :param memo: The arrays already loaded, keyed by the memory of the source arrays. Pass the same dictionary to the spectra sharing the arrays, so that each shared array is loaded into one array. defaults to None
+        :type memo: Optional[dict], optional
+        """
+        if memo is None:
+            memo = {}
+
+        self.__x, self.__y, self.__bg = [self.__LoadArray(a, memo) for a in (self.__x, self.__y, self.__bg)]
+
+    def __LoadArray(self, a, memo):
+        if a.flags.owndata:
+            return a
+
+        key = (a.__array_interface__['data'][0], a.dtype.str, a.shape, a.strides)
+        if key not in memo:
+            # The source is kept so that its memory is not reused by another array while the memo is used.
+            memo[key] = (a, array(a))
+
+        return memo[key][1]
+
+    def __GetView(self, a):
+        view = a.view()
+        view.flags.writeable = False
+        return view
+
+    def ShareUnchanged(self, spectrum, params: str = 'xybp'):
+        """Replaces the fields equal to the ones of the given spectrum with references to them.
+        This is used by the history of "DataContainer" not to hold the same arrays and peaks many times.
+
+        :type spectrum: Spectrum
+        :param params: Fields to be compared. 'x', 'y', 'b' and 'p' can be specified. Defaults to 'xybp'
+        :type params: str, optional
+        :return: The fields that have been shared.
+        :rtype: str
+        """
+        shared_params = ''
+        if 'x' in params and self.__IsSameArray(self.__x, spectrum.__x):
+            self.__x = spectrum.__x
+            shared_params += 'x'
+
+        if 'y' in params and self.__IsSameArray(self.__y, spectrum.__y):
+            self.__y = spectrum.__y
+            shared_params += 'y'
+
+        if 'b' in params and self.__IsSameArray(self.__bg, spectrum.__bg):
+            self.__bg = spectrum.__bg
+            shared_params += 'b'
+
+        if 'p' in params and self.__IsSamePeaks(self.__peaks, spectrum.__peaks):
+            self.__peaks = spectrum.__peaks
+            shared_params += 'p'
+
+        return shared_params
+
+    def __IsSameArray(self, a, b):
+        return a is b or (a.dtype == b.dtype and a.shape == b.shape and array_equal(a, b))
+
+    def __IsSamePeaks(self, peaks, other_peaks):
+        if peaks is other_peaks:
+            return True
+
+        if len(peaks) != len(other_peaks):
+            return False
+
+        if peaks.IsSame(other_peaks):
+            return True
+
+        for peak, other_peak in zip(peaks, other_peaks):
+            if type(peak) is not type(other_peak) or peak.GetArgumentNames() != other_peak.GetArgumentNames():
+                return False
+
+            save_data = [c.SendSaveData() for c in peak.GetArgumentContainerList()]
+            other_save_data = [c.SendSaveData() for c in other_peak.GetArgumentContainerList()]
+            if save_data != other_save_data:
+                return False
+
+        return True
+
+    def GetSize(self) -> int:
+        """Get size of spectrum.
+
+        :rtype: int
+        """
+        return len(self.__x)
+
+    def GetNbytes(self) -> int:
+        """Get approximate memory size of the arrays and the peaks in bytes.
+
+        :rtype: int
+        """
+        return self.__x.nbytes + self.__y.nbytes + self.__bg.nbytes + self.__peaks.GetTable().GetNbytes()
+
+    def SendSaveData(self) -> Tuple[ndarray, ndarray, ndarray, PeakFunctionContainerList]:
+        """Send (x, y, background, peaks) as save data.
+
+        :rtype: Tuple[ndarray, ndarray, ndarray, PeakFunctionContainerList]
+        """
+        return list(self.X), list(self.Y), list(self.BackGround), self.Peaks
+
+    def ReceiveSaveData(self, save_data: Tuple[ndarray, ndarray, ndarray, PeakFunctionContainerList]):
+        """Receive saved data
+
+        :type save_data: Tuple[ndarray, ndarray, ndarray, PeakFunctionContainerList]
+        """
+        x, y, bg, self.__peaks = save_data
+        self.__x = array(x)
+        self.__y = array(y)
+        self.__bg = array(bg)
+
+
+class RecipeResultCache:
+    """LRU cache of the spectra returned by the steps of recipes.
+    The key is the hash of the input spectrum, the class and the arguments of the function and the peak type.
+    The spectra evicted from the memory are written to the spill directory if it is given, and read from it when they are required again.
+    """
+
+    def __init__(self, memory_budget: int, spill_dir: Optional[str] = None):
+        """Default constructor
+
+        :param memory_budget: Maximum size of the cached spectra in bytes.
+        :type memory_budget: int
+        :param spill_dir: Directory where the evicted spectra are written. If None, they are discarded. Defaults to None
+        :type spill_dir: Optional[str], optional
+        """
+        self.__memory_budget = memory_budget
+        self.__spill_dir = spill_dir
+        self.__spectrum_dict = OrderedDict()
+        self.__memory_size = 0
+
+    def GetMemoryBudget(self) -> int:
+        """Get maximum size of the cached spectra in bytes.
+
+        :rtype: int
+        """
+        return self.__memory_budget
+
+    def SetMemoryBudget(self, memory_budget: int):
+        """Set maximum size of the cached spectra in bytes. The spectra exceeding it are evicted at once.
+
+        :type memory_budget: int
+        """
+        self.__memory_budget = memory_budget
+        self.__Evict()
+
+    def GetSpillDirectory(self) -> Optional[str]:
+        """Get directory where the evicted spectra are written.
+
+        :rtype: Optional[str]
+        """
+        return self.__spill_dir
+
+    def SetSpillDirectory(self, spill_dir: Optional[str]):
+        """Set directory where the evicted spectra are written. If None, they are discarded.
+
+        :type spill_dir: Optional[str]
+        """
+        self.__spill_dir = spill_dir
+
+    def GetMemorySize(self) -> int:
+        """Get size of the spectra cached in the memory in bytes.
+
+        :rtype: int
+        """
+        return self.__memory_size
+
+    def Clear(self):
+        """Remove the spectra cached in the memory. The files in the spill directory are not removed.
+        """
+        self.__spectrum_dict.clear()
+        self.__memory_size = 0
+
+    def CreateKey(self, source: Union[Spectrum, str], func_container: SpectrumFunctionContainerBase) -> str:
+        """Create the key of the result of the function.
+
+        :param source: The input spectrum, or the key of the step which returned it. The latter avoids hashing intermediate spectra.
+        :type source: Union[Spectrum, str]
+        :type func_container: SpectrumFunctionContainerBase
+        :rtype: str
+        """
+        hash_obj = blake2b(digest_size=20)
+        if isinstance(source, Spectrum):
+            for a in (source.XView, source.YView, source.BackGroundView):
+                hash_obj.update(f'{a.dtype.str}{a.shape}'.encode())
+                hash_obj.update(repr(a.tolist()).encode() if a.dtype.hasobject else ascontiguousarray(a).data)
+
+            hash_obj.update(repr([(peak.GetPeakClass().__qualname__, peak.GetArgs()) for peak in source.PeaksView]).encode())
+        else:
+            hash_obj.update(source.encode())
+
+        data_accessor = SpectrumFunctionContainerBase.data_accessor
+        peak_type = None if data_accessor is None else data_accessor.GetPeakType()
+        func_class = type(func_container)
+        hash_obj.update(repr((func_class.__module__, func_class.__qualname__, func_container.GetArgs(), None if peak_type is None else peak_type.GetName())).encode())
+        return hash_obj.hexdigest()
+
+    def Get(self, key: str) -> Optional[Spectrum]:
+        """Get a shallow copy of the cached spectrum. The copy can be stored in the history of data, but do not modify the arrays, because they are shared.
+
+        :type key: str
+        :return: None if the key is not cached.
+        :rtype: Optional[Spectrum]
+        """
+        if key in self.__spectrum_dict:
+            self.__spectrum_dict.move_to_end(key)
+            return copy(self.__spectrum_dict[key][0])
 
-    @Peaks.setter
-    def Peaks(self, peaks):
-        self.__peaks = PeakFunctionContainerList(peaks)
+        if self.__spill_dir is None or not isfile(path := self.__GetSpillPath(key)):
+            return None
 
-    @Peaks.deleter
-    def Peaks(self):
-        self.__peaks = PeakFunctionContainerList()
+        try:
+            with open(path, 'rb') as f:
+                spectrum = load(f)
+        except (OSError, EOFError, UnpicklingError):
+            return None
 
-    def GetSize(self) -> int:
-        """Get size of spectrum.
+        self.Put(key, spectrum, spill=False)
+        return spectrum
 
-        :rtype: int
+    def Put(self, key: str, spectrum: Spectrum, spill: bool = True):
+        """Cache a shallow copy of the spectrum, so that the cache does not share the spectrum with the history of data. The least recently used spectra are evicted if the memory budget is exceeded.
+
+        :type key: str
+        :type spectrum: Spectrum
+        :param spill: If False, the spectrum is not written to the spill directory when it is evicted. This is used for the spectra which have already been written. Defaults to True
+        :type spill: bool, optional
         """
-        return len(self.__x)
+        if key in self.__spectrum_dict:
+            self.__spectrum_dict.move_to_end(key)
+            return
 
-    def SendSaveData(self) -> Tuple[ndarray, ndarray, ndarray, PeakFunctionContainerList]:
-        """Send (x, y, background, peaks) as save data.
+        self.__spectrum_dict[key] = (copy(spectrum), spill)
+        self.__memory_size += spectrum.GetNbytes()
+        self.__Evict()
 
-        :rtype: Tuple[ndarray, ndarray, ndarray, PeakFunctionContainerList]
-        """
-        return list(self.X), list(self.Y), list(self.BackGround), self.Peaks
+    def __Evict(self):
+        while self.__memory_size > self.__memory_budget and len(self.__spectrum_dict) != 0:
+            key, (spectrum, spill) = self.__spectrum_dict.popitem(last=False)
+            self.__memory_size -= spectrum.GetNbytes()
+            if spill and self.__spill_dir is not None:
+                self.__Spill(key, spectrum)
 
-    def ReceiveSaveData(self, save_data: Tuple[ndarray, ndarray, ndarray, PeakFunctionContainerList]):
-        """Receive saved data
+    def __Spill(self, key, spectrum):
+        # The file is written under a temporary name, so that a broken file is never read.
+        makedirs(self.__spill_dir, exist_ok=True)
+        path = self.__GetSpillPath(key)
+        temp_path = f'{path}.{getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            dump(spectrum, f)
 
-        :type save_data: Tuple[ndarray, ndarray, ndarray, PeakFunctionContainerList]
-        """
-        x, y, bg, self.__peaks = save_data
-        self.__x = array(x)
-        self.__y = array(y)
-        self.__bg = array(bg)
+        replace(temp_path, path)
+
+    def __GetSpillPath(self, key):
+        return join(self.__spill_dir, f'{key}.pkl')
+
+    # Worker processes receive only the settings. They share the spill directory.
+    def __getstate__(self):
+        return self.__memory_budget, self.__spill_dir
+
+    def __setstate__(self, state):
+        self.__init__(*state)
 
 
 # TODO Composite pattern of "RecipeFunctionContainerBase".
 class Recipe(RestrictedStorableListBase):
     """Data object. Record the functions, their order, and the arguments that each function has.
     """
+    result_cache = None
 
     def __init__(self, *args, **kwargs):
         """Default constructor
         """
         super().__init__(SpectrumFunctionContainerBase, *args, **kwargs)
 
+    @classmethod
+    def SetResultCache(cls, result_cache: Optional[RecipeResultCache]):
+        """Set the cache shared by all recipes. If None, the results are not cached.
+
+        :type result_cache: Optional[RecipeResultCache]
+        """
+        Recipe.result_cache = result_cache
+
+    @classmethod
+    def InitializeWorker(cls, data_accessor, result_cache: Optional[RecipeResultCache]):
+        """Set the accessor of spectrum functions and the cache. This is used as the initializer of worker processes.
+
+        :type data_accessor: Union[SpectrumFunctionContainerAccessor, SpectrumFunctionContainerAccessorSnapshot]
+        :type result_cache: Optional[RecipeResultCache]
+        """
+        SpectrumFunctionContainerBase.SetDataAccessor(data_accessor)
+        cls.SetResultCache(result_cache)
+
+    def Execution(self, spectrum: Spectrum, success_list: List[Optional[bool]] = None, seed: Optional[PeakFunctionContainerList] = None) -> Tuple[List[Tuple[Spectrum, List[Optional[bool]], str, str]], str, Optional[str]]:
+        """Executes the steps that have not succeeded yet in order. The execution stops at the first failed step.
+        This method does not touch the application, so it can be called in worker processes.
+
+        :param spectrum: Spectrum to which the first step is applied.
+        :type spectrum: Spectrum
+        :param success_list: A list of the results of executing the recipe. If success_list is None, It assume that all the steps have not been executed. defaults to None
+        :type success_list: List[Optional[bool]], optional
+        :param seed: Converged peaks of a neighbouring spectrum, which are passed to every step. The result cache is not used if seed is given. Defaults to None
+        :type seed: Optional[PeakFunctionContainerList], optional
+        :raises ValueError: Sent if a function returns an unknown parameter.
+        :return: The history, the changed parameters and the error message.
+            The history is a list of (spectrum, success_list, msg, changed_params) for each successful step. If a step fails, the failure is recorded in the success list of the last history.
+            The changed parameters are the characters 'x', 'y', 'b' and 'p' returned by the executed functions.
+            The error message is None if no step fails.
+        :rtype: Tuple[List[Tuple[Spectrum, List[Optional[bool]], str, str]], str, Optional[str]]
+        """
+        success_list = [None] * len(self) if success_list is None else list(success_list)
+        if len(success_list) != len(self):
+            raise ValueError()
+
+        history = []
+        changed_params = ''
+        result_cache = Recipe.result_cache if seed is None else None
+        key = None
+        for n, func_container in enumerate(self):
+            if success_list[n]:
+                continue
+
+            # Only the spectrum given to the first executed step is hashed. The following keys are chained from it.
+            if result_cache is not None:
+                key = result_cache.CreateKey(spectrum if key is None else key, func_container)
+
+            if result_cache is not None and (cached_spectrum := result_cache.Get(key)) is not None:
+                spectrum = cached_spectrum
+            else:
+                x, y = spectrum.XY
+                bg = spectrum.BackGround
+                peaks = spectrum.Peaks
+
+                try:
+                    params = func_container.Execution(x, y, bg, peaks, seed)
+                except Exception as e:
+                    success_list[n] = False
+                    if len(history) != 0:
+                        history[-1][1][n] = False
+
+                    return history, changed_params, '\n'.join([str(arg) for arg in e.args]) or f'{str(func_container)} is failed in the execution.'
+
+                for param, return_param in zip(params, func_container.SendReturnParams()):
+                    if return_param == 'x':
+                        x = param
+                    elif return_param == 'y':
+                        y = param
+                    elif return_param == 'b':
+                        bg = param
+                    elif return_param == 'p':
+                        if isinstance(param, PeakFunctionContainerBase):
+                            param = PeakFunctionContainerList([param])
+                        peaks = param
+                    else:
+                        raise ValueError()
+
+                spectrum = Spectrum(x, y, bg, peaks)
+                if result_cache is not None:
+                    result_cache.Put(key, spectrum)
+
+            success_list[n] = True
+            for return_param in func_container.SendReturnParams():
+                if return_param not in changed_params:
+                    changed_params += return_param
+
+            history.append((spectrum, list(success_list), f'{str(func_container)} is successful in the execution.', func_container.SendReturnParams()))
+
+        return history, changed_params, None
+
 
 class Preset(Recipe):
     """Data object for "Recipe" class with name.
@@ -1409,6 +2737,50 @@ class SpectrumFunctionContainerAccessor:
         """
         return self.__data_mgr.GetDataSize()
 
+    def GetSnapshot(self):
+        """Get a picklable copy of the current values.
+
+        :rtype: SpectrumFunctionContainerAccessorSnapshot
+        """
+        return SpectrumFunctionContainerAccessorSnapshot(self.GetPeakType(), self.GetRecipe(), self.GetDataSize())
+
+
+class SpectrumFunctionContainerAccessorSnapshot:
+    """Copy of "SpectrumFunctionContainerAccessor" that does not refer to the managers. Used in worker processes.
+    """
+
+    def __init__(self, peak_type, recipe, data_size):
+        """Default constructor
+
+        :type peak_type: PeakType
+        :type recipe: Recipe
+        :type data_size: int
+        """
+        self.__peak_type = peak_type
+        self.__recipe = recipe
+        self.__data_size = data_size
+
+    def GetPeakType(self) -> PeakType:
+        """Get selected type of peak
+
+        :rtype: PeakType
+        """
+        return self.__peak_type
+
+    def GetRecipe(self) -> Recipe:
+        """Get selected "Recipe"
+
+        :rtype: Recipe
+        """
+        return deepcopy(self.__recipe)
+
+    def GetDataSize(self) -> int:
+        """Get the number of data being loaded.
+
+        :rtype: int
+        """
+        return self.__data_size
+
 
 class DataContainer(StorableObject):
     """Recoverable data object
@@ -1438,6 +2810,8 @@ class DataContainer(StorableObject):
         """
         self.__path = path
         self.__buffer = deque(maxlen=buffer_size)
+        # The number of the latest histories from which the recipe execution can resume. See "DiscardResumePoint".
+        self.__resumable_size = 0
 
     @property
     def X(self) -> ndarray:
@@ -1508,6 +2882,54 @@ class DataContainer(StorableObject):
     def Peaks(self):
         del self.__buffer[0][0].Peaks
 
+    @property
+    def XView(self) -> ndarray:
+        """xdata of spectrum. This value is read-only view.
+
+        :rtype: ndarray
+        """
+        return self.__buffer[0][0].XView
+
+    @property
+    def YView(self) -> ndarray:
+        """ydata of spectrum. This value is read-only view.
+
+        :rtype: ndarray
+        """
+        return self.__buffer[0][0].YView
+
+    @property
+    def XYView(self) -> Tuple[ndarray, ndarray]:
+        """data of spectrum. These values are read-only views.
+
+        :rtype: Tuple[ndarray, ndarray]
+        """
+        return self.__buffer[0][0].XYView
+
+    @property
+    def BackGroundView(self) -> ndarray:
+        """Background of spectrum. This value is read-only view.
+
+        :rtype: ndarray
+        """
+        return self.__buffer[0][0].BackGroundView
+
+    @property
+    def PeaksView(self) -> Tuple[PeakSnapshot, ...]:
+        """Snapshots of peaks of spectrum.
+
+        :rtype: Tuple[PeakSnapshot, ...]
+        """
+        return self.__buffer[0][0].PeaksView
+
+    @property
+    def PeakTableView(self) -> PeakTable:
+        """Table of peaks of spectrum. Do not modify it.
+
+        :rtype: PeakTable
+        """
+        return self.__buffer[0][0].PeakTableView
+
     def GetSpectrumSize(self) -> int:
         """Get size of spectrum.
 
@@ -1577,8 +2999,8 @@ class DataContainer(StorableObject):
 
         self.__path = v
 
-    def Append(self, spectrum: Spectrum, recipe: Recipe = None, success_list: List[Optional[bool]] = None, msg: str = ''):
-        """Append data to the history.
+    def Append(self, spectrum: Spectrum, recipe: Recipe = None, success_list: List[Optional[bool]] = None, msg: str = '', changed_params: Optional[str] = None):
+        """Append data to the history. The fields of the spectrum that are the same as the latest history are shared with it by reference.
 
         :type spectrum: Spectrum
         :param recipe: Recipe, If the recipe is none, it will be converted to an empty recipe. defaults to None
@@ -1587,6 +3009,8 @@ class DataContainer(StorableObject):
         :type success_list: List[Optional[bool]], optional
         :param msg: Message for this data history, defaults to ''
         :type msg: str, optional
+        :param changed_params: Fields changed from the latest history, like the return value of "SendReturnParams". The other fields are compared with the latest history. If None, all fields are compared. defaults to None
+        :type changed_params: Optional[str], optional
         """
         if not isinstance(spectrum, Spectrum):
             raise TypeError('"spectrum" must be an instance of "Spectrum".')
@@ -1607,21 +3031,70 @@ class DataContainer(StorableObject):
         if not isinstance(msg, str):
             raise TypeError('"msg" must be an instance of "str"')
 
+        if len(self.__buffer) != 0:
+            changed_params = '' if changed_params is None else changed_params
+            spectrum.ShareUnchanged(self.__buffer[0][0], ''.join([c for c in 'xybp' if c not in changed_params]))
+
         self.__buffer.appendleft([spectrum, recipe, success_list, msg])
+        self.__resumable_size = min(self.__resumable_size + 1, len(self.__buffer))
+
+    def ApplyRecipe(self, recipe: Recipe) -> bool:
+        """Apply a recipe. The longest leading steps of the recipe that are the same as the steps succeeded in the history are marked as succeeded, so the execution resumes from the first changed step.
+        If those steps succeeded in an older history, a copy of it is added to the latest history like "Restore".
+
+        :type recipe: Recipe
+        :return: True if the data is resumed from an older history.
+        :rtype: bool
+        """
+        if not isinstance(recipe, Recipe):
+            raise TypeError('Can not include anything other than an instance of "Recipe"')
+
+        delta, success_size = self.__FindResumePoint(recipe)
+        success_list = [True] * success_size + [None] * (len(recipe) - success_size)
+        if delta == 0:
+            self.__buffer[0][1] = recipe
+            self.__buffer[0][2] = success_list
+            return False
+
+        spectrum, _, _, msg = self.__buffer[delta]
+        self.Append(copy(spectrum), recipe, success_list, f'resume from\n{msg}')
+        return True
+
+    def DiscardResumePoint(self):
+        """Prevent "ApplyRecipe" from resuming from the current histories, so that the next recipe is executed from the first step.
+        This is called when the type of peak is changed, because the results of the steps depend on it although their arguments do not change.
+        """
+        self.__resumable_size = 0
 
     def Clear(self):
         """Clear buffer
         """
         self.__buffer.clear()
+        self.__resumable_size = 0
+
+    def Load(self, memo: Optional[dict] = None):
+        """Load the memory-mapped arrays of all the history into memory. Refer to "Spectrum.Load".
+
+        :param memo: The arrays already loaded, which is shared by all the data of a project. defaults to None
+        :type memo: Optional[dict], optional
+        """
+        if memo is None:
+            memo = {}
+
+        for spectrum, *_ in self.__buffer:
+            spectrum.Load(memo)
 
     def Restore(self, delta: int):
-        """Restore buffer data. Adds a copy of the specified data to the latest history.
+        """Restore buffer data. Adds a copy of the specified data to the latest history. The arrays and peaks of the copy are shared with the specified data.
 
         :param delta: 0 represents the latest, and the larger the number, the older the data.
         :type delta: int
         """
         spectrum, recipe, success_list, msg = self.__GetBufferData(delta)
-        self.Append(deepcopy(spectrum), deepcopy(recipe), deepcopy(success_list), f'restore from\n{msg}')
+        is_resumable = min(delta, len(self.__buffer) - 1) < self.__resumable_size
+        self.Append(copy(spectrum), deepcopy(recipe), deepcopy(success_list), f'restore from\n{msg}')
+        if not is_resumable:
+            self.__resumable_size = 0
 
     def GetBufferData(self, delta: int):
         """Get buffered data. This value is deepcopied.
@@ -1635,6 +3108,35 @@ class DataContainer(StorableObject):
     def __GetBufferData(self, delta):
         return self.__buffer[min(delta, len(self.__buffer) - 1)]
 
+    def __FindResumePoint(self, recipe):
+        # Walk back along the lineage of the latest data. An older data belongs to it only if fewer steps have succeeded there.
+        # The other data are the results of the steps that have been replaced later.
+        prev_success_size = None
+        for delta, (_, prev_recipe, success_list, _) in enumerate(self.__buffer):
+            if delta >= self.__resumable_size:
+                break
+
+            success_size = self.__GetSuccessSize(success_list)
+            if prev_success_size is not None and success_size >= prev_success_size:
+                continue
+
+            if success_size == 0:
+                break
+
+            prev_success_size = success_size
+            if success_size <= len(recipe) and all(self.__IsSameStep(func_container, other_func_container) for func_container, other_func_container in zip(recipe[:success_size], prev_recipe)):
+                return delta, success_size
+
+        return 0, 0
+
+    def __GetSuccessSize(self, success_list):
+        # Returns the number of the leading succeeded steps. The data is not the result of them if any of the other steps has succeeded.
+        success_size = next((n for n, success in enumerate(success_list) if not success), len(success_list))
+        return 0 if any(success_list[success_size:]) else success_size
+
+    def __IsSameStep(self, func_container, other_func_container):
+        return type(func_container) is type(other_func_container) and func_container.GetArgs() == other_func_container.GetArgs()
+
     @property
     def BufferSize(self) -> int:
         """size of buffer.
@@ -1648,6 +3150,7 @@ class DataContainer(StorableObject):
         new_buffer = deque(maxlen=size)
         new_buffer.extend(self.__buffer)
         self.__buffer = new_buffer
+        self.__resumable_size = min(self.__resumable_size, len(self.__buffer))
 
     def SendSaveData(self):
         """Send path and latest data as save data.
@@ -1668,6 +3171,121 @@ class DataContainer(StorableObject):
         self.Append(spectrum, recipe, success_list, msg)
 
 
+class DataContainerView:
+    """Read-only wrapper of "DataContainer". The arrays and peaks are shared with the data without copying, and the data can not be modified through it.
+    """
+
+    def __init__(self, data: DataContainer):
+        """Default constructor
+
+        :type data: DataContainer
+        """
+        self.__data = data
+
+    @property
+    def X(self) -> ndarray:
+        """xdata of spectrum. This value is deepcopied.
+
+        :rtype: ndarray
+        """
+        return self.__data.X
+
+    @property
+    def Y(self) -> ndarray:
+        """ydata of spectrum. This value is deepcopied.
+
+        :rtype: ndarray
+        """
+        return self.__data.Y
+
+    @property
+    def XY(self) -> Tuple[ndarray, ndarray]:
+        """data of spectrum. This value is deepcopied.
+
+        :rtype: Tuple[ndarray, ndarray]
+        """
+        return self.__data.XY
+
+    @property
+    def BackGround(self) -> ndarray:
+        """Background of spectrum. This value is deepcopied.
+
+        :rtype: ndarray
+        """
+        return self.__data.BackGround
+
+    @property
+    def Peaks(self) -> PeakFunctionContainerList:
+        """Peaks of spectrum. This value is deepcopied.
+
+        :rtype: PeakFunctionContainerList
+        """
+        return self.__data.Peaks
+
+    @property
+    def XView(self) -> ndarray:
+        """xdata of spectrum. This value is read-only view.
+
+        :rtype: ndarray
+        """
+        return self.__data.XView
+
+    @property
+    def YView(self) -> ndarray:
+        """ydata of spectrum. This value is read-only view.
+
+        :rtype: ndarray
+        """
+        return self.__data.YView
+
+    @property
+    def XYView(self) -> Tuple[ndarray, ndarray]:
+        """data of spectrum. These values are read-only views.
+
+        :rtype: Tuple[ndarray, ndarray]
+        """
+        return self.__data.XYView
+
+    @property
+    def BackGroundView(self) -> ndarray:
+        """Background of spectrum. This value is read-only view.
+
+        :rtype: ndarray
+        """
+        return self.__data.BackGroundView
+
+    @property
+    def PeaksView(self) -> Tuple[PeakSnapshot, ...]:
+        """Snapshots of peaks of spectrum.
+
+        :rtype: Tuple[PeakSnapshot, ...]
+        """
+        return self.__data.PeaksView
+
+    @property
+    def PeakTableView(self) -> PeakTable:
+        """Table of peaks of spectrum. Do not modify it.
+
+        :rtype: PeakTable
+        """
+        return self.__data.PeakTableView
+
+    @property
+    def Path(self) -> str:
+        """Path of the data.
+
+        :rtype: str
+        """
+        return self.__data.Path
+
+    def GetSpectrumSize(self) -> int:
+        """Get size of spectrum.
+
+        :rtype: int
+        """
+        return self.__data.GetSpectrumSize()
+
+
 class Project(StorableObject):
     """Data object for project
     """
@@ -1836,13 +3454,17 @@ class Project(StorableObject):
         return deepcopy(self.__peak_type)
 
     def SetPeakType(self, peak_type: PeakType):
-        """Set type of peak.
+        """Set type of peak. If the type is changed, the recipes applied to the data later are executed from the first step. Refer to "DataContainer.DiscardResumePoint".
 
         :type peak_type: PeakType
         """
         if not isinstance(peak_type, PeakType):
             raise TypeError()
 
+        if peak_type.GetName() != self.__peak_type.GetName():
+            for data in self.__data_list:
+                data.DiscardResumePoint()
+
         self.__peak_type = peak_type
 
     def GetExperimentalDate(self) -> date:
@@ -1893,6 +3515,29 @@ class DecodeFunctionContainerBase(FunctionContainerBase):
         """
         return self.Function(project, self.GetArgs())
 
+    @final
+    def ExecutionToFiles(self, project: Project) -> Tuple[bool, List[Tuple[str, str]]]:
+        """Execute "Function" and sort the return value into the output files.
+
+        :type project: Project
+        :raises TypeError: Sent if the return value is neither (file name, contents) nor a list of them.
+        :return: Whether the return value is a single file, and (file name with the extension of "SendFileTypeWildcard", contents) of each file.
+        :rtype: Tuple[bool, List[Tuple[str, str]]]
+        """
+        values = self.Execution(project)
+        if not isinstance(values, (list, tuple)):
+            raise TypeError('The return value of the decode function should be (file name, contents) or a list of them.')
+
+        extension = GetExtension(self.SendFileTypeWildcard())
+        if len(values) == 2 and HasValidElement(values, str):
+            file_name, contents = values
+            return True, [(file_name + extension, contents)]
+
+        if not HasValidElement(values, (list, tuple)):
+            raise TypeError('The return value of the decode function should be (file name, contents) or a list of them.')
+
+        return False, [(file_name + extension, contents) for file_name, contents in values]
+
     @abstractmethod
     def Function(self, project: Project, args) -> Union[str, Iterable[str]]:
         """Describe the function to convert the experimental data to the contents of the output file.
@@ -1909,10 +3554,10 @@ class DecodeFunctionContainerBase(FunctionContainerBase):
     def SendFileTypeWildcard(self):
         """Send the file format for output.
 
-        :return: default to FileSelectorDefaultWildcardStr. If you want to know more details, please refer the wxPython document at (https://docs.wxpython.org/wx.functions.html?highlight=fileselector#wx.FileSelector).
+        :return: default to FILE_SELECTOR_DEFAULT_WILDCARD, which is the same as FileSelectorDefaultWildcardStr. If you want to know more details, please refer the wxPython document at (https://docs.wxpython.org/wx.functions.html?highlight=fileselector#wx.FileSelector).
         :rtype: str
         """
-        return FileSelectorDefaultWildcardStr
+        return FILE_SELECTOR_DEFAULT_WILDCARD
 
 
 class CSV(DecodeFunctionContainerBase):
@@ -1973,10 +3618,10 @@ class MappingFunctionContainerBase(FunctionContainerBase):
     """Contain function on mapping
     """
 
-    def Execution(self, data_list: Iterable[DataContainer]) -> Iterable[Union[int, float]]:
+    def Execution(self, data_list: Iterable[DataContainerView]) -> Iterable[Union[int, float]]:
         """Wrapper "Function"
 
-        :type data_list: Iterable[DataContainer]
+        :type data_list: Iterable[DataContainerView]
         :return: List of Value corresponding to data_list
         :rtype: Iterable[Union[int, float]]
         """
@@ -1986,7 +3631,8 @@ class MappingFunctionContainerBase(FunctionContainerBase):
     def Function(self, data_list, args) -> Iterable[Union[int, float]]:
         """Describe the body of the function here.
 
-        :type data_list: Iterable[DataContainer]
+        :param data_list: Read-only wrappers of the data, which are not copied. The accessors such as "XYView", "PeaksView" and "PeakTableView" are faster than "XY" and "Peaks".
+        :type data_list: Iterable[DataContainerView]
         :param args: The parameters specified in "SendRequireParams". If you want to know more details, please refer to the documentation of "SendRequireParams".
         :return: The value corresponding to data_list. The values are used for mapping and are colored according to the size of the value.
         :rtype: Iterable[Union[int, float]]
@@ -2015,32 +3661,23 @@ class PeakMapping(MappingFunctionContainerBase):
         bottom = -inf if bottom is None else bottom
         top = inf if top is None else top
 
-        value_list = []
-        for data in data_list:
-            if data is None:
-                value_list.append(None)
-                continue
-
-            v = inf
-            for peak in data.Peaks:
-                amp, ctr, wid = peak.Amp, peak.Ctr, peak.Wid
-
-                if bottom <= amp <= top and left <= ctr <= right:
-                    if mode == 'Amplitude':
-                        w = amp
-                    elif mode == 'Center':
-                        w = ctr
-                    elif mode == 'FWHM':
-                        w = wid
+        data_list = list(data_list)
+        index_array, args_matrix = CollectPeakArgs(data_list, 3)
+        amp, ctr, wid = args_matrix.T
+        w = {'Amplitude': amp, 'Center': ctr, 'FWHM': wid}[mode]
 
-                    v = w if abs(w - standard) < abs(v - standard) else v
+        # The comparisons with NaN are False, so the peaks with missing arguments are excluded.
+        distance = where((bottom <= amp) & (amp <= top) & (left <= ctr) & (ctr <= right), abs(w - standard), inf)
+        distance[isnan(distance)] = inf
 
-            if v != inf:
-                value_list.append(v)
-            else:
-                value_list.append(None)
+        # The peaks of each data are sorted by the distance, and the former peak comes first if the distances are the same.
+        order = lexsort((distance, index_array))
+        row_array = order[flatnonzero(diff(index_array, prepend=-1))]
+        row_array = row_array[distance[row_array] != inf]
 
-        return array(value_list)
+        value_list = full(len(data_list), None, dtype=object)
+        value_list[index_array[row_array]] = w[row_array].tolist()
+        return value_list
 
 # class StorableLinearSegmentedColormap(StorableObject, LinearSegmentedColormap):
 #     def __init__(self, *args, **kw):
@@ -2149,7 +3786,186 @@ def Container2Value(v):
     return v.GetValue() if isinstance(v, ArgumentContainerBase) else v
 
 
+def ExecutePeaks(x, peaks: Iterable[Union[PeakFunctionContainerBase, PeakSnapshot]]) -> ndarray:
+    """Calculate the peaks with a "FunctionArray" call for each class of peak, instead of calling "Execution" for each peak.
+
+    :param x: xdata of spectral data
+    :type x: Iterable
+    :param peaks: Peaks or their snapshots. Different classes of peaks can be mixed.
+    :type peaks: Iterable[Union[PeakFunctionContainerBase, PeakSnapshot]]
+    :return: Values of each peak in the order of peaks, shape (number of peaks, len(x))
+    :rtype: ndarray
+    """
+    if isinstance(peaks, PeakFunctionContainerList):
+        return peaks.ExecutionArray(x)
+
+    x = asarray(x, dtype=float)
+    peaks = list(peaks)
+
+    # The peaks are grouped by class, keeping the first peak of each class to call "FunctionArray".
+    group_dict = {}
+    for n, peak in enumerate(peaks):
+        peak_class = peak.GetPeakClass() if isinstance(peak, PeakSnapshot) else type(peak)
+        group_dict.setdefault(peak_class, (peak, []))[1].append(n)
+
+    values = zeros((len(peaks), len(x)))
+    for peak, index_list in group_dict.values():
+        params = array([peaks[n].GetArgs() for n in index_list], dtype=float)
+        values[index_list] = peak.FunctionArray(x, params)
+
+    return values
+
+
+def CollectPeakArgs(data_list: Iterable[Optional[DataContainer]], column_count: int) -> Tuple[ndarray, ndarray]:
+    """Collect the first arguments of the peaks of all the data into one table.
+
+    :param data_list: The data which is None is regarded as having no peaks.
+    :type data_list: Iterable[Optional[DataContainer]]
+    :param column_count: Number of the arguments taken from the first
+    :type column_count: int
+    :return: Position in data_list of the data of each peak, and the arguments of each peak with shape (number of peaks, column_count). The peaks of the same data are contiguous.
+    :rtype: Tuple[ndarray, ndarray]
+    """
+    args_matrix_list = [zeros((0, column_count))]
+    for data in data_list:
+        args_matrix_list.append(zeros((0, column_count)) if data is None else data.PeakTableView.GetArgsMatrix(column_count))
+
+    count_list = [len(args_matrix) for args_matrix in args_matrix_list[1:]]
+    return repeat(arange(len(count_list)), count_list), concatenate(args_matrix_list)
+
+
+def StackSpectra(xy_list: Iterable[Tuple[Iterable, Iterable]], row_count: int = 256) -> Iterator[Tuple[ndarray, ndarray]]:
+    """Stack the ydata of consecutive spectra sharing the same xdata, so that they can be processed by one call of numpy.
+
+    :param xy_list: Pairs of xdata and ydata of the spectra.
+    :type xy_list: Iterable[Tuple[Iterable, Iterable]]
+    :param row_count: The maximum number of spectra stacked at once, which limits the memory used. Defaults to 256
+    :type row_count: int, optional
+    :return: Pairs of xdata and ydata of shape (number of spectra, len(xdata)).
+    :rtype: Iterator[Tuple[ndarray, ndarray]]
+    """
+    stacked_x = None
+    y_list = []
+    for x, y in xy_list:
+        x = asarray(x, dtype=float)
+        if len(y_list) == row_count or not (x is stacked_x or array_equal(x, stacked_x)):
+            if len(y_list) != 0:
+                yield stacked_x, stack(y_list)
+
+            stacked_x, y_list = x, []
+
+        y_list.append(asarray(y, dtype=float))
+
+    if len(y_list) != 0:
+        yield stacked_x, stack(y_list)
+
+
+def BinMinMax(x, y, x_range: Tuple[float, float], bin_count: int) -> Tuple[ndarray, ndarray, ndarray]:
+    """Calculate the minimum and the maximum of y in each of the bins dividing x_range equally.
+
+    :param x: xdata of spectral data
+    :type x: Iterable
+    :param y: ydata of spectral data, or those of spectra sharing xdata stacked in rows.
+    :type y: Iterable
+    :param x_range: Range of x divided into the bins. The points outside are put in the bins at the ends.
+    :type x_range: Tuple[float, float]
+    :param bin_count: The number of bins, usually the width of the axes in pixels.
+    :type bin_count: int
+    :return: Indices of the bins containing points, and the minimum and the maximum in them. The last two have the shape of y except the last axis. They are nan if all values in a bin are nan.
+    :rtype: Tuple[ndarray, ndarray, ndarray]
+    """
+    x = asarray(x, dtype=float)
+    y = asarray(y, dtype=float)
+    is_valid = ~isnan(x)
+    x, y = x[is_valid], y[..., is_valid]
+    if len(x) == 0:
+        return zeros(0, dtype=intp), y, y
+
+    width = (x_range[1] - x_range[0]) / bin_count
+    if width > 0:
+        bin_index = clip(((x - x_range[0]) / width).astype(intp), 0, bin_count - 1)
+    else:
+        bin_index = zeros(len(x), dtype=intp)
+
+    order = argsort(bin_index, kind='stable')
+    bin_index, y = bin_index[order], y[..., order]
+    start_list = flatnonzero(concatenate([[True], bin_index[1:] != bin_index[:-1]]))
+    return bin_index[start_list], fmin.reduceat(y, start_list, axis=-1), fmax.reduceat(y, start_list, axis=-1)
+
+
+def DecimateMinMax(x, y, x_range: Tuple[float, float], bin_count: int) -> ndarray:
+    """Reduce a spectrum to the minimum and the maximum of y in each of the bins dividing x_range equally. A line through the result covers the same pixels as the spectrum if a bin is one pixel wide.
+
+    :param x: xdata of spectral data
+    :type x: Iterable
+    :param y: ydata of spectral data
+    :type y: Iterable
+    :param x_range: Range of x divided into the bins. The points outside are put in the bins at the ends.
+    :type x_range: Tuple[float, float]
+    :param bin_count: The number of bins, usually the width of the axes in pixels.
+    :type bin_count: int
+    :return: Vertices at the center of each bin containing points, the minimum and the maximum alternately. Shape (2 * number of bins containing points, 2)
+    :rtype: ndarray
+    """
+    bin_index, y_min, y_max = BinMinMax(x, y, x_range, bin_count)
+    is_valid = ~isnan(y_min)
+    bin_index, y_min, y_max = bin_index[is_valid], y_min[is_valid], y_max[is_valid]
+
+    vertices = empty((2 * len(bin_index), 2))
+    vertices[:, 0] = repeat(x_range[0] + (bin_index + 0.5) * (x_range[1] - x_range[0]) / bin_count, 2)
+    vertices[0::2, 1] = y_min
+    vertices[1::2, 1] = y_max
+    return vertices
+
+
+def CountDensity(xy_list: Iterable[Tuple[Iterable, Iterable]], x_range: Tuple[float, float], y_range: Tuple[float, float], cell_count: Tuple[int, int]) -> ndarray:
+    """Count the spectra passing through each cell of a grid dividing the ranges equally. In each column, a spectrum passes through the cells between its minimum and its maximum, extended to the adjacent column so that the spectrum is connected like a line.
+
+    :param xy_list: Pairs of xdata and ydata of the spectra. ydata can be those of spectra sharing xdata stacked in rows, see "StackSpectra".
+    :type xy_list: Iterable[Tuple[Iterable, Iterable]]
+    :param x_range: Range of x covered by the grid. The points outside are put in the cells at the edges.
+    :type x_range: Tuple[float, float]
+    :param y_range: Range of y covered by the grid, the same as x_range.
+    :type y_range: Tuple[float, float]
+    :param cell_count: The number of cells, (rows along y, columns along x).
+    :type cell_count: Tuple[int, int]
+    :return: The numbers of spectra. The first row corresponds to the lower end of y_range.
+    :rtype: ndarray
+    """
+    row_count, column_count = cell_count
+    row_height = (y_range[1] - y_range[0]) / row_count
+    start_index_list = []
+    stop_index_list = []
+    for x, y in xy_list:
+        column, y_min, y_max = BinMinMax(x, y, x_range, column_count)
+        y_min, y_max = atleast_2d(y_min), atleast_2d(y_max)
+        is_valid = ~isnan(y_min)
+        if row_height > 0:
+            low = clip(nan_to_num((y_min - y_range[0]) / row_height), 0, row_count - 1).astype(intp)
+            high = clip(nan_to_num((y_max - y_range[0]) / row_height), 0, row_count - 1).astype(intp)
+        else:
+            low = high = zeros(y_min.shape, dtype=intp)
+
+        # The range of each column is extended to the range of the previous column, as the line between them would be drawn.
+        is_adjacent = (column[1:] == column[:-1] + 1) & is_valid[:, 1:] & is_valid[:, :-1]
+        previous_low, previous_high = low[:, :-1].copy(), high[:, :-1].copy()
+        low[:, 1:] = where(is_adjacent, minimum(low[:, 1:], previous_high), low[:, 1:])
+        high[:, 1:] = where(is_adjacent, maximum(high[:, 1:], previous_low), high[:, 1:])
+
+        start_index_list.append((low * column_count + column)[is_valid])
+        stop_index_list.append(((high + 1) * column_count + column)[is_valid])
+
+    if len(start_index_list) == 0:
+        return zeros(cell_count, dtype=intp)
+
+    size = (row_count + 1) * column_count
+    counts = bincount(concatenate(start_index_list), minlength=size) - bincount(concatenate(stop_index_list), minlength=size)
+    return counts.reshape(row_count + 1, column_count).cumsum(axis=0)[:-1]
+
+
 NEW_PROJECT_NAME = 'New Project'
+# Same as FileSelectorDefaultWildcardStr of wxPython. This module does not import wx, so that it can be used without GUI.
+FILE_SELECTOR_DEFAULT_WILDCARD = '*.*' if platform == 'win32' else '*'
 DEFAULT_ENCODE_FUNCTION = Text()
 DEFAULT_DECODE_FUNCTION = CSV()
 DEFAULT_MAPPING_FUNCTION = PeakMapping()
@@ -2177,13 +3993,19 @@ __all__ = [
     'SpectrumFunctionContainerBase',
     'EncodeFunctionContainerBase',
     'Text',
+    'PeakSnapshot',
+    'PeakArgumentProxy',
+    'PeakTable',
     'PeakFunctionContainerList',
     'PeakType',
     'Spectrum',
+    'RecipeResultCache',
     'Recipe',
     'Preset',
     'SpectrumFunctionContainerAccessor',
+    'SpectrumFunctionContainerAccessorSnapshot',
     'DataContainer',
+    'DataContainerView',
     'Project',
     'DecodeFunctionContainerBase',
     'CSV',
@@ -1,8 +1,17 @@
+import builtins
+import sys
+from ast import (Assign, Attribute, Call, ClassDef, Import, ImportFrom, Name,
+                 Subscript, parse)
 from collections import deque
-from os.path import basename, splitext
-from typing import Any, Iterable, List, Tuple
+from importlib import import_module
+from json import dump, load
+from logging import DEBUG, getLogger
+from os import getpid, replace, stat
+from os.path import abspath, basename, dirname, isfile, join, splitext
+from typing import Any, Iterable, List, Optional, Tuple
 
-from wx import Panel, Window
+logger = getLogger('__main__').getChild(__name__)
+logger.setLevel(DEBUG)
 
 
 class Singleton:
@@ -319,6 +328,347 @@ class RestrictedList:
         return self.__list.copy
 
 
+class ClassRegistry:
+    """Registry of the classes and instances defined at the top level of modules.
+    The names are collected by parsing the source files, and a module is imported only when its class or instance is requested.
+    The base classes and the imported classes are traced through the "import" statements to the source files of the local modules, which are parsed but not registered.
+    The result of the parsing is cached in a manifest file, and a file is parsed again only if the modification time or size of it or of the traced modules is changed.
+    """
+
+    def __init__(self, module_path_list: Iterable[str], manifest_path: Optional[str] = None):
+        """Default constructor
+
+        :param module_path_list: Paths of the modules. If the same name is defined in multiple modules, the latter has priority.
+        :type module_path_list: Iterable[str]
+        :param manifest_path: Path of the manifest file. If None, the manifest is not used. Defaults to None
+        :type manifest_path: Optional[str], optional
+        """
+        self.__manifest_path = manifest_path
+        self.__module_path_list = []
+        self.__class_dict = {}
+        self.__instance_dict = {}
+        self.__subclass_dict = {}
+        self.__namespace_dict = {}
+
+        manifest = self.__LoadManifest()
+        is_changed = False
+        for module_path in [abspath(path) for path in module_path_list]:
+            try:
+                stat_value = [(stat_result := stat(module_path)).st_mtime_ns, stat_result.st_size]
+            except OSError:
+                continue
+
+            entry = manifest.get(module_path)
+            if entry is None or entry['stat'] != stat_value or not self.__IsDependencyUnchanged(entry):
+                entry = {'stat': stat_value, **self.__ParseModule(module_path)}
+                manifest[module_path] = entry
+                is_changed = True
+
+            for name, base_name in entry['unresolved']:
+                logger.warning(f'Base class "{base_name}" of "{name}" in "{module_path}" could not be resolved. "{name}" may be missing from the categories.')
+
+            self.__module_path_list.append(module_path)
+            for name, base_name_list in entry['class']:
+                self.__class_dict[name] = (module_path, name, base_name_list)
+
+            for name, class_name in entry['instance']:
+                self.__instance_dict[name] = (module_path, class_name)
+
+        # Classes imported from the modules which are not registered are registered in the module importing them, like "inspect.getmembers".
+        for module_path in self.__module_path_list:
+            for attr_name, name, source_path, base_name_list in manifest[module_path]['export']:
+                if source_path not in self.__module_path_list and name not in self.__class_dict:
+                    self.__class_dict[name] = (module_path, attr_name, base_name_list)
+
+        # The entries of the other modules are kept, because the manifest may be shared with other registries.
+        for module_path in [path for path in manifest if not isfile(path)]:
+            del manifest[module_path]
+            is_changed = True
+
+        if is_changed:
+            self.__SaveManifest(manifest)
+
+    def GetModulePathList(self) -> List[str]:
+        """Get the absolute paths of the registered modules.
+
+        :rtype: List[str]
+        """
+        return list(self.__module_path_list)
+
+    def HasClass(self, name: str) -> bool:
+        """Returns True if the class is registered.
+
+        :type name: str
+        :rtype: bool
+        """
+        return name in self.__class_dict
+
+    def IsSubclass(self, name: str, base_name: str) -> bool:
+        """Returns True if the class inherits the class of "base_name", or they are the same. This is judged by the names without importing the modules, so a class whose base could not be resolved is logged on construction.
+
+        :type name: str
+        :type base_name: str
+        :rtype: bool
+        """
+        if name == base_name:
+            return True
+
+        key = (name, base_name)
+        if key not in self.__subclass_dict:
+            # Marked first, so that a circular reference by the same names in different modules does not recurse forever.
+            self.__subclass_dict[key] = False
+            _, _, parent_name_list = self.__class_dict.get(name, (None, None, []))
+            self.__subclass_dict[key] = any(self.IsSubclass(parent_name, base_name) for parent_name in parent_name_list)
+
+        return self.__subclass_dict[key]
+
+    def GetClassNameList(self, base_name: str) -> List[str]:
+        """Get the names of the classes that inherit the class of "base_name", including itself. They are sorted by the order of the modules and then by the names.
+
+        :type base_name: str
+        :rtype: List[str]
+        """
+        order_dict = {path: n for n, path in enumerate(self.__module_path_list)}
+        name_list = [name for name in self.__class_dict if self.IsSubclass(name, base_name)]
+        return sorted(name_list, key=lambda name: (order_dict[self.__class_dict[name][0]], name))
+
+    def GetInstanceNameList(self, class_name: str) -> List[str]:
+        """Get the names of the instances of the class of "class_name" or its subclasses. They are sorted by the order of the modules and then by the names.
+
+        :type class_name: str
+        :rtype: List[str]
+        """
+        order_dict = {path: n for n, path in enumerate(self.__module_path_list)}
+        name_list = [name for name, (_, instance_class_name) in self.__instance_dict.items() if self.IsSubclass(instance_class_name, class_name)]
+        return sorted(name_list, key=lambda name: (order_dict[self.__instance_dict[name][0]], name))
+
+    def GetClass(self, name: str) -> type:
+        """Get the class. The module is imported if it has not been imported yet.
+
+        :type name: str
+        :raises KeyError: Sent if the class is not registered.
+        :rtype: type
+        """
+        module_path, attr_name, _ = self.__class_dict[name]
+        return getattr(self.__ImportModule(module_path), attr_name)
+
+    def GetInstance(self, name: str) -> Any:
+        """Get the instance. The module is imported if it has not been imported yet.
+
+        :type name: str
+        :raises KeyError: Sent if the instance is not registered.
+        :rtype: Any
+        """
+        module_path, _ = self.__instance_dict[name]
+        return getattr(self.__ImportModule(module_path), name)
+
+    def __ImportModule(self, module_path):
+        dir_name = dirname(module_path)
+        if dir_name not in sys.path:
+            sys.path.append(dir_name)
+
+        return import_module(GetFileName(module_path))
+
+    def __ParseModule(self, module_path):
+        source_dict = {}
+        class_list = []
+        unresolved_list = []
+        namespace = self.__ParseSource(module_path, source_dict)
+        for name, base_list in namespace['class'].items():
+            base_name_list = []
+            for base in base_list:
+                if (resolved := self.__ResolveName(module_path, base, source_dict, set())) is None:
+                    # Builtins such as "object" and "Exception" are not defined in any module.
+                    if not hasattr(builtins, base):
+                        unresolved_list.append([name, base])
+
+                    resolved = (None, [base])
+
+                base_name_list.extend(base_name for base_name in resolved[1] if base_name not in base_name_list)
+
+            class_list.append([name, base_name_list])
+
+        export_list = []
+        for attr_name in self.__GetImportedNameList(namespace, source_dict):
+            resolved = self.__ResolveName(module_path, attr_name, source_dict, set())
+            if resolved is not None and resolved[0] is not None:
+                source_path, (name, *base_name_list) = resolved
+                export_list.append([attr_name, name, source_path, base_name_list])
+
+        depend_dict = {}
+        for path in source_dict:
+            if path != module_path:
+                try:
+                    depend_dict[path] = [(stat_result := stat(path)).st_mtime_ns, stat_result.st_size]
+                except OSError:
+                    depend_dict[path] = None
+
+        return {'class': class_list, 'instance': namespace['instance'], 'export': export_list, 'unresolved': unresolved_list, 'depend': depend_dict}
+
+    def __ParseSource(self, module_path, source_dict):
+        # Names at the top level of the module. The bases are the names used in the module, which are resolved by "__ResolveName".
+        # The parsed sources are shared by the modules in the registry, and "source_dict" records the ones used by each module.
+        if module_path not in self.__namespace_dict:
+            self.__namespace_dict[module_path] = self.__ParseNamespace(module_path)
+
+        source_dict[module_path] = self.__namespace_dict[module_path]
+        return source_dict[module_path]
+
+    def __ParseNamespace(self, module_path):
+        namespace = {'class': {}, 'instance': [], 'import': {}, 'module': {}, 'star': []}
+        try:
+            with open(module_path, mode='rb') as f:
+                tree = parse(f.read(), module_path)
+        except (OSError, SyntaxError, ValueError):
+            return namespace
+
+        for node in tree.body:
+            if isinstance(node, ClassDef):
+                namespace['class'][node.name] = [name for base in node.bases if (name := self.__GetBaseName(base)) is not None]
+            elif isinstance(node, Assign) and len(node.targets) == 1 and isinstance(node.targets[0], Name) and isinstance(node.value, Call):
+                if (class_name := self.__GetNodeName(node.value.func)) is not None:
+                    namespace['instance'].append([node.targets[0].id, class_name])
+            elif isinstance(node, ImportFrom):
+                source_path = self.__FindLocalModule(module_path, node.module, node.level)
+                for alias in node.names:
+                    if alias.name == '*':
+                        if source_path is not None:
+                            namespace['star'].append(source_path)
+                    else:
+                        namespace['import'][alias.asname or alias.name] = (source_path, alias.name)
+            elif isinstance(node, Import):
+                for alias in node.names:
+                    namespace['module'][alias.asname or alias.name] = self.__FindLocalModule(module_path, alias.name, 0)
+
+        return namespace
+
+    def __ResolveName(self, module_path, name, source_dict, visited_set):
+        # Returns (path of the module defining the class, [original name, names of the bases...]), or None if the name is not found.
+        # The path is None if the name is imported from a module which is not local, like "wx".
+        if (module_path, name) in visited_set:
+            return None
+
+        visited_set.add((module_path, name))
+        namespace = self.__ParseSource(module_path, source_dict)
+        if '.' in name:
+            # "module.Base" is resolved in the module if it is local, otherwise it is regarded as "Base".
+            module_name, name = name.rsplit('.', 1)
+            source_path = namespace['module'].get(module_name)
+            if source_path is None:
+                return None, [name]
+
+            return self.__ResolveName(source_path, name, source_dict, visited_set)
+
+        if name in namespace['class']:
+            base_name_list = []
+            for base in namespace['class'][name]:
+                resolved = self.__ResolveName(module_path, base, source_dict, visited_set)
+                base_name_list.extend(resolved[1] if resolved is not None else [base])
+
+            return module_path, [name] + base_name_list
+
+        if name in namespace['import']:
+            source_path, original_name = namespace['import'][name]
+            if source_path is None:
+                return None, [original_name]
+
+            return self.__ResolveName(source_path, original_name, source_dict, visited_set)
+
+        for source_path in namespace['star']:
+            if (resolved := self.__ResolveName(source_path, name, source_dict, visited_set)) is not None:
+                return resolved
+
+        return None
+
+    def __GetImportedNameList(self, namespace, source_dict):
+        name_list = list(namespace['import'])
+        for source_path in namespace['star']:
+            star_namespace = self.__ParseSource(source_path, source_dict)
+            name_list.extend(name for name in list(star_namespace['class']) + list(star_namespace['import']) if not name.startswith('_'))
+
+        return name_list
+
+    def __FindLocalModule(self, module_path, module_name, level):
+        # Only the modules next to the importing module are traced. Relative imports are resolved from the package of the importing module.
+        dir_name = dirname(module_path)
+        for _ in range(max(level - 1, 0)):
+            dir_name = dirname(dir_name)
+
+        if module_name is None:
+            return None
+
+        path = join(dir_name, *module_name.split('.'))
+        for candidate in (f'{path}.py', join(path, '__init__.py')):
+            if isfile(candidate):
+                return abspath(candidate)
+
+        return None
+
+    def __IsDependencyUnchanged(self, entry):
+        if 'depend' not in entry:
+            return False
+
+        for path, stat_value in entry['depend'].items():
+            try:
+                if [(stat_result := stat(path)).st_mtime_ns, stat_result.st_size] != stat_value:
+                    return False
+            except OSError:
+                if stat_value is not None:
+                    return False
+
+        return True
+
+    def __GetBaseName(self, node):
+        # "Base" and "Base[T]" are regarded as "Base", and "module.Base" is kept as it is to be resolved in the module.
+        if isinstance(node, Subscript):
+            node = node.value
+
+        if isinstance(node, Name):
+            return node.id
+
+        if isinstance(node, Attribute) and (module_name := self.__GetBaseName(node.value)) is not None:
+            return f'{module_name}.{node.attr}'
+
+        return None
+
+    def __GetNodeName(self, node):
+        # "Base", "module.Base" and "Base[T]" are regarded as "Base".
+        if isinstance(node, Subscript):
+            node = node.value
+
+        if isinstance(node, Name):
+            return node.id
+
+        if isinstance(node, Attribute):
+            return node.attr
+
+        return None
+
+    def __LoadManifest(self):
+        if self.__manifest_path is None:
+            return {}
+
+        try:
+            with open(self.__manifest_path, mode='r', encoding='utf-8') as f:
+                return load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __SaveManifest(self, manifest):
+        if self.__manifest_path is None:
+            return
+
+        # The file is written under a temporary name, so that a broken manifest is never read.
+        temp_path = f'{self.__manifest_path}.{getpid()}.tmp'
+        try:
+            with open(temp_path, mode='w', encoding='utf-8') as f:
+                dump(manifest, f)
+
+            replace(temp_path, self.__manifest_path)
+        except OSError:
+            pass
+
+
 def FormatArguments(design: dict, *args, **kw) -> dict:
     key_list = design.keys()
     if any([key not in key_list for key in kw.keys()]):
@@ -381,7 +731,7 @@ def Camel2Const(camel: str) -> str:
     return camel[0] + ''.join(['_' + c if c.isupper() else c.upper() for c in camel[1:]])
 
 
-def GetShowPanelLabel(panel: Panel) -> str:
+def GetShowPanelLabel(panel) -> str:
     """Get the label to be displayed on the menu item from the panel.
 
     :type panel: Panel
@@ -432,14 +782,15 @@ def DotChain(*args) -> str:
     return '.'.join(args)
 
 
-def FindWindowToAncestors(window: Window, Class):
+def FindWindowToAncestors(window, Class):
     """Find instances of the given class by tracing the ancestors of the given window.
 
     :type window: Window
     :type Class: Class
     :rtype: Any
     """
-    if not isinstance(window, Window):
+    # Any window has "Parent", and it is None at the top level. This module does not import wx.
+    if not hasattr(window, 'Parent'):
         return None
 
     if isinstance(window, Class):
@@ -462,6 +813,7 @@ __all__ = [
     'Singleton',
     'DotNotationDict',
     'RestrictedList',
+    'ClassRegistry',
     'FormatArguments',
     'GetFileName',
     'GetFileExtention',
@@ -1 +1,7 @@
 """Unit test package for isatex."""
+
+import sys
+from os.path import abspath, dirname, join
+
+# The modules of isatex import each other by their file names.
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), 'isatex'))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+"""Tests for the binary project format of `IOManager`."""
+
+
+import unittest
+from json import loads
+from os.path import getsize, join
+from struct import calcsize, unpack
+from tempfile import TemporaryDirectory
+
+from numpy import arange, array_equal, shares_memory, zeros
+from numpy.random import default_rng
+
+from objects import (DataContainer, Gaussian, PeakFunctionContainerList,
+                     Project, Spectrum)
+
+try:
+    from const import BINARY_SAVEFILE_EXTENSION, SETTING_FILE_PATH
+    from manager import IOManager
+except ImportError:
+    IOManager = None
+
+
+def CreatePeaks(rng, size):
+    peaks = PeakFunctionContainerList()
+    peaks.ExtendArray([Gaussian()], zeros(size, dtype=int), rng.uniform(1, 5, (size, 3)))
+    return peaks
+
+
+def CreateData(rng, index, spectrum_size=10, peak_size=3):
+    data = DataContainer(f'data{index}.txt')
+    x = arange(spectrum_size, dtype=float)
+    data.Append(Spectrum(x, rng.normal(size=spectrum_size), rng.normal(size=spectrum_size), CreatePeaks(rng, peak_size)), msg='encode')
+    return data
+
+
+@unittest.skipIf(IOManager is None, 'wxPython is not installed.')
+class TestBinaryProject(unittest.TestCase):
+    """Tests for saving and opening projects in the binary format."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up the manager shared by the tests. The manifest is not written into the package."""
+        cls.io_mgr = IOManager(SETTING_FILE_PATH, None, None)
+
+    def setUp(self):
+        """Set up a temporary directory and a project in it."""
+        self.temp_dir = TemporaryDirectory()
+        self.path = join(self.temp_dir.name, 'project' + BINARY_SAVEFILE_EXTENSION)
+        self.rng = default_rng(0)
+        self.project = Project(self.path, 'note', [CreateData(self.rng, i) for i in range(3)])
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def assertSameData(self, data, other_data):
+        self.assertEqual(data.Path, other_data.Path)
+        self.assertTrue(array_equal(data.XView, other_data.XView))
+        self.assertTrue(array_equal(data.YView, other_data.YView))
+        self.assertTrue(array_equal(data.BackGroundView, other_data.BackGroundView))
+        self.assertTrue(data.Peaks.IsSame(other_data.Peaks))
+        self.assertEqual(data.Msg, other_data.Msg)
+
+    def test_000_round_trip(self):
+        """The opened project has the same data as the saved one, whether it is memory-mapped or not."""
+        self.io_mgr.SaveProject(self.project)
+        for lazy in (True, False):
+            project = self.io_mgr.OpenProject(self.path, lazy)
+            self.assertEqual(project.GetNote(), 'note')
+            self.assertEqual(len(project.GetDataList()), 3)
+            for data, other_data in zip(self.project.GetDataList(), project.GetDataList()):
+                self.assertSameData(data, other_data)
+
+    def test_001_incremental_append(self):
+        """Only the dirty data are appended, and the other data keep their blocks."""
+        self.io_mgr.SaveProject(self.project)
+        size = getsize(self.path)
+        data = self.project.GetDataList()[1]
+        data.Append(Spectrum(data.XView, data.YView + 1, data.BackGroundView, CreatePeaks(self.rng, 5)), msg='edit')
+
+        self.io_mgr.SaveProject(self.project, [1])
+        self.assertGreater(getsize(self.path), size)
+        project = self.io_mgr.OpenProject(self.path)
+        for data, other_data in zip(self.project.GetDataList(), project.GetDataList()):
+            self.assertSameData(data, other_data)
+
+    def test_002_open_saved_project_again(self):
+        """The memory-mapped data can be saved to the file they refer to."""
+        self.io_mgr.SaveProject(self.project)
+        project = self.io_mgr.OpenProject(self.path)
+        self.io_mgr.SaveProject(project)
+        self.io_mgr.SaveProject(project, [0])
+        other_project = self.io_mgr.OpenProject(self.path, False)
+        for data, other_data in zip(self.project.GetDataList(), other_project.GetDataList()):
+            self.assertSameData(data, other_data)
+
+    def test_003_compaction(self):
+        """Repeated edits of the peaks do not grow the file without limit."""
+        self.project = Project(self.path, 'note', [CreateData(self.rng, i, peak_size=200) for i in range(3)])
+        self.io_mgr.SaveProject(self.project)
+        size = getsize(self.path)
+        data = self.project.GetDataList()[0]
+        for i in range(50):
+            data.Peaks = CreatePeaks(self.rng, 200)
+            self.io_mgr.SaveProject(self.project, [0])
+            self.assertLess(getsize(self.path), 3 * size)
+
+        project = self.io_mgr.OpenProject(self.path)
+        for data, other_data in zip(self.project.GetDataList(), project.GetDataList()):
+            self.assertSameData(data, other_data)
+
+    def test_004_garbage(self):
+        """The replaced y, background, peak rows and x which is no longer shared are counted as garbage."""
+        self.io_mgr.SaveProject(self.project)
+        _, header_length = self.ReadHeader()
+        for data in self.project.GetDataList():
+            data.Append(Spectrum(data.XView + 1, data.YView, data.BackGroundView, data.Peaks))
+
+        self.io_mgr.SaveProject(self.project, [0, 1, 2])
+        header, _ = self.ReadHeader()
+        # y and background of float64 with 10 points, 3 peaks with an int32 class index and 3 float64 arguments, and x shared by all the data.
+        self.assertEqual(header['garbage'], header_length + 3 * (2 * 10 * 8 + 3 * (4 + 3 * 8)) + 10 * 8)
+
+        project = self.io_mgr.OpenProject(self.path)
+        for data, other_data in zip(self.project.GetDataList(), project.GetDataList()):
+            self.assertSameData(data, other_data)
+
+    def test_005_shared_x(self):
+        """x shared between the data is held as one array after opening and after the memory-mapped data are loaded by saving."""
+        self.io_mgr.SaveProject(self.project)
+        for lazy in (True, False):
+            project = self.io_mgr.OpenProject(self.path, lazy)
+            data0, data1, _ = project.GetDataList()
+            self.assertTrue(shares_memory(data0.XView, data1.XView))
+
+        project = self.io_mgr.OpenProject(self.path)
+        data0, data1, _ = project.GetDataList()
+        data0.Append(Spectrum(data0.XView, data0.YView + 1, data0.BackGroundView, data0.Peaks), msg='edit')
+        self.io_mgr.SaveProject(project)
+        self.assertTrue(shares_memory(data0.XView, data1.XView))
+
+    def ReadHeader(self):
+        with open(self.path, mode='rb') as f:
+            _, header_offset, header_length = unpack(IOManager.BINARY_SAVE_PREFIX_FORMAT, f.read(calcsize(IOManager.BINARY_SAVE_PREFIX_FORMAT)))
+            f.seek(header_offset)
+            return loads(f.read(header_length)), header_length
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+"""Tests for `ClassRegistry` against the classes found by importing the modules."""
+
+
+import sys
+import unittest
+from importlib import import_module
+from inspect import getmembers, isclass
+from os.path import dirname, join
+from tempfile import TemporaryDirectory
+
+import core
+import objects
+from util import ClassRegistry, GetFileName
+
+DEFAULT_MODULE_LIST = [
+    'core.py',
+    'objects.py',
+    'defaultpeakfunction.py',
+    'defaultdecodefunction.py',
+    'defaultencodefunction.py',
+    'defaultspectrumfunction.py',
+    'defaultmappingfunction.py',
+]
+
+PLUGIN_SOURCE_DICT = {
+    'registry_helper.py': '''
+from objects import SpectrumFunctionContainerBase
+
+
+class HelperBase(SpectrumFunctionContainerBase):
+    pass
+
+
+class Shared(SpectrumFunctionContainerBase):
+    pass
+''',
+    'registry_aliased.py': '''
+from objects import SpectrumFunctionContainerBase as Base
+
+
+class Aliased(Base):
+    pass
+''',
+    'registry_derived.py': '''
+from registry_helper import HelperBase, Shared
+
+
+class Derived(HelperBase):
+    pass
+''',
+    'registry_starred.py': '''
+from registry_helper import *
+
+
+class Starred(HelperBase):
+    pass
+''',
+    'registry_dotted.py': '''
+import objects
+
+
+class Dotted(objects.PeakFunctionContainerBase):
+    pass
+''',
+}
+
+
+class TestClassRegistry(unittest.TestCase):
+    """Tests for the categories of the classes judged by the names."""
+
+    def setUp(self):
+        """Write the plugins into a temporary directory. "registry_helper" is imported by the plugins but not registered."""
+        self.temp_dir = TemporaryDirectory()
+        self.plugin_path_dict = {}
+        for file_name, source in PLUGIN_SOURCE_DICT.items():
+            self.plugin_path_dict[file_name] = self.WriteSource(file_name, source)
+
+        sys.path.append(self.temp_dir.name)
+        dir_name = join(dirname(dirname(__file__)), 'isatex')
+        self.module_path_list = [join(dir_name, path) for path in DEFAULT_MODULE_LIST] + [path for file_name, path in self.plugin_path_dict.items() if file_name != 'registry_helper.py']
+
+    def tearDown(self):
+        """Forget the plugins."""
+        sys.path.remove(self.temp_dir.name)
+        for file_name in PLUGIN_SOURCE_DICT:
+            sys.modules.pop(GetFileName(file_name), None)
+
+        self.temp_dir.cleanup()
+
+    def WriteSource(self, file_name, source):
+        path = join(self.temp_dir.name, file_name)
+        with open(path, mode='w', encoding='utf-8') as f:
+            f.write(source)
+
+        return path
+
+    def test_000_same_as_getmembers(self):
+        """Test that the categories are the same as the classes found by "inspect.getmembers" in the imported modules."""
+        registry = ClassRegistry(self.module_path_list)
+        module_list = [import_module(GetFileName(path)) for path in self.module_path_list]
+        for Base in (core.iSATexObject, core.StorableObject, objects.FunctionContainerBase, objects.SpectrumFunctionContainerBase, objects.PeakFunctionContainerBase):
+            name_set = {value.__name__ for module in module_list for _, value in getmembers(module) if isclass(value) and issubclass(value, Base)}
+            self.assertEqual(set(registry.GetClassNameList(Base.__name__)), name_set, Base.__name__)
+
+        for name in ('Aliased', 'Derived', 'Starred', 'Shared', 'HelperBase', 'Dotted'):
+            Class = registry.GetClass(name)
+            self.assertEqual(Class.__name__, name)
+
+        self.assertTrue(registry.IsSubclass('Derived', 'SpectrumFunctionContainerBase'))
+        self.assertTrue(registry.IsSubclass('Dotted', 'PeakFunctionContainerBase'))
+
+    def test_001_unresolved_base(self):
+        """Test that a base which cannot be traced in the sources is logged."""
+        path = self.WriteSource('registry_dynamic.py', 'from objects import SpectrumFunctionContainerBase\n\nBase = type(SpectrumFunctionContainerBase)\n\n\nclass Dynamic(Base):\n    pass\n')
+        with self.assertLogs('__main__.util', 'WARNING') as log:
+            ClassRegistry([path])
+
+        self.assertIn('"Base" of "Dynamic"', log.output[0])
+
+    def test_002_manifest(self):
+        """Test that the manifest is updated when a module imported by a registered module is changed."""
+        manifest_path = join(self.temp_dir.name, 'manifest.json')
+        self.assertTrue(ClassRegistry(self.module_path_list, manifest_path).IsSubclass('Derived', 'SpectrumFunctionContainerBase'))
+        self.assertTrue(ClassRegistry(self.module_path_list, manifest_path).IsSubclass('Derived', 'SpectrumFunctionContainerBase'))
+
+        self.WriteSource('registry_helper.py', 'from objects import PeakFunctionContainerBase\n\n\nclass HelperBase(PeakFunctionContainerBase):\n    pass\n\n\nclass Shared(PeakFunctionContainerBase):\n    pass\n')
+        registry = ClassRegistry(self.module_path_list, manifest_path)
+        self.assertFalse(registry.IsSubclass('Derived', 'SpectrumFunctionContainerBase'))
+        self.assertTrue(registry.IsSubclass('Derived', 'PeakFunctionContainerBase'))
+        self.assertTrue(registry.IsSubclass('Shared', 'PeakFunctionContainerBase'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""Tests for `CurveFit` of `defaultspectrumfunction`."""
+
+
+import unittest
+
+from numpy import linspace
+from numpy.testing import assert_allclose
+
+from defaultspectrumfunction import CurveFit
+from objects import (DEFAULT_PEAK_TYPE, Gaussian, PeakFunctionContainerList,
+                     SpectrumFunctionContainerAccessorSnapshot,
+                     SpectrumFunctionContainerBase)
+
+
+def CreatePeaks(*args_list):
+    peaks = PeakFunctionContainerList()
+    for args in args_list:
+        peak = Gaussian()
+        peak.SetArgs(list(args))
+        peaks.append(peak)
+
+    return peaks
+
+
+class TestCurveFit(unittest.TestCase):
+    """Tests for fitting the peaks within the windows."""
+
+    def setUp(self):
+        """Set up the curve fit for the default peak type."""
+        SpectrumFunctionContainerBase.SetDataAccessor(SpectrumFunctionContainerAccessorSnapshot(DEFAULT_PEAK_TYPE, None, 0))
+        self.curve_fit = CurveFit()
+        self.curve_fit.OnPeakTypeChanged(None)
+        self.x = linspace(0, 100, 1001)
+        self.y = Gaussian().Function(self.x, (10, 50, 6))
+
+    def Fit(self, window, peaks):
+        args = list(self.curve_fit.GetArgs())
+        args[0] = window
+        self.curve_fit.SetArgs(args)
+        return self.curve_fit.Function([self.x, self.y, peaks] + args)
+
+    def test_000_window_should_be_positive(self):
+        """A window of 0 or less is not a valid argument."""
+        for window, is_valid in ((None, True), (3.0, True), (0.0, False)):
+            args = list(self.curve_fit.GetArgs())
+            args[0] = window
+            self.curve_fit.SetArgs(args)
+            self.assertEqual(self.curve_fit.HasValidArguments(), is_valid)
+
+        with self.assertRaises(ValueError):
+            self.Fit(0.0, CreatePeaks((5, 48, 8)))
+
+    def test_001_windowed_fit(self):
+        """The windowed fit converges to the same peak as the fit over the whole x."""
+        for window in (None, 3.0):
+            peaks, = self.Fit(window, CreatePeaks((5, 48, 8)))
+            assert_allclose(peaks[0].GetArgs(), (10, 50, 6), rtol=1e-4)
+
+    def test_002_empty_window(self):
+        """The fit fails instead of returning the initial peaks if a window contains no point."""
+        with self.assertRaises(ValueError):
+            self.Fit(3.0, CreatePeaks((5, 48, 8), (1, 200, 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
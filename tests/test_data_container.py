@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+"""Tests for resuming the recipe execution in `DataContainer.ApplyRecipe` and for `DataContainerView`."""
+
+
+import unittest
+
+from numpy import linspace, shares_memory, sin
+
+from defaultpeakfunction import Lorentz
+from defaultspectrumfunction import SavgolFilter, Smooth
+from objects import (DEFAULT_PEAK_TYPE, DataContainer, DataContainerView,
+                     PeakMapping, PeakType, Project, Recipe, Spectrum,
+                     SpectrumFunctionContainerAccessorSnapshot,
+                     SpectrumFunctionContainerBase)
+
+
+def CreateSavgolFilter(window_length):
+    func_container = SavgolFilter()
+    func_container.SetArgs([window_length, 2])
+    return func_container
+
+
+def CreateSmooth(resolution):
+    func_container = Smooth()
+    func_container.SetArgs([resolution, 'linear'])
+    return func_container
+
+
+class TestApplyRecipe(unittest.TestCase):
+    """Tests for the success list and the history after a recipe is applied again."""
+
+    def setUp(self):
+        """Set up data executed with a recipe of three steps."""
+        SpectrumFunctionContainerBase.SetDataAccessor(SpectrumFunctionContainerAccessorSnapshot(DEFAULT_PEAK_TYPE, None, 0))
+        x = linspace(0, 10, 101)
+        self.data = DataContainer('data.txt')
+        self.data.Append(Spectrum(x, sin(x)), msg='encode')
+        self.project = Project(data_list=[self.data], peak_type=DEFAULT_PEAK_TYPE)
+        self.Execute(self.CreateRecipe())
+
+    def CreateRecipe(self, resolution=80, window_length=5, tail_window_length=7):
+        return Recipe([CreateSmooth(resolution), CreateSavgolFilter(window_length), CreateSavgolFilter(tail_window_length)])
+
+    def Execute(self, recipe):
+        resumed = self.data.ApplyRecipe(recipe)
+        x, y = self.data.XY
+        history, _, error_msg = self.data.Recipe.Execution(Spectrum(x, y, self.data.BackGround, self.data.Peaks), self.data.SuccessList)
+        self.assertIsNone(error_msg)
+        for spectrum, success_list, msg, changed_params in history:
+            self.data.Append(spectrum, self.data.Recipe, success_list, msg, changed_params)
+
+        return resumed, len(history)
+
+    def test_000_changed_tail_step(self):
+        """Test that only the changed last step is executed on the history before it."""
+        self.assertEqual(self.Execute(self.CreateRecipe(tail_window_length=9)), (True, 1))
+        self.assertEqual(self.data.GetBufferData(1)[2], [True, True, None])
+        self.assertEqual(self.data.SuccessList, [True] * 3)
+
+    def test_001_resume_from_older_history(self):
+        """Test that the history where the same leading steps succeeded is copied to the latest one."""
+        buffer_size = self.data.BufferSize
+        self.assertEqual(self.Execute(self.CreateRecipe(window_length=9)), (True, 2))
+        self.assertEqual(self.data.BufferSize, buffer_size + 3)
+        self.assertTrue(self.data.GetBufferData(2)[3].startswith('resume from'))
+        self.assertEqual(self.data.GetBufferData(2)[2], [True, None, None])
+
+    def test_002_same_recipe(self):
+        """Test that the same recipe is not executed again and the history does not change."""
+        buffer_size = self.data.BufferSize
+        self.assertEqual(self.Execute(self.CreateRecipe()), (False, 0))
+        self.assertEqual(self.data.BufferSize, buffer_size)
+        self.assertEqual(self.data.SuccessList, [True] * 3)
+
+    def test_003_changed_first_step(self):
+        """Test that all the steps are executed on the latest spectrum if the first step is changed."""
+        buffer_size = self.data.BufferSize
+        self.assertEqual(self.Execute(self.CreateRecipe(resolution=60)), (False, 3))
+        self.assertEqual(self.data.BufferSize, buffer_size + 3)
+        self.assertEqual(self.data.GetSpectrumSize(), 60)
+
+    def test_004_peak_type_change(self):
+        """Test that all the steps are executed again after the type of peak is changed."""
+        self.project.SetPeakType(DEFAULT_PEAK_TYPE)
+        self.assertEqual(self.Execute(self.CreateRecipe()), (False, 0))
+
+        self.project.SetPeakType(PeakType(Lorentz()))
+        self.assertEqual(self.Execute(self.CreateRecipe()), (False, 3))
+        self.assertEqual(self.Execute(self.CreateRecipe(tail_window_length=9)), (True, 1))
+
+    def test_005_restore_before_peak_type_change(self):
+        """Test that a history restored from before the type of peak is changed is not resumed."""
+        self.project.SetPeakType(PeakType(Lorentz()))
+        self.data.Restore(0)
+        self.assertEqual(self.Execute(self.CreateRecipe()), (False, 3))
+
+    def test_006_recipe_setter(self):
+        """Test that the setter resets the success list without resuming."""
+        buffer_size = self.data.BufferSize
+        self.data.Recipe = self.CreateRecipe()
+        self.assertEqual(self.data.SuccessList, [None] * 3)
+        self.assertEqual(self.data.BufferSize, buffer_size)
+
+
+
+class TestDataContainerView(unittest.TestCase):
+    """Tests for reading the data through the read-only wrapper."""
+
+    def setUp(self):
+        """Set up data with peaks and its wrapper."""
+        self.data = DataContainer.CreateDummyData()
+        self.view = DataContainerView(self.data)
+
+    def test_000_read(self):
+        """Test that the views share the arrays of the data and the copies do not."""
+        self.assertTrue(shares_memory(self.view.XView, self.data.XView))
+        self.assertFalse(self.view.YView.flags.writeable)
+        self.assertFalse(shares_memory(self.view.Y, self.data.YView))
+        self.assertEqual(self.view.Path, self.data.Path)
+        self.assertEqual(self.view.GetSpectrumSize(), self.data.GetSpectrumSize())
+        self.assertEqual(len(self.view.PeaksView), len(self.data.Peaks))
+
+    def test_001_write(self):
+        """Test that the data can not be modified through the wrapper."""
+        y = self.data.Y
+        for name in ('X', 'Y', 'XY', 'BackGround', 'Peaks', 'Path'):
+            with self.assertRaises(AttributeError):
+                setattr(self.view, name, getattr(self.data, name))
+
+        self.assertFalse(hasattr(self.view, 'Append'))
+        self.assertFalse(hasattr(self.view, 'Restore'))
+        self.assertTrue((self.data.YView == y).all())
+
+    def test_002_mapping(self):
+        """Test that a mapping function gets the same values from the wrappers as from the data."""
+        data_list = [DataContainer.CreateDummyData() for _ in range(3)]
+        mapping = PeakMapping()
+        self.assertEqual(list(mapping.Execution([DataContainerView(data) for data in data_list])), list(mapping.Execution(data_list)))
+
+
+if __name__ == '__main__':
+    unittest.main()
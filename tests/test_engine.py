@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+"""Tests for `HeadlessEngine` and its command line interface."""
+
+
+import unittest
+from json import JSONEncoder, dump
+from os import listdir
+from os.path import isfile, join
+from tempfile import TemporaryDirectory
+
+from numpy import linspace, sin
+
+from const import SAVE_MARKER_CLASS_NAME, SAVE_MARKER_DATA
+from core import StorableObject
+from defaultspectrumfunction import SavgolFilter
+from engine import HeadlessEngine, main
+from objects import (CSV, DecodeFunctionContainerBase,
+                     EncodeFunctionContainerBase, Preset, Text)
+
+
+class SettingEncoder(JSONEncoder):
+    """The same format as `IOManager.iSATexJsonEncoder`."""
+
+    def default(self, obj):
+        if isinstance(obj, StorableObject):
+            return {SAVE_MARKER_CLASS_NAME: obj.__class__.__name__, SAVE_MARKER_DATA: obj.SendSaveData()}
+
+        return super().default(obj)
+
+
+class Background(EncodeFunctionContainerBase):
+    """Encode function returning the background."""
+
+    def Function(self, contents, args):
+        return [float(value) for value in contents.split()], [0.0, 0.0], [1.0, 1.0]
+
+    def SendReturnParams(self):
+        return 'xyb'
+
+
+class Split(DecodeFunctionContainerBase):
+    """Decode function outputting a file for each data."""
+
+    def Function(self, project, args):
+        return [(str(index), str(len(data.X))) for index, data in enumerate(project.GetDataList())]
+
+    def SendFileTypeWildcard(self):
+        return 'Text files (.txt)|*.txt'
+
+
+class TestHeadlessEngine(unittest.TestCase):
+    """Tests for `HeadlessEngine` with a setting file containing a preset."""
+
+    def setUp(self):
+        """Write a setting file and experimental data into a temporary directory."""
+        self.temp_dir = TemporaryDirectory()
+        self.dir_path = self.temp_dir.name
+        self.setting_path = join(self.dir_path, 'setting.json')
+        setting = {'DEFAULT': {'FUNCTION': {'SPECTRUM': {'PRESET_LIST': [Preset('Smooth', [SavgolFilter()])]}}}}
+        with open(self.setting_path, mode='w', encoding='utf-8') as f:
+            dump(setting, f, cls=SettingEncoder)
+
+        self.path_list = []
+        x = linspace(0, 10, 101)
+        for index in range(3):
+            path = join(self.dir_path, f'data{index}.txt')
+            with open(path, mode='w', encoding='utf-8') as f:
+                f.write('\n'.join([f'{v},{sin(v + index)}' for v in x]))
+
+            self.path_list.append(path)
+
+        self.engine = HeadlessEngine(self.setting_path)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def test_000_setting(self):
+        """Test the preset and the default functions read from the setting."""
+        preset = self.engine.GetPreset('Smooth')
+        self.assertIsInstance(preset, Preset)
+        self.assertEqual([function.__class__ for function in preset], [SavgolFilter])
+        self.assertIsNot(self.engine.GetPreset('Smooth'), preset)
+        with self.assertRaises(KeyError):
+            self.engine.GetPreset('Missing')
+
+        self.assertIsInstance(self.engine.GetEncodeFunction(), Text)
+        self.assertIsInstance(self.engine.GetDecodeFunction(), CSV)
+        self.assertIn('CSV', self.engine.GetDecodeFunctionNameList())
+        with self.assertRaises(KeyError):
+            self.engine.GetDecodeFunction('Missing')
+
+    def test_001_encode(self):
+        """Test that the files are read in order and a broken file is skipped."""
+        broken_path = join(self.dir_path, 'broken.txt')
+        with open(broken_path, mode='w', encoding='utf-8') as f:
+            f.write('no data')
+
+        project = self.engine.Encode(self.path_list[:1] + [broken_path] + self.path_list[1:], max_workers=2)
+        data_list = project.GetDataList()
+        self.assertEqual([data.Path for data in data_list], self.path_list)
+        self.assertEqual([data.GetSpectrumSize() for data in data_list], [101] * 3)
+
+    def test_002_execute(self):
+        """Test that the preset is applied to all the data."""
+        project = self.engine.Encode(self.path_list, max_workers=2)
+        y_list = [data.Y for data in project.GetDataList()]
+        self.assertEqual(self.engine.Execute(project, self.engine.GetPreset('Smooth'), max_workers=2), {})
+        for data, y in zip(project.GetDataList(), y_list):
+            self.assertEqual([function.__class__ for function in data.Recipe], [SavgolFilter])
+            self.assertFalse((data.Y == y).all())
+
+    def test_003_decode(self):
+        """Test the output of a single file and multiple files."""
+        project = self.engine.Encode(self.path_list, max_workers=2)
+
+        path = join(self.dir_path, 'result.csv')
+        self.assertEqual(self.engine.Decode(project, path), [path])
+        self.assertTrue(isfile(path))
+
+        path_list = self.engine.Decode(project, self.dir_path, Split())
+        self.assertEqual(path_list, [join(self.dir_path, f'{index}.txt') for index in range(3)])
+        with open(path_list[0], mode='r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '101')
+
+        with self.assertRaises(NotADirectoryError):
+            self.engine.Decode(project, join(self.dir_path, 'result.txt'), Split())
+
+    def test_004_main(self):
+        """Test the command line interface."""
+        option_list = ['-p', 'Smooth', '-o', self.dir_path, '--setting', self.setting_path, '--decode', 'CSV', '-j', '2']
+        self.assertEqual(main(self.path_list + option_list), 0)
+        self.assertEqual(len([name for name in listdir(self.dir_path) if name.endswith('.csv')]), 1)
+
+        self.assertEqual(main(self.path_list + [join(self.dir_path, 'missing.txt')] + option_list), 1)
+        with self.assertRaises(KeyError):
+            main(self.path_list + ['-p', 'Missing', '-o', self.dir_path, '--setting', self.setting_path])
+
+
+class TestSharedRules(unittest.TestCase):
+    """Tests for the rules shared by the dialogs and `HeadlessEngine`."""
+
+    def test_000_spectrum_params(self):
+        """Test the sizes of x, y and the background returned by an encode function."""
+        encode_function = Text()
+        x, y, bg = encode_function.GetSpectrumParams(([0, 1], [2, 3]))
+        self.assertEqual((x, y, bg), ([0, 1], [2, 3], []))
+        for params in (None, ([], []), ([0, 1], [2])):
+            with self.assertRaises(ValueError):
+                encode_function.GetSpectrumParams(params)
+
+        encode_function = Background()
+        x, y, bg = encode_function.GetSpectrumParams(encode_function.Execution('0 1'))
+        self.assertEqual(bg, [1.0, 1.0])
+        with self.assertRaises(ValueError):
+            encode_function.GetSpectrumParams(encode_function.Execution('0 1 2'))
+
+    def test_001_decoded_files(self):
+        """Test the extension and the type check of the output files."""
+        decode_function = Split()
+        decode_function.Function = lambda project, args: ('name', 'contents')
+        self.assertEqual(decode_function.ExecutionToFiles(None), (True, [('name.txt', 'contents')]))
+        decode_function.Function = lambda project, args: [('a', '1'), ('b', '2')]
+        self.assertEqual(decode_function.ExecutionToFiles(None), (False, [('a.txt', '1'), ('b.txt', '2')]))
+        for values in ('contents', ['a', 'b', 'c']):
+            decode_function.Function = lambda project, args, values=values: values
+            with self.assertRaises(TypeError):
+                decode_function.ExecutionToFiles(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
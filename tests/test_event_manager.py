@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+"""Tests for coalescing the data events in `EventManager`."""
+
+
+import unittest
+
+try:
+    from wx import App
+
+    from defaultevent import DataContentsChangeEvent, DataSelectionChangeEvent
+    from manager import EventManager
+except ImportError:
+    EventManager = None
+
+
+class CoreManager:
+    """Core manager recording the dispatched events."""
+
+    def __init__(self):
+        self.event_list = []
+
+    def OnEvent(self, event):
+        self.event_list.append(event)
+
+    def Get(self, key, default=None):
+        return default
+
+
+@unittest.skipIf(EventManager is None, 'wxPython is not installed.')
+class TestEventManager(unittest.TestCase):
+    """Tests for the order and the merging of the held events."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application needed by the timer."""
+        cls.app = App()
+
+    def setUp(self):
+        """Set up the manager with a core manager recording the events."""
+        self.core_mgr = CoreManager()
+        self.event_mgr = EventManager(core_manager=self.core_mgr)
+
+    def tearDown(self):
+        """Stop the timer."""
+        self.event_mgr.FlushEvent()
+
+    def test_000_merge_consecutive_events(self):
+        """Test that consecutive events of the same kind are merged into one."""
+        self.event_mgr.SendEvent(DataSelectionChangeEvent(0, None, [0], []))
+        self.event_mgr.SendEvent(DataSelectionChangeEvent(1, 0, [1], [0]))
+        self.event_mgr.SendEvent(DataSelectionChangeEvent(2, 1, [2], [1]))
+        self.assertEqual(self.core_mgr.event_list, [])
+
+        self.event_mgr.FlushEvent()
+        event, = self.core_mgr.event_list
+        self.assertEqual(list(event.GetSelection()), [2])
+        self.assertEqual(list(event.GetPreviousSelection()), [])
+
+    def test_001_keep_order(self):
+        """Test that an event is not merged into the same kind of event held before a different kind of event."""
+        self.event_mgr.SendEvent(DataSelectionChangeEvent(0, None, [0], []))
+        self.event_mgr.SendEvent(DataContentsChangeEvent([0], [None], [True]))
+        self.event_mgr.SendEvent(DataSelectionChangeEvent(1, 0, [1], [0]))
+        self.event_mgr.FlushEvent()
+
+        self.assertEqual([event.__class__ for event in self.core_mgr.event_list], [DataSelectionChangeEvent, DataContentsChangeEvent, DataSelectionChangeEvent])
+        self.assertEqual([list(event.GetSelection()) for event in self.core_mgr.event_list[::2]], [[0], [1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
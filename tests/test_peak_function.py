@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""Tests for the broadcast formulas of `PeakFunctionContainerBase` subclasses."""
+
+
+import unittest
+
+from numpy import abs as np_abs
+from numpy import array, linspace, where
+from numpy.testing import assert_allclose
+
+from objects import (ExecutePeaks, Gaussian, PeakFunctionContainerBase,
+                     PeakFunctionContainerList)
+
+
+class Box(Gaussian):
+    """Plugin overriding only "Function" of its parent."""
+
+    def Function(self, x, args):
+        return where(np_abs(x - args[1]) <= args[2] / 2, args[0], 0.0)
+
+
+class WideBox(Box):
+    """Subclass overriding nothing, which keeps the calculation of "Box"."""
+    pass
+
+
+class NarrowGaussian(Gaussian):
+    """Subclass overriding "Function" and "FunctionArray"."""
+
+    def Function(self, x, args):
+        return super().Function(x, (args[0], args[1], args[2] / 2))
+
+    def FunctionArray(self, x, params):
+        return super().FunctionArray(x, params * array([1.0, 1.0, 0.5]))
+
+
+def CreatePeak(Class, args):
+    peak = Class()
+    peak.SetArgs(list(args))
+    return peak
+
+
+class TestPeakFunction(unittest.TestCase):
+    """Tests for the formulas used by the vectorized paths."""
+
+    def setUp(self):
+        """Set up x and the arguments of two peaks."""
+        self.x = linspace(0, 10, 101)
+        self.args_list = [(1.0, 3.0, 2.0), (2.0, 7.0, 1.0)]
+
+    def assertSameAsFunction(self, Class):
+        peaks = [CreatePeak(Class, args) for args in self.args_list]
+        expected = array([peak.Execution(self.x) for peak in peaks])
+        assert_allclose(Class().FunctionArray(self.x, array(self.args_list)), expected)
+        assert_allclose(ExecutePeaks(self.x, peaks), expected)
+        assert_allclose(ExecutePeaks(self.x, [peak.GetSnapshot() for peak in peaks]), expected)
+        assert_allclose(PeakFunctionContainerList(peaks).ExecutionArray(self.x), expected)
+
+    def test_000_override_only_function(self):
+        """Test that a subclass overriding only "Function" does not use the formulas of its parent."""
+        for Class in (Box, WideBox):
+            self.assertSameAsFunction(Class)
+            self.assertFalse(Class().HasDerivative())
+            self.assertIsNone(Class().DerivativeArray(self.x, array(self.args_list)))
+
+        self.assertIs(Box.FunctionArray, PeakFunctionContainerBase.FunctionArray)
+
+    def test_001_override_formulas(self):
+        """Test that the formulas are kept by the classes defining them and the subclasses not overriding "Function"."""
+        self.assertSameAsFunction(Gaussian)
+        self.assertSameAsFunction(NarrowGaussian)
+        self.assertTrue(Gaussian().HasDerivative())
+        self.assertFalse(NarrowGaussian().HasDerivative())
+        self.assertIs(NarrowGaussian.FunctionArray, vars(NarrowGaussian)['FunctionArray'])
+
+
+if __name__ == '__main__':
+    unittest.main()
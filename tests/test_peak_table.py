@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+"""Tests for `PeakFunctionContainerList` stored in `PeakTable`."""
+
+
+import pickle
+import unittest
+from copy import deepcopy
+
+from defaultpeakfunction import Lorentz
+from objects import Gaussian, PeakFunctionContainerList
+
+
+def CreatePeak(Class, *args):
+    peak = Class()
+    peak.SetArgs(list(args) + list(peak.GetArgs()[len(args):]))
+    return peak
+
+
+def GetAmpList(peaks):
+    return [peak.Amp for peak in peaks]
+
+
+class TestPeakFunctionContainerList(unittest.TestCase):
+    """Tests for the peaks behaving like the elements of a list."""
+
+    def setUp(self):
+        """Set up a list of three peaks."""
+        self.peaks = PeakFunctionContainerList([CreatePeak(Gaussian, 1, 10, 1), CreatePeak(Lorentz, 2, 20, 2), CreatePeak(Gaussian, 3, 30, 3)])
+
+    def test_000_identity(self):
+        """The same peak is returned for the same element."""
+        self.assertIs(self.peaks[1], self.peaks[1])
+        peak_list = list(self.peaks)
+        for i, peak in enumerate(peak_list):
+            self.assertIs(self.peaks[i], peak)
+
+    def test_001_stale_peak_follows_row(self):
+        """A peak taken before the other rows are removed or inserted still refers to its own arguments."""
+        peak = self.peaks[1]
+        last_peak = self.peaks[2]
+        del self.peaks[0]
+        peak.Amp = 9
+        last_peak.Amp = 8
+        self.assertEqual(GetAmpList(self.peaks), [9.0, 8.0])
+
+        self.peaks.insert(0, CreatePeak(Gaussian, 4, 40, 4))
+        peak.Ctr = 25
+        self.assertEqual(self.peaks[1].Ctr, 25.0)
+        self.assertIs(self.peaks[1], peak)
+
+    def test_002_removed_peak_is_detached(self):
+        """A removed peak keeps its arguments, and changing it does not change the list."""
+        peak = self.peaks[0]
+        container = peak.GetArgumentContainerList()[0]
+        del self.peaks[0]
+        self.assertEqual(peak.GetArgs(), (1.0, 10.0, 1.0))
+        peak.Amp = 7
+        container.SetValue(6)
+        self.assertEqual(peak.Amp, 6.0)
+        self.assertEqual(GetAmpList(self.peaks), [2.0, 3.0])
+
+        popped_peak = self.peaks[-1]
+        self.assertIs(self.peaks.pop(), popped_peak)
+        popped_peak.Amp = 5
+        self.assertEqual(GetAmpList(self.peaks), [2.0])
+
+        remaining_peak = self.peaks[0]
+        self.peaks.clear()
+        self.assertEqual(remaining_peak.Amp, 2.0)
+        self.assertEqual(len(self.peaks), 0)
+
+    def test_003_aliasing(self):
+        """A peak changed after it is appended or inserted changes the list."""
+        peak = CreatePeak(Gaussian, 5, 50, 5)
+        self.peaks.append(peak)
+        peak.Amp = 6
+        self.assertEqual(self.peaks[-1].Amp, 6.0)
+        self.assertIs(self.peaks[-1], peak)
+
+        other_peak = CreatePeak(Lorentz, 7, 70, 7)
+        self.peaks.insert(0, other_peak)
+        other_peak.SetArgs([8, 80, 8])
+        self.assertEqual(self.peaks[0].GetArgs(), (8.0, 80.0, 8.0))
+
+        replacing_peak = CreatePeak(Gaussian, 9, 90, 9)
+        self.peaks[1] = replacing_peak
+        replacing_peak.Amp = 10
+        self.assertEqual(self.peaks[1].Amp, 10.0)
+
+    def test_004_reverse_and_slice_assignment(self):
+        """The peaks follow their rows when the list is reordered."""
+        first_peak, last_peak = self.peaks[0], self.peaks[2]
+        self.peaks.reverse()
+        self.assertIs(self.peaks[2], first_peak)
+        first_peak.Amp = 11
+        self.assertEqual(GetAmpList(self.peaks), [3.0, 2.0, 11.0])
+
+        self.peaks[0:2] = [self.peaks[1], last_peak]
+        last_peak.Amp = 12
+        self.assertEqual(GetAmpList(self.peaks), [2.0, 12.0, 11.0])
+
+    def test_005_peak_moved_to_another_list(self):
+        """A peak appended to another list refers to the new list, and the old list keeps its arguments."""
+        peak = self.peaks[0]
+        other_peaks = PeakFunctionContainerList()
+        other_peaks.append(peak)
+        peak.Amp = 13
+        self.assertEqual(other_peaks[0].Amp, 13.0)
+        self.assertEqual(self.peaks[0].Amp, 1.0)
+        self.assertIsNot(self.peaks[0], peak)
+
+    def test_006_deepcopy(self):
+        """The copies do not refer to the original list."""
+        copied_peaks = deepcopy(self.peaks)
+        copied_peaks[0].Amp = 14
+        self.assertEqual(self.peaks[0].Amp, 1.0)
+
+        copied_peak = deepcopy(self.peaks[1])
+        copied_peak.Amp = 15
+        self.assertEqual(self.peaks[1].Amp, 2.0)
+        self.assertIs(type(copied_peak), Lorentz)
+
+        sliced_peaks = self.peaks[1:]
+        sliced_peaks[0].Amp = 16
+        self.assertEqual(self.peaks[1].Amp, 2.0)
+
+    def test_007_pickle(self):
+        """The pickled list and peaks have the same classes and arguments, and do not refer to the original list."""
+        peaks = pickle.loads(pickle.dumps(self.peaks))
+        self.assertTrue(peaks.IsSame(self.peaks))
+        peaks[0].Amp = 17
+        peaks.append(CreatePeak(Gaussian, 18, 1, 1))
+        self.assertEqual(GetAmpList(peaks), [17.0, 2.0, 3.0, 18.0])
+        self.assertEqual(GetAmpList(self.peaks), [1.0, 2.0, 3.0])
+
+        peak = pickle.loads(pickle.dumps(self.peaks[2]))
+        peak.Amp = 19
+        self.assertEqual(peak.GetArgs(), (19.0, 30.0, 3.0))
+        self.assertEqual(self.peaks[2].Amp, 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+"""Tests for `RecipeResultCache` used by `Recipe.Execution`."""
+
+
+import unittest
+
+from numpy import linspace, shares_memory, sin
+
+from defaultspectrumfunction import SavgolFilter
+from objects import (DEFAULT_PEAK_TYPE, DataContainer, Recipe,
+                     RecipeResultCache, Spectrum,
+                     SpectrumFunctionContainerAccessorSnapshot,
+                     SpectrumFunctionContainerBase)
+
+
+class TestRecipeResultCache(unittest.TestCase):
+    """Tests for the cached spectra not being shared with the history of data."""
+
+    def setUp(self):
+        """Set up a recipe with the cache."""
+        SpectrumFunctionContainerBase.SetDataAccessor(SpectrumFunctionContainerAccessorSnapshot(DEFAULT_PEAK_TYPE, None, 0))
+        self.result_cache = RecipeResultCache(1 << 24)
+        Recipe.SetResultCache(self.result_cache)
+        self.recipe = Recipe([SavgolFilter()])
+        x = linspace(0, 10, 101)
+        self.spectrum = Spectrum(x, sin(x))
+
+    def tearDown(self):
+        """Stop using the cache."""
+        Recipe.SetResultCache(None)
+
+    def Execute(self):
+        data = DataContainer('data.txt')
+        data.Append(self.spectrum, msg='encode')
+        history, _, error_msg = self.recipe.Execution(self.spectrum)
+        self.assertIsNone(error_msg)
+        for spectrum, success_list, msg, changed_params in history:
+            data.Append(spectrum, self.recipe, success_list, msg, changed_params)
+
+        return data, history[-1][0]
+
+    def test_000_cached_spectrum_is_copied(self):
+        """The spectrum returned from the cache is not the one stored in the history."""
+        _, spectrum = self.Execute()
+        _, cached_spectrum = self.Execute()
+        self.assertIsNot(cached_spectrum, spectrum)
+
+        key = self.result_cache.CreateKey(self.spectrum, self.recipe[0])
+        self.assertIsNot(self.result_cache.Get(key), cached_spectrum)
+        self.assertIsNot(self.result_cache.Get(key), self.result_cache.Get(key))
+
+    def test_001_history_does_not_change_cache(self):
+        """Sharing the unchanged arrays with the previous history does not replace the arrays of the cached spectrum."""
+        data, _ = self.Execute()
+        key = self.result_cache.CreateKey(self.spectrum, self.recipe[0])
+        self.assertFalse(shares_memory(self.result_cache.Get(key).XView, data.XView))
+
+    def test_002_data_do_not_share_history(self):
+        """The data executed with the same input do not share the spectrum in their histories."""
+        data, _ = self.Execute()
+        other_data, _ = self.Execute()
+        y = other_data.Y
+        data.Y = y + 1
+        self.assertTrue((other_data.YView == y).all())
+
+
+if __name__ == '__main__':
+    unittest.main()